@@ -0,0 +1,94 @@
+"""Sampled capture of search requests to a rotating JSONL file.
+
+Each line is a request body plus an ``endpoint`` key, the same format that
+``scripts/load_generator.py`` and ``scripts/benchmark_api.py`` replay, so a
+capture taken during an incident can be replayed locally with the same query
+mix. Timings and cache outcome go under a ``capture`` key, which replay tools
+ignore.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any
+
+
+class QueryCapture:
+    """Write a sample of requests, and every slow request, to a JSONL file.
+
+    Lines are handed to a background thread through a queue, so the event
+    loop never waits on disk. ``{pid}`` in ``path`` is replaced with the
+    process ID; use it with several prefork workers, since a rotating file
+    must have a single writer.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sample_rate: float,
+        slow_ms: float,
+        max_bytes: int,
+        backups: int,
+    ) -> None:
+        self.path = path.replace("{pid}", str(os.getpid()))
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.sampled = 0
+        self.slow = 0
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = RotatingFileHandler(
+            self.path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        self._listener = QueueListener(records, handler)
+        # Standalone logger: not registered globally and never propagated to
+        # the app's stdout handler.
+        self._logger = logging.Logger("app.capture", logging.INFO)
+        self._logger.propagate = False
+        self._logger.addHandler(QueueHandler(records))
+
+    def start(self) -> None:
+        self._listener.start()
+
+    def stop(self) -> None:
+        self._listener.stop()
+
+    def should_capture(self, latency_ms: float) -> str | None:
+        """Return why a request should be kept (``"slow"``/``"sampled"``), or None."""
+        if latency_ms >= self.slow_ms > 0:
+            self.slow += 1
+            return "slow"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            self.sampled += 1
+            return "sampled"
+        return None
+
+    def record(
+        self,
+        endpoint: str,
+        query: str,
+        page: int,
+        filters: dict[str, Any] | None,
+        capture: dict[str, Any],
+    ) -> None:
+        """Queue one request line: the replayable body plus capture metadata."""
+        line: dict[str, Any] = {"endpoint": endpoint, "query": query, "page": page}
+        if filters:
+            line.update((k, v) for k, v in filters.items() if v is not None)
+        line["capture"] = {"ts": round(time.time(), 3), **capture}
+        self._logger.info(json.dumps(line, ensure_ascii=False, separators=(",", ":")))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "path": self.path,
+            "sampled": self.sampled,
+            "slow": self.slow,
+        }
@@ -0,0 +1,110 @@
+"""Operational endpoints (not part of the public search API docs)."""
+
+import asyncio
+from typing import Any
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from app.data.categories import ENDPOINTS, served_endpoints
+
+router = APIRouter(include_in_schema=False)
+
+
+class LoopLagMonitor:
+    """Sample how late the event loop wakes up from a fixed-interval sleep.
+
+    A high lag means something is blocking the loop thread, which delays every
+    in-flight request, including cache hits.
+    """
+
+    def __init__(self, interval: float = 0.1) -> None:
+        self.interval = interval
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self.avg_ms = 0.0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, loop.time() - expected) * 1000.0
+            self.last_ms = lag_ms
+            self.max_ms = max(self.max_ms, lag_ms)
+            self.avg_ms = 0.95 * self.avg_ms + 0.05 * lag_ms
+
+    def stats(self) -> dict[str, float]:
+        return {"last_ms": self.last_ms, "avg_ms": self.avg_ms, "max_ms": self.max_ms}
+
+
+@router.get("/stats")
+async def stats(request: Request) -> dict[str, Any]:
+    """Return engine and cache counters."""
+    result: dict[str, Any] = {}
+    engine = getattr(request.app.state, "engine", None)
+    if engine is not None:
+        result.update(engine.stats())
+    page_cache = getattr(request.app.state, "page_cache", None)
+    if page_cache is not None:
+        result["page_cache"] = {
+            "hits": page_cache.hits,
+            "misses": page_cache.misses,
+        }
+    query_capture = getattr(request.app.state, "query_capture", None)
+    if query_capture is not None:
+        result["query_capture"] = query_capture.stats()
+    loop_lag = getattr(request.app.state, "loop_lag", None)
+    if loop_lag is not None:
+        result["event_loop_lag"] = loop_lag.stats()
+    return result
+
+
+@router.get("/healthz")
+async def healthz() -> dict[str, str]:
+    """Liveness: the process is up and the event loop is responsive."""
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz(request: Request) -> JSONResponse:
+    """Readiness: the model and every category served by this node are loaded.
+
+    ``endpoints`` lists what this node serves (all of them unless
+    ``SHARD_CATEGORIES`` is set); the shard router routes by it.
+    """
+    engine = getattr(request.app.state, "engine", None)
+    error = getattr(request.app.state, "startup_error", None)
+    endpoints = served_endpoints()
+    pending = [
+        name
+        for name in endpoints
+        if engine is None or not engine.has_category(ENDPOINTS[name]["category_id"])
+    ]
+    ready = engine is not None and engine.ready and error is None
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "model_loaded": engine is not None and engine.model_loaded,
+            "index_loading": engine is not None and engine.index_loading,
+            "categories_loaded": (
+                len(engine.index) + len(engine.vector_categories)
+                if engine is not None
+                else 0
+            ),
+            "endpoints": endpoints,
+            "endpoints_pending": pending,
+            "error": error,
+        },
+    )
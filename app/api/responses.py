@@ -0,0 +1,89 @@
+"""Pre-encoded JSON responses, HTTP cache validators and a cache of encoded pages."""
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from fastapi import Response
+
+from app.search.filters import normalize_filters
+
+
+def encode_ids(ids: list[str]) -> bytes:
+    """Encode a page of product IDs as a compact JSON array."""
+    return json.dumps(ids, separators=(",", ":")).encode("utf-8")
+
+
+def json_response(content: bytes) -> Response:
+    """Wrap already-encoded JSON bytes without re-validating or re-encoding."""
+    return Response(content=content, media_type="application/json")
+
+
+def page_cache_key(
+    endpoint: str,
+    query: str,
+    page: int,
+    filters: dict[str, Any] | None,
+    index_version: str,
+) -> tuple[Hashable, ...]:
+    """Build a cache key for a result page of one index version of its category.
+
+    The query is normalized the same way as the engine's embedding cache key.
+    Pages of a category reloaded with other content get other keys, so stale
+    pages are never served; they age out of the LRU.
+    """
+    return endpoint, query.strip().lower(), page, normalize_filters(filters), index_version
+
+
+def search_etag(key: tuple[Hashable, ...]) -> str:
+    """Strong ETag of a result page, from its (versioned) page cache key.
+
+    The page for a key only changes when the category's index does, so equal
+    ETags mean byte-identical pages, on any node that loaded the same data.
+    """
+    digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=12)
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """True if an ``If-None-Match`` header lists ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class PageCache:
+    """LRU cache of encoded result pages keyed by endpoint, query, filters and page."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._items: OrderedDict[Hashable, bytes] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> bytes | None:
+        if self.max_size <= 0:
+            return None
+        content = self._items.get(key)
+        if content is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return content
+
+    def put(self, key: Hashable, content: bytes) -> None:
+        if self.max_size <= 0:
+            return
+        self._items[key] = content
+        self._items.move_to_end(key)
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        self._items.clear()
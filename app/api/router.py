@@ -1,10 +1,25 @@
 """HTTP endpoints for semantic product search."""
 
-from typing import Any
-
-from fastapi import APIRouter, Request
-
+import asyncio
+import json
+import time
+from typing import Annotated, Any, Callable
+
+from fastapi import APIRouter, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, ValidationError
+
+from app.api.responses import (
+    encode_ids,
+    etag_matches,
+    json_response,
+    page_cache_key,
+    search_etag,
+)
 from app.api.schemas import (
+    BatchSearchItem,
+    BatchSearchRequest,
     FaucetSearchRequest,
     LengthFilterRequest,
     SearchRequest,
@@ -12,18 +27,73 @@ from app.api.schemas import (
     TileSearchRequest,
     WidthFilterRequest,
 )
+from app.config import settings
 from app.data.categories import ENDPOINTS
+from app.search.encode_queue import DeadlineExceeded, EncoderOverloaded
+from app.search.encoder import EncoderError
+from app.search.engine import CategoryNotFound, SearchResult, ServiceNotReady
 
-router = APIRouter()
 SEARCH_TAGS = ["Search"]
 PAGE_SIZE = 10
 
-
-def _paginate(items: list[str], page: int) -> list[str]:
+# Request model used for each combination of endpoint filters.
+FILTER_REQUEST_MODELS: dict[tuple[str, ...], type[SearchRequest]] = {
+    (): SearchRequest,
+    ("holeSpacingCompatibility",): FaucetSearchRequest,
+    ("locations",): TileSearchRequest,
+    ("hasTubSpout",): ShowerSystemSearchRequest,
+    ("lengthMax",): LengthFilterRequest,
+    ("widthMax",): WidthFilterRequest,
+}
+
+
+class SearchRoute(APIRoute):
+    """Route that decodes the body in one pass and returns handler bytes as-is.
+
+    The endpoint signature still declares the request model, so OpenAPI output
+    is the same as for a regular route. At request time the raw body is parsed
+    and validated by pydantic-core directly (``model_validate_json``) instead of
+    ``json.loads`` followed by model validation, and the handler's pre-encoded
+    ``Response`` skips ``response_model`` validation and serialization.
+    """
+
+    def get_route_handler(self) -> Callable:
+        endpoint = self.endpoint
+        model: type[BaseModel] = endpoint.request_model
+
+        async def route_handler(request: Request) -> Response:
+            raw = await request.body()
+            if not raw:
+                raise RequestValidationError(
+                    [
+                        {
+                            "type": "missing",
+                            "loc": ("body",),
+                            "msg": "Field required",
+                            "input": None,
+                        }
+                    ]
+                )
+            try:
+                body = model.model_validate_json(raw)
+            except ValidationError as exc:
+                errors = exc.errors(include_url=False)
+                for error in errors:
+                    error["loc"] = ("body", *error["loc"])
+                raise RequestValidationError(errors, body=raw) from None
+            return await endpoint(body, request)
+
+        return route_handler
+
+
+router = APIRouter(route_class=SearchRoute)
+
+
+def _paginate(result: SearchResult, page: int) -> list[str]:
     """Return a single page of IDs with fixed page size."""
     start = (page - 1) * PAGE_SIZE
     end = start + PAGE_SIZE
-    return items[start:end]
+    return result.product_ids(start, end)
 
 
 async def _search(
@@ -32,339 +102,231 @@ async def _search(
     query: str,
     page: int,
     filters: dict[str, Any] | None = None,
-) -> list[str]:
+) -> Response:
     """Run search for a specific endpoint category and optional filters."""
+    started = time.perf_counter()
+    capture = getattr(request.app.state, "query_capture", None)
+    stages: dict[str, Any] = {"page_cache": "miss"}
+    try:
+        return await _run_search(request, endpoint, query, page, filters, stages)
+    except Exception as exc:
+        stages["error"] = type(exc).__name__
+        raise
+    finally:
+        if capture is not None:
+            latency_ms = (time.perf_counter() - started) * 1000.0
+            reason = capture.should_capture(latency_ms)
+            if reason is not None:
+                stages["latency_ms"] = round(latency_ms, 3)
+                stages["reason"] = reason
+                capture.record(endpoint, query, page, filters, stages)
+
+
+async def _run_search(
+    request: Request,
+    endpoint: str,
+    query: str,
+    page: int,
+    filters: dict[str, Any] | None,
+    stages: dict[str, Any],
+) -> Response:
+    """Answer from the page cache or the engine, recording stages for capture.
+
+    Pages are cached per index version of their category, and only for
+    categories that have one (not the pgvector tier, whose rows are live).
+    Cacheable pages carry their ETag (see ``_conditional_search``).
+    """
+    deadline = time.monotonic() + settings.request_deadline_ms / 1000.0
+    page_cache = getattr(request.app.state, "page_cache", None)
     engine = request.app.state.engine
     category_id = ENDPOINTS[endpoint]["category_id"]
-    results = await engine.search(category_id, query, filters)
-    return _paginate(results, page)
-
-
-@router.post(
-    "/faucets",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search faucets",
-    description="Semantic faucet search with optional hole spacing compatibility filter.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_faucets(body: FaucetSearchRequest, request: Request) -> list[str]:
-    """Search faucet products."""
-    return await _search(
-        request,
-        "faucets",
-        body.query,
-        body.page,
-        {
-            "holeSpacingCompatibility": body.holeSpacingCompatibility,
-        },
-    )
-
-
-@router.post(
-    "/tiles",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search tiles",
-    description="Semantic tile search with optional location filters.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_tiles(body: TileSearchRequest, request: Request) -> list[str]:
-    """Search tile products."""
-    return await _search(
-        request,
-        "tiles",
-        body.query,
-        body.page,
-        {
-            "locations": body.locations,
-        },
-    )
-
-
-@router.post(
-    "/shower-systems",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search shower systems",
-    description="Semantic shower system search with optional tub spout filter.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_shower_systems(
-    body: ShowerSystemSearchRequest, request: Request
-) -> list[str]:
-    """Search shower system products."""
-    return await _search(
-        request,
-        "shower-systems",
-        body.query,
-        body.page,
-        {
-            "hasTubSpout": body.hasTubSpout,
-        },
-    )
-
-
-@router.post(
-    "/vanities",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search vanities",
-    description="Semantic vanity search with optional maximum length filter.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_vanities(body: LengthFilterRequest, request: Request) -> list[str]:
-    """Search vanity products."""
-    return await _search(
-        request,
-        "vanities",
-        body.query,
-        body.page,
-        {
-            "lengthMax": body.lengthMax,
-        },
-    )
-
-
-@router.post(
-    "/lightings",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search lightings",
-    description="Semantic lighting search with optional maximum length filter.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_lightings(body: LengthFilterRequest, request: Request) -> list[str]:
-    """Search lighting products."""
-    return await _search(
-        request,
-        "lightings",
-        body.query,
-        body.page,
-        {
-            "lengthMax": body.lengthMax,
-        },
-    )
-
-
-@router.post(
-    "/shower-glasses",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search shower glasses",
-    description="Semantic shower glass search with optional maximum length filter.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_shower_glasses(
-    body: LengthFilterRequest, request: Request
-) -> list[str]:
-    """Search shower glass products."""
-    return await _search(
-        request,
-        "shower-glasses",
-        body.query,
-        body.page,
-        {
-            "lengthMax": body.lengthMax,
-        },
-    )
-
-
-@router.post(
-    "/tub-doors",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search tub doors",
-    description="Semantic tub door search with optional maximum length filter.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_tub_doors(body: LengthFilterRequest, request: Request) -> list[str]:
-    """Search tub door products."""
-    return await _search(
-        request,
-        "tub-doors",
-        body.query,
-        body.page,
-        {
-            "lengthMax": body.lengthMax,
-        },
+    version = engine.index_version(category_id)
+    if page_cache is not None and version is not None:
+        key = page_cache_key(endpoint, query, page, filters, version)
+        content = page_cache.get(key)
+        if content is not None:
+            stages["page_cache"] = "hit"
+            return _with_validators(json_response(content), key)
+
+    searched = time.perf_counter()
+    result = await engine.search(category_id, query, filters, deadline)
+    stages["search_ms"] = round((time.perf_counter() - searched) * 1000.0, 3)
+    stages.update((name, round(ms, 3)) for name, ms in result.timings.items())
+    stages["mode"] = result.mode
+    stages["results"] = len(result)
+    content = encode_ids(_paginate(result, page))
+
+    if result.degraded:
+        # Not cached: a later request should get the full hybrid ranking.
+        stages["page_cache"] = "bypass"
+        response = json_response(content)
+        response.headers["X-Search-Mode"] = result.mode
+        return response
+
+    if result.version is None:
+        stages["page_cache"] = "bypass"
+        return json_response(content)
+    # The version of the data actually ranked (a lazy category may have been
+    # loaded, or reloaded, by this search).
+    key = page_cache_key(endpoint, query, page, filters, result.version)
+    if page_cache is not None:
+        page_cache.put(key, content)
+    return _with_validators(json_response(content), key)
+
+
+def _with_validators(response: Response, key: tuple) -> Response:
+    """Add the page's ETag and ``SEARCH_CACHE_CONTROL`` (with ``SEARCH_ETAGS``)."""
+    if settings.search_etags:
+        response.headers["ETag"] = search_etag(key)
+        if settings.search_cache_control:
+            response.headers["Cache-Control"] = settings.search_cache_control
+    return response
+
+
+async def _conditional_search(
+    request: Request,
+    endpoint: str,
+    query: str,
+    page: int,
+    filters: dict[str, Any] | None,
+) -> Response:
+    """Run ``_search`` honoring ``If-None-Match`` (``SEARCH_ETAGS``).
+
+    The ETag is derived from the versioned page cache key, so an
+    ``If-None-Match`` naming it is answered 304 before the page cache or the
+    engine are consulted. Degraded pages get ``no-store`` and no ETag, like
+    they bypass the page cache. Categories without a version (pgvector tier)
+    are not cacheable.
+    """
+    if settings.search_etags:
+        version = request.app.state.engine.index_version(
+            ENDPOINTS[endpoint]["category_id"]
+        )
+        if version is not None:
+            key = page_cache_key(endpoint, query, page, filters, version)
+            if etag_matches(request.headers.get("if-none-match"), search_etag(key)):
+                return _with_validators(Response(status_code=304), key)
+
+    response = await _search(request, endpoint, query, page, filters)
+    if settings.search_etags and "X-Search-Mode" in response.headers:
+        response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+def _batch_error(status: int, detail: Any) -> bytes:
+    return json.dumps(
+        {"status": status, "detail": detail}, separators=(",", ":")
+    ).encode("utf-8")
+
+
+async def _batch_item(request: Request, item: BatchSearchItem) -> bytes:
+    """Run one batch item; errors become that item's status, not the batch's."""
+    meta = ENDPOINTS.get(item.endpoint)
+    if meta is None:
+        return _batch_error(404, f"Unknown endpoint: {item.endpoint}")
+    filter_names = meta["filters"]
+    try:
+        body = FILTER_REQUEST_MODELS[tuple(filter_names)].model_validate(
+            item.model_dump()
+        )
+    except ValidationError as exc:
+        return _batch_error(
+            422, exc.errors(include_url=False, include_context=False)
+        )
+    filters = (
+        {name: getattr(body, name) for name in filter_names} if filter_names else None
     )
-
-
-@router.post(
-    "/mirrors",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search mirrors",
-    description="Semantic mirror search with optional maximum width filter.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_mirrors(body: WidthFilterRequest, request: Request) -> list[str]:
-    """Search mirror products."""
-    return await _search(
-        request,
-        "mirrors",
-        body.query,
-        body.page,
-        {
-            "widthMax": body.widthMax,
-        },
+    try:
+        response = await _search(request, item.endpoint, body.query, body.page, filters)
+    except CategoryNotFound as exc:
+        return _batch_error(404, str(exc))
+    except (EncoderOverloaded, DeadlineExceeded, EncoderError, ServiceNotReady) as exc:
+        return _batch_error(503, str(exc))
+    mode = response.headers.get("X-Search-Mode")
+    extra = f',"mode":"{mode}"'.encode("utf-8") if mode else b""
+    return b'{"status":200,"ids":' + response.body + extra + b"}"
+
+
+async def search_batch(body: BatchSearchRequest, request: Request) -> Response:
+    """Run the batch's searches concurrently and answer them in request order."""
+    items = await asyncio.gather(*(_batch_item(request, item) for item in body.requests))
+    return json_response(b"[" + b",".join(items) + b"]")
+
+
+search_batch.request_model = BatchSearchRequest
+
+
+def _make_search_handler(endpoint: str) -> Callable:
+    """Build the handler for one endpoint from its ``ENDPOINTS`` metadata."""
+    filter_names = ENDPOINTS[endpoint]["filters"]
+    model = FILTER_REQUEST_MODELS[tuple(filter_names)]
+
+    async def handler(body: model, request: Request) -> Response:  # type: ignore[valid-type]
+        filters = (
+            {name: getattr(body, name) for name in filter_names}
+            if filter_names
+            else None
+        )
+        return await _conditional_search(request, endpoint, body.query, body.page, filters)
+
+    handler.__name__ = "search_" + endpoint.replace("-", "_")
+    handler.request_model = model
+    return handler
+
+
+def _make_get_handler(endpoint: str) -> Callable:
+    """Build the GET form of an endpoint: the request fields as query parameters.
+
+    Served by a regular ``APIRoute`` (``SearchRoute`` decodes JSON bodies);
+    list filters repeat the parameter, e.g. ``?locations=wall&locations=floor``.
+    """
+    post_handler = _make_search_handler(endpoint)
+    model = post_handler.request_model
+
+    async def handler(
+        request: Request,
+        body: Annotated[model, Query()],  # type: ignore[valid-type]
+    ) -> Response:
+        return await post_handler(body, request)
+
+    handler.__name__ = post_handler.__name__ + "_get"
+    return handler
+
+
+for _endpoint, _meta in ENDPOINTS.items():
+    router.add_api_route(
+        f"/{_endpoint}",
+        _make_search_handler(_endpoint),
+        methods=["POST"],
+        tags=SEARCH_TAGS,
+        response_model=list[str],
+        summary=_meta["summary"],
+        description=_meta["description"],
+        response_description="Ordered list of matching product IDs.",
     )
-
-
-@router.post(
-    "/tubs",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search tubs",
-    description="Semantic tub search.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_tubs(body: SearchRequest, request: Request) -> list[str]:
-    """Search tub products."""
-    return await _search(request, "tubs", body.query, body.page)
-
-
-@router.post(
-    "/toilets",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search toilets",
-    description="Semantic toilet search.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_toilets(body: SearchRequest, request: Request) -> list[str]:
-    """Search toilet products."""
-    return await _search(request, "toilets", body.query, body.page)
-
-
-@router.post(
-    "/paints",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search paints",
-    description="Semantic paint search.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_paints(body: SearchRequest, request: Request) -> list[str]:
-    """Search paint products."""
-    return await _search(request, "paints", body.query, body.page)
-
-
-@router.post(
-    "/lvps",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search LVPs",
-    description="Semantic LVP flooring search.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_lvps(body: SearchRequest, request: Request) -> list[str]:
-    """Search LVP products."""
-    return await _search(request, "lvps", body.query, body.page)
-
-
-@router.post(
-    "/tub-fillers",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search tub fillers",
-    description="Semantic tub filler search.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_tub_fillers(body: SearchRequest, request: Request) -> list[str]:
-    """Search tub filler products."""
-    return await _search(request, "tub-fillers", body.query, body.page)
-
-
-@router.post(
-    "/towel-bars",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search towel bars",
-    description="Semantic towel bar search.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_towel_bars(body: SearchRequest, request: Request) -> list[str]:
-    """Search towel bar products."""
-    return await _search(request, "towel-bars", body.query, body.page)
-
-
-@router.post(
-    "/wallpapers",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search wallpapers",
-    description="Semantic wallpaper search.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_wallpapers(body: SearchRequest, request: Request) -> list[str]:
-    """Search wallpaper products."""
-    return await _search(request, "wallpapers", body.query, body.page)
-
-
-@router.post(
-    "/toilet-paper-holders",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search toilet paper holders",
-    description="Semantic toilet paper holder search.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_toilet_paper_holders(
-    body: SearchRequest, request: Request
-) -> list[str]:
-    """Search toilet paper holder products."""
-    return await _search(request, "toilet-paper-holders", body.query, body.page)
-
-
-@router.post(
-    "/robe-hooks",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search robe hooks",
-    description="Semantic robe hook search.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_robe_hooks(body: SearchRequest, request: Request) -> list[str]:
-    """Search robe hook products."""
-    return await _search(request, "robe-hooks", body.query, body.page)
-
-
-@router.post(
-    "/towel-rings",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search towel rings",
-    description="Semantic towel ring search.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_towel_rings(body: SearchRequest, request: Request) -> list[str]:
-    """Search towel ring products."""
-    return await _search(request, "towel-rings", body.query, body.page)
-
-
-@router.post(
-    "/shelves",
-    tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search shelves",
-    description="Semantic shelf search.",
-    response_description="Ordered list of matching product IDs.",
-)
-async def search_shelves(body: SearchRequest, request: Request) -> list[str]:
-    """Search shelf products."""
-    return await _search(request, "shelves", body.query, body.page)
-
-
-@router.post(
-    "/flooring",
+    if settings.search_get_routes:
+        router.add_api_route(
+            f"/{_endpoint}",
+            _make_get_handler(_endpoint),
+            methods=["GET"],
+            tags=SEARCH_TAGS,
+            response_model=list[str],
+            summary=_meta["summary"] + " (GET)",
+            description=_meta["description"] + " Cacheable GET form of the POST endpoint.",
+            response_description="Ordered list of matching product IDs.",
+            route_class_override=APIRoute,
+        )
+
+router.add_api_route(
+    "/batch",
+    search_batch,
+    methods=["POST"],
     tags=SEARCH_TAGS,
-    response_model=list[str],
-    summary="Search flooring",
-    description="Semantic flooring search across configured flooring category.",
-    response_description="Ordered list of matching product IDs.",
+    response_model=list[dict[str, Any]],
+    summary="Search several endpoints at once",
+    description=(
+        "Runs up to BATCH_MAX_REQUESTS searches concurrently. Each result has "
+        "a status; successful ones carry the page of IDs under ids."
+    ),
+    response_description="One result per request, in request order.",
 )
-async def search_flooring(body: SearchRequest, request: Request) -> list[str]:
-    """Search flooring products."""
-    return await _search(request, "flooring", body.query, body.page)
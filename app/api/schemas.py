@@ -2,7 +2,9 @@
 
 from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.config import settings
 
 
 class SearchRequest(BaseModel):
@@ -69,3 +71,39 @@ class WidthFilterRequest(SearchRequest):
         description="Optional maximum width value used by width-aware categories.",
         examples=[36.0],
     )
+
+
+class BatchSearchItem(BaseModel):
+    """One search of a batch: the endpoint name plus that endpoint's fields.
+
+    The other fields are validated per item against the endpoint's request
+    model, so one invalid item does not fail the whole batch.
+    """
+
+    model_config = ConfigDict(extra="allow")
+
+    endpoint: str = Field(
+        ...,
+        description="Search endpoint name, e.g. faucets or tiles.",
+        examples=["faucets"],
+    )
+
+
+class BatchSearchRequest(BaseModel):
+    """Several searches answered in one round trip."""
+
+    requests: List[BatchSearchItem] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.batch_max_requests,
+        description=(
+            "Searches to run. Each item takes the fields of its endpoint's "
+            "request (filters included)."
+        ),
+        examples=[
+            [
+                {"endpoint": "faucets", "query": "matte black faucet"},
+                {"endpoint": "tiles", "query": "white subway tile", "locations": ["wall"]},
+            ]
+        ],
+    )
@@ -0,0 +1,62 @@
+"""Typeahead endpoints answered from in-memory prefix indexes."""
+
+import json
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+from app.api.responses import json_response
+from app.data.categories import ENDPOINTS
+
+router = APIRouter()
+SUGGEST_TAGS = ["Suggest"]
+MAX_LIMIT = 50
+
+
+@router.get(
+    "/suggest",
+    tags=SUGGEST_TAGS,
+    response_model=list[dict[str, str | float]],
+    summary="Suggest product names",
+    description="Prefix completion over product names of all categories.",
+    response_description="Completions with the endpoint they belong to and their score.",
+)
+async def suggest_all(
+    request: Request,
+    q: str = Query(..., min_length=1, description="Prefix typed so far."),
+    limit: int = Query(10, ge=1, le=MAX_LIMIT, description="Maximum completions."),
+) -> Response:
+    """Suggest product names across all categories, best score first.
+
+    The score is the completion's prior; the shard router merges shards'
+    lists by it.
+    """
+    engine = request.app.state.engine
+    endpoint_by_category = {meta["category_id"]: name for name, meta in ENDPOINTS.items()}
+    results = engine.suggest_all(list(endpoint_by_category), q, limit)
+    content = [
+        {"suggestion": name, "endpoint": endpoint_by_category[category_id], "score": prior}
+        for category_id, name, prior in results
+    ]
+    return json_response(json.dumps(content, separators=(",", ":")).encode("utf-8"))
+
+
+@router.get(
+    "/suggest/{endpoint}",
+    tags=SUGGEST_TAGS,
+    response_model=list[str],
+    summary="Suggest product names in a category",
+    description="Prefix completion over product names of one search endpoint.",
+    response_description="Ordered list of completions.",
+)
+async def suggest_category(
+    endpoint: str,
+    request: Request,
+    q: str = Query(..., min_length=1, description="Prefix typed so far."),
+    limit: int = Query(10, ge=1, le=MAX_LIMIT, description="Maximum completions."),
+) -> Response:
+    """Suggest product names within one endpoint's category."""
+    if endpoint not in ENDPOINTS:
+        raise HTTPException(status_code=404, detail=f"Unknown endpoint: {endpoint}")
+    engine = request.app.state.engine
+    results = await engine.suggest(ENDPOINTS[endpoint]["category_id"], q, limit)
+    return json_response(json.dumps(results, separators=(",", ":")).encode("utf-8"))
@@ -14,6 +14,49 @@ class Settings(BaseSettings):
     db_pool_min_size: int = 1
     db_pool_max_size: int = 5
     embedding_cache_size: int = 2000
+    ranking_cache_mb: int = 64
+    response_cache_size: int = 5000
+    search_etags: bool = True
+    search_cache_control: str = ""
+    search_get_routes: bool = False
+    search_workers: int = 4
+    search_queue_size: int = 64
+    score_batch_window_ms: float = 2.0
+    score_batch_max: int = 32
+    score_batch_min_rows: int = 50000
+    batch_max_requests: int = 50
+    encode_queue_max_depth: int = 32
+    encode_wait_budget_ms: int = 2000
+    request_deadline_ms: int = 10000
+    lexical_fallback: bool = True
+    degrade_queue_depth: int = 8
+    suggest_max_entries_per_category: int = 50000
+    subindex_max_mb_per_category: int = 256
+    description_embeddings: bool = False
+    description_weight: float = 0.3
+    description_dims: int = 256
+    workers: int = 1
+    encoder_socket: str | None = None
+    encoder_timeout_ms: int = 5000
+    encoder_batch_size: int = 32
+    encoder_batch_window_ms: float = 2.0
+    pin_workers: bool = False
+    shard_categories: str = ""
+    router_shards: str = ""
+    router_timeout_ms: int = 10000
+    router_health_interval_ms: int = 2000
+    lazy_loading: bool = False
+    preload_categories: str = ""
+    index_memory_budget_mb: int = 0
+    pgvector_categories: str = ""
+    pgvector_min_products: int = 0
+    pgvector_candidates: int = 200
+    pgvector_ef_search: int = 200
+    capture_path: str | None = None
+    capture_sample_rate: float = 0.01
+    capture_slow_ms: float = 500.0
+    capture_max_mb: int = 100
+    capture_backups: int = 5
 
     faucets_category_id: str
     vanities_category_id: str
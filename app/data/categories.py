@@ -1,84 +1,156 @@
 from app.config import settings
 
+# Order matches the order of endpoints in the OpenAPI docs.
 ENDPOINTS = {
     "faucets": {
         "category_id": settings.faucets_category_id,
         "filters": ["holeSpacingCompatibility"],
-    },
-    "vanities": {
-        "category_id": settings.vanities_category_id,
-        "filters": ["lengthMax"],
-    },
-    "lightings": {
-        "category_id": settings.lightings_category_id,
-        "filters": ["lengthMax"],
+        "summary": "Search faucets",
+        "description": (
+            "Semantic faucet search with optional hole spacing compatibility filter."
+        ),
     },
     "tiles": {
         "category_id": settings.tiles_category_id,
         "filters": ["locations"],
+        "summary": "Search tiles",
+        "description": "Semantic tile search with optional location filters.",
     },
     "shower-systems": {
         "category_id": settings.shower_systems_category_id,
         "filters": ["hasTubSpout"],
+        "summary": "Search shower systems",
+        "description": "Semantic shower system search with optional tub spout filter.",
     },
-    "tubs": {
-        "category_id": settings.tubs_category_id,
-        "filters": [],
+    "vanities": {
+        "category_id": settings.vanities_category_id,
+        "filters": ["lengthMax"],
+        "summary": "Search vanities",
+        "description": "Semantic vanity search with optional maximum length filter.",
+    },
+    "lightings": {
+        "category_id": settings.lightings_category_id,
+        "filters": ["lengthMax"],
+        "summary": "Search lightings",
+        "description": "Semantic lighting search with optional maximum length filter.",
     },
     "shower-glasses": {
         "category_id": settings.shower_glasses_category_id,
         "filters": ["lengthMax"],
+        "summary": "Search shower glasses",
+        "description": (
+            "Semantic shower glass search with optional maximum length filter."
+        ),
+    },
+    "tub-doors": {
+        "category_id": settings.tub_doors_category_id,
+        "filters": ["lengthMax"],
+        "summary": "Search tub doors",
+        "description": "Semantic tub door search with optional maximum length filter.",
     },
     "mirrors": {
         "category_id": settings.mirrors_category_id,
         "filters": ["widthMax"],
+        "summary": "Search mirrors",
+        "description": "Semantic mirror search with optional maximum width filter.",
+    },
+    "tubs": {
+        "category_id": settings.tubs_category_id,
+        "filters": [],
+        "summary": "Search tubs",
+        "description": "Semantic tub search.",
     },
     "toilets": {
         "category_id": settings.toilets_category_id,
         "filters": [],
+        "summary": "Search toilets",
+        "description": "Semantic toilet search.",
     },
     "paints": {
         "category_id": settings.paints_category_id,
         "filters": [],
+        "summary": "Search paints",
+        "description": "Semantic paint search.",
     },
     "lvps": {
         "category_id": settings.lvps_category_id,
         "filters": [],
+        "summary": "Search LVPs",
+        "description": "Semantic LVP flooring search.",
     },
     "tub-fillers": {
         "category_id": settings.tub_fillers_category_id,
         "filters": [],
+        "summary": "Search tub fillers",
+        "description": "Semantic tub filler search.",
     },
     "towel-bars": {
         "category_id": settings.towel_bars_category_id,
         "filters": [],
+        "summary": "Search towel bars",
+        "description": "Semantic towel bar search.",
     },
     "wallpapers": {
         "category_id": settings.wallpapers_category_id,
         "filters": [],
+        "summary": "Search wallpapers",
+        "description": "Semantic wallpaper search.",
     },
     "toilet-paper-holders": {
         "category_id": settings.toilet_paper_holders_category_id,
         "filters": [],
+        "summary": "Search toilet paper holders",
+        "description": "Semantic toilet paper holder search.",
     },
     "robe-hooks": {
         "category_id": settings.robe_hooks_category_id,
         "filters": [],
+        "summary": "Search robe hooks",
+        "description": "Semantic robe hook search.",
     },
     "towel-rings": {
         "category_id": settings.towel_rings_category_id,
         "filters": [],
-    },
-    "tub-doors": {
-        "category_id": settings.tub_doors_category_id,
-        "filters": ["lengthMax"],
+        "summary": "Search towel rings",
+        "description": "Semantic towel ring search.",
     },
     "shelves": {
         "category_id": settings.shelves_category_id,
         "filters": [],
+        "summary": "Search shelves",
+        "description": "Semantic shelf search.",
     },
     "flooring": {
         "category_id": settings.flooring_category_id,
         "filters": [],
+        "summary": "Search flooring",
+        "description": "Semantic flooring search across configured flooring category.",
     },
 }
+
+
+def resolve_categories(value: str) -> list[str]:
+    """Category IDs for a comma-separated list of endpoint names or category IDs."""
+    result = []
+    for name in value.split(","):
+        name = name.strip()
+        if name:
+            meta = ENDPOINTS.get(name)
+            result.append(meta["category_id"] if meta else name)
+    return result
+
+
+def shard_category_ids() -> set[str] | None:
+    """Category IDs this node serves (``SHARD_CATEGORIES``), or None for all."""
+    category_ids = resolve_categories(settings.shard_categories)
+    return set(category_ids) if category_ids else None
+
+
+def served_endpoints() -> list[str]:
+    """Endpoints whose category this node serves, in ``ENDPOINTS`` order."""
+    shard = shard_category_ids()
+    return [
+        name
+        for name, meta in ENDPOINTS.items()
+        if shard is None or meta["category_id"] in shard
+    ]
@@ -0,0 +1,177 @@
+"""On-demand category loading under a memory budget (``LAZY_LOADING``)."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable
+
+from app.config import settings
+from app.data import db
+from app.data.categories import ENDPOINTS, shard_category_ids
+from app.data.loader import (
+    build_flooring,
+    load_category,
+    log_loaded,
+    plan_tiers,
+    serves_flooring,
+)
+from app.search.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryCache:
+    """Keep only recently used categories of ``index`` in memory.
+
+    Only categories served by ``ENDPOINTS`` (and assigned to this shard) are
+    known. A known category is
+    loaded on its first search, concurrent first searches sharing one load.
+    After each load the least recently used categories are evicted until the
+    resident size fits ``budget_bytes`` (0 means no limit); a category larger
+    than the whole budget is still loaded, alone. An evicted category is
+    reloaded from the DB the next time it is searched. ``on_evict`` is called
+    with the ID of every evicted category.
+    """
+
+    def __init__(
+        self,
+        index: dict[str, dict[str, Any]],
+        budget_bytes: int,
+        on_evict: Callable[[str], None] | None = None,
+    ) -> None:
+        self.index = index
+        self.budget_bytes = budget_bytes
+        self.on_evict = on_evict
+        self.known: set[str] = set()
+        self._last_used: dict[str, float] = {}
+        self._flight = SingleFlight()
+        self.loads = 0
+        self.evictions = 0
+
+    async def plan(self, vector_categories: dict) -> None:
+        """Find the loadable categories; pgvector-tier ones go to ``vector_categories``."""
+        counts = await plan_tiers(db.get_pool(), vector_categories)
+        shard = shard_category_ids()
+        self.known = {
+            meta["category_id"]
+            for meta in ENDPOINTS.values()
+            if meta["category_id"] in counts
+            and (shard is None or meta["category_id"] in shard)
+        }
+        if serves_flooring() and settings.flooring_category_id not in vector_categories:
+            self.known.add(settings.flooring_category_id)
+        logger.info(
+            "Lazy loading: %d categories known, budget %s",
+            len(self.known),
+            f"{self.budget_bytes / 1024 / 1024:.0f} MB" if self.budget_bytes else "none",
+        )
+
+    async def preload(self, category_ids: list[str]) -> None:
+        """Load ``category_ids`` in order until one does not fit in the budget.
+
+        Preloading never evicts: the first category that does not fit is
+        dropped and the rest are left to load on demand.
+        """
+        for category_id in category_ids:
+            if category_id in self.known and category_id not in self.index:
+                if not await self._load(category_id, evict=False):
+                    logger.info("Memory budget reached; stopped preloading")
+                    break
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(data["resident_bytes"] for data in self.index.values())
+
+    def knows(self, category_id: str) -> bool:
+        return category_id in self.known
+
+    async def ensure(self, category_id: str) -> dict[str, Any] | None:
+        """Make a known category resident, mark it as recently used and return it.
+
+        Returns None for unknown categories and ones without products. The
+        data is returned from the load itself, so a later eviction (by another
+        category's load) cannot make it disappear under the caller.
+        """
+        data = self.index.get(category_id)
+        if data is not None:
+            self._last_used[category_id] = time.monotonic()
+            return data
+        if category_id not in self.known:
+            return None
+
+        async def load() -> dict[str, Any] | None:
+            await self._load(category_id)
+            # No await since _load published the category: still resident.
+            return self.index.get(category_id)
+
+        return await self._flight.do(category_id, load)
+
+    async def _load(self, category_id: str, evict: bool = True) -> bool:
+        """Load a category; return False if it did not fit and ``evict`` is off."""
+        if category_id == settings.flooring_category_id:
+            data = await self._load_flooring()
+        else:
+            data = await load_category(db.get_pool(), category_id)
+        if data is None:
+            self.known.discard(category_id)
+            return True
+        if evict:
+            self._evict(data["resident_bytes"])
+        elif (
+            self.budget_bytes
+            and self.index
+            and self.resident_bytes + data["resident_bytes"] > self.budget_bytes
+        ):
+            return False
+        self.index[category_id] = data
+        self._last_used[category_id] = time.monotonic()
+        self.loads += 1
+        log_loaded(category_id, data)
+        return True
+
+    async def _load_flooring(self) -> dict | None:
+        """Build flooring from resident LVPs/tiles, loading missing ones transiently."""
+        started = time.perf_counter()
+        sources = {}
+        for source in (settings.lvps_category_id, settings.tiles_category_id):
+            data = self.index.get(source)
+            if data is None:
+                data = await load_category(db.get_pool(), source)
+            if data is not None:
+                sources[source] = data
+        flooring = await asyncio.to_thread(build_flooring, sources)
+        if flooring is not None:
+            # Include the time spent loading the sources.
+            flooring["load_seconds"] = time.perf_counter() - started
+        return flooring
+
+    def _evict(self, incoming: int) -> None:
+        """Drop least recently used categories until ``incoming`` bytes fit."""
+        if not self.budget_bytes:
+            return
+        resident = self.resident_bytes
+        for category_id in sorted(self.index, key=lambda c: self._last_used.get(c, 0.0)):
+            if resident + incoming <= self.budget_bytes:
+                break
+            data = self.index.pop(category_id)
+            self._last_used.pop(category_id, None)
+            resident -= data["resident_bytes"]
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(category_id)
+            logger.info(
+                "Evicted category %s (%.1f MB)",
+                category_id,
+                data["resident_bytes"] / 1024 / 1024,
+            )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "known": len(self.known),
+            "resident": len(self.index),
+            "resident_mb": round(self.resident_bytes / 1024 / 1024, 1),
+            "budget_mb": round(self.budget_bytes / 1024 / 1024, 1),
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "loading": self._flight.in_flight,
+        }
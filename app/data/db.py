@@ -1,5 +1,6 @@
 import asyncpg
 from app.config import settings
+from app.data import vector_store
 
 pool: asyncpg.Pool | None = None
 
@@ -14,6 +15,7 @@ async def connect(database_url: str):
         url,
         min_size=settings.db_pool_min_size,
         max_size=settings.db_pool_max_size,
+        server_settings=vector_store.server_settings(),
     )
 
 
@@ -21,6 +23,7 @@ async def close():
     global pool
     if pool:
         await pool.close()
+        pool = None
 
 
 def get_pool() -> asyncpg.Pool:
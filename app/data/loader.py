@@ -1,189 +1,520 @@
+import asyncio
+import hashlib
 import logging
+import time
+from typing import Any, Callable
+
 import numpy as np
 import asyncpg
 from app.config import settings
+from app.data.categories import ENDPOINTS, shard_category_ids
+from app.data.schema import DIMENSION_TABLES, FAUCET_FLAG_COLUMNS, TILE_FLAG_COLUMNS
+from app.data.vector_store import VectorCategory, configured_categories
+from app.search.columns import IdColumn, NameColumn, uuid_bytes
+from app.search.filters import build_subindexes
+from app.search.lexical import BM25Index
+from app.search.name_index import NameIndex
+from app.search.ngram import TrigramIndex
+from app.search.suggest import PrefixIndex
 
 logger = logging.getLogger(__name__)
 
 
-async def load_all(pool: asyncpg.Pool) -> dict:
-    index = {}
+def _description_half(rows: list, names: np.ndarray, dims: int) -> np.ndarray:
+    """Description embeddings cut to their first ``dims`` components, renormalized.
 
-    rows = await pool.fetch("""
-        SELECT p.id, p.category_id, p.name,
-               pad.jina_v2_clip_name_embedding::text
-        FROM product p
-        JOIN product_ai_data pad ON pad.product_id = p.id
-    """)
+    Products without a description embedding use their name embedding, so
+    the fused score falls back to name similarity for them.
+    """
+    half = names[:, :dims].copy()
+    for i, row in enumerate(rows):
+        value = row["jina_v2_clip_description_embedding"]
+        if value is not None:
+            half[i] = np.array(eval(value), dtype=np.float32)[:dims]
+    norms = np.linalg.norm(half, axis=1, keepdims=True)
+    return half / np.where(norms == 0, 1, norms)
 
-    categories = {}
+
+def _build_category(rows: list) -> dict:
+    """Build a category's columns from its product rows.
+
+    Each row of ``embeddings`` is the name embedding, followed by the
+    ``description_dims`` description components when they are loaded.
+    """
+    embeddings = []
     for row in rows:
-        cat_id = str(row["category_id"])
-        if cat_id not in categories:
-            categories[cat_id] = {"ids": [], "embeddings": [], "names": []}
-        categories[cat_id]["ids"].append(str(row["id"]))
-        categories[cat_id]["embeddings"].append(
+        embeddings.append(
             np.array(eval(row["jina_v2_clip_name_embedding"]), dtype=np.float32)
         )
-        categories[cat_id]["names"].append(row["name"].lower())
+    embeddings = np.array(embeddings)
+
+    description_dims = 0
+    if settings.description_embeddings:
+        description_dims = settings.description_dims or embeddings.shape[1]
+        description_dims = min(description_dims, embeddings.shape[1])
+        embeddings = np.hstack(
+            [embeddings, _description_half(rows, embeddings, description_dims)]
+        )
 
-    for cat_id, data in categories.items():
-        index[cat_id] = {
-            "product_ids": data["ids"],
-            "embeddings": np.array(data["embeddings"]),
-            "names": data["names"],
-            "filters": {},
-            "dimensions": {},
-        }
+    return {
+        "product_ids": IdColumn.from_values(row["id"] for row in rows),
+        "embeddings": embeddings,
+        "description_dims": description_dims,
+        "names": NameColumn.from_strings(row["name"].lower() for row in rows),
+        "filters": {},
+        "dimensions": {},
+    }
 
-    logger.info(
-        "Loaded embeddings: %d products in %d categories", len(rows), len(categories)
-    )
-
-    faucet_rows = await pool.fetch("""
-        SELECT product_id,
-               single_hole_spacing_compatible,
-               four_inch_hole_spacing_compatible,
-               eight_inch_hole_spacing_compatible
-        FROM faucet
-    """)
-    faucet_cat = None
-    for cat_id, data in index.items():
-        for row in faucet_rows:
-            pid = str(row["product_id"])
-            if pid in data["product_ids"]:
-                faucet_cat = cat_id
-                break
-        if faucet_cat:
-            break
-
-    if faucet_cat:
-        for row in faucet_rows:
-            pid = str(row["product_id"])
-            index[faucet_cat]["filters"][pid] = {
-                "single_hole": row["single_hole_spacing_compatible"] or False,
-                "widespread": row["eight_inch_hole_spacing_compatible"] or False,
-                "centerset": row["four_inch_hole_spacing_compatible"] or False,
-            }
-    logger.info("Loaded faucet filters: %d rows", len(faucet_rows))
-
-    tile_rows = await pool.fetch("""
-        SELECT product_id,
-               available_for_wall,
-               available_for_floor,
-               available_for_shower_wall,
-               available_for_shower_floor
-        FROM tile
-    """)
-    tile_cat = None
-    for cat_id, data in index.items():
-        for row in tile_rows:
-            if str(row["product_id"]) in data["product_ids"]:
-                tile_cat = cat_id
-                break
-        if tile_cat:
-            break
-
-    if tile_cat:
-        for row in tile_rows:
-            pid = str(row["product_id"])
-            index[tile_cat]["filters"][pid] = {
-                "wall": row["available_for_wall"] or False,
-                "floor": row["available_for_floor"] or False,
-                "shower_wall": row["available_for_shower_wall"] or False,
-                "shower_floor": row["available_for_shower_floor"] or False,
-            }
-    logger.info("Loaded tile filters: %d rows", len(tile_rows))
-
-    shower_rows = await pool.fetch("""
-        SELECT product_id, has_tub_spout
-        FROM shower_system
-    """)
-    shower_cat = None
-    for cat_id, data in index.items():
-        for row in shower_rows:
-            if str(row["product_id"]) in data["product_ids"]:
-                shower_cat = cat_id
-                break
-        if shower_cat:
-            break
-
-    if shower_cat:
-        for row in shower_rows:
-            pid = str(row["product_id"])
-            index[shower_cat]["filters"][pid] = {
-                "has_tub_spout": row["has_tub_spout"] or False,
-            }
-    logger.info("Loaded shower system filters: %d rows", len(shower_rows))
-
-    dimension_tables = ["vanity", "mirror", "lighting", "shower_glass", "tub_door"]
-    total_dims = 0
-
-    for table in dimension_tables:
-        dim_rows = await pool.fetch(f"""
+
+def _build_search_indexes(data: dict) -> None:
+    data["trigrams"] = TrigramIndex(data["names"])
+    data["bm25"] = BM25Index(data["names"])
+    data["name_index"] = NameIndex(data["names"])
+    data["prefix_index"] = PrefixIndex(
+        data["names"], settings.suggest_max_entries_per_category
+    )
+
+
+def _flag_value(value: Any) -> int:
+    return 1 if value else 0
+
+
+def _dimension_value(value: Any) -> float:
+    return float(value) if value else np.nan
+
+
+def _set_columns(
+    target: dict,
+    row_map: dict[bytes, int],
+    size: int,
+    records: list,
+    columns: dict[str, str],
+    dtype: type,
+    convert: Callable[[Any], float],
+    missing: float,
+    combine: np.ufunc | None = None,
+) -> None:
+    """Scatter per-product DB values into per-row arrays of one category.
+
+    ``columns`` maps an index column name to the DB field it is read from.
+    Rows without a DB record keep ``missing``. A product with several
+    records keeps its last value, or ``combine`` of all of them (including
+    values set by earlier calls) when given.
+    """
+    rows = []
+    values = {name: [] for name in columns}
+    for record in records:
+        row = row_map.get(uuid_bytes(record["product_id"]))
+        if row is None:
+            continue
+        rows.append(row)
+        for name, field in columns.items():
+            values[name].append(record[field])
+    if not rows:
+        return
+
+    for name, column_values in values.items():
+        column = target.get(name)
+        if column is None:
+            column = target[name] = np.full(size, missing, dtype=dtype)
+        converted = np.array([convert(v) for v in column_values], dtype=dtype)
+        if combine is None:
+            column[rows] = converted
+        else:
+            combine.at(column, rows, converted)
+
+
+async def _load_filters(pool: asyncpg.Pool, category_id: str, data: dict) -> None:
+    """Load filter flags and dimensions as per-row columns.
+
+    Flags are int8 (1 true, 0 false, -1 no record); dimensions are float64
+    with NaN for unknown values. A product with several renders keeps the
+    largest known length and width, so ``lengthMax``/``widthMax`` reject it
+    if any render exceeds the limit, as the pgvector tier does.
+    """
+    row_map = data["product_ids"].row_map()
+    size = len(row_map)
+
+    faucet_rows = await pool.fetch(
+        """
+        SELECT f.product_id,
+               f.single_hole_spacing_compatible,
+               f.four_inch_hole_spacing_compatible,
+               f.eight_inch_hole_spacing_compatible
+        FROM faucet f
+        JOIN product p ON p.id = f.product_id
+        WHERE p.category_id = $1
+        """,
+        category_id,
+    )
+    _set_columns(
+        data["filters"],
+        row_map,
+        size,
+        faucet_rows,
+        FAUCET_FLAG_COLUMNS,
+        np.int8,
+        _flag_value,
+        -1,
+    )
+
+    tile_rows = await pool.fetch(
+        """
+        SELECT t.product_id,
+               t.available_for_wall,
+               t.available_for_floor,
+               t.available_for_shower_wall,
+               t.available_for_shower_floor
+        FROM tile t
+        JOIN product p ON p.id = t.product_id
+        WHERE p.category_id = $1
+        """,
+        category_id,
+    )
+    _set_columns(
+        data["filters"],
+        row_map,
+        size,
+        tile_rows,
+        TILE_FLAG_COLUMNS,
+        np.int8,
+        _flag_value,
+        -1,
+    )
+
+    shower_rows = await pool.fetch(
+        """
+        SELECT s.product_id, s.has_tub_spout
+        FROM shower_system s
+        JOIN product p ON p.id = s.product_id
+        WHERE p.category_id = $1
+        """,
+        category_id,
+    )
+    _set_columns(
+        data["filters"],
+        row_map,
+        size,
+        shower_rows,
+        {"has_tub_spout": "has_tub_spout"},
+        np.int8,
+        _flag_value,
+        -1,
+    )
+
+    for table in DIMENSION_TABLES:
+        dim_rows = await pool.fetch(
+            f"""
             SELECT t.product_id, rp.length, rp.width
             FROM {table} t
             JOIN renderable_product rp ON rp.id = t.render_id
-        """)
-
-        dim_cat = None
-        for cat_id, data in index.items():
-            for row in dim_rows:
-                if str(row["product_id"]) in data["product_ids"]:
-                    dim_cat = cat_id
-                    break
-            if dim_cat:
-                break
-
-        if dim_cat:
-            for row in dim_rows:
-                pid = str(row["product_id"])
-                index[dim_cat]["dimensions"][pid] = {
-                    "length": float(row["length"]) if row["length"] else None,
-                    "width": float(row["width"]) if row["width"] else None,
-                }
-        total_dims += len(dim_rows)
+            JOIN product p ON p.id = t.product_id
+            WHERE p.category_id = $1
+            """,
+            category_id,
+        )
+        _set_columns(
+            data["dimensions"],
+            row_map,
+            size,
+            dim_rows,
+            {"length": "length", "width": "width"},
+            np.float64,
+            _dimension_value,
+            np.nan,
+            combine=np.fmax,
+        )
 
-    logger.info(
-        "Loaded dimensions: %d rows from %d tables",
-        total_dims,
-        len(dimension_tables),
+
+def category_nbytes(data: dict) -> int:
+    """Approximate resident size of one category's index, in bytes."""
+    size = data["embeddings"].nbytes + data["product_ids"].nbytes + data["names"].nbytes
+    size += sum(column.nbytes for column in data["filters"].values())
+    size += sum(column.nbytes for column in data["dimensions"].values())
+    for name in ("trigrams", "bm25", "name_index", "prefix_index"):
+        if name in data:
+            size += data[name].nbytes
+    for sub in data.get("subindexes", {}).values():
+        size += sub.rows.nbytes
+        if sub.embeddings is not None:
+            size += sub.embeddings.nbytes
+    return size
+
+
+def index_version(data: dict) -> str:
+    """Fingerprint of the category content that rankings depend on.
+
+    Covers IDs, names, filter and dimension columns and the raw embedding
+    bytes, in row order. Rows are loaded in ID order and the embeddings are
+    parsed from their text form, so nodes that load the same rows hash the
+    same bytes on any CPU and replicas hand out the same ETags.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    data["product_ids"].digest(digest)
+    data["names"].digest(digest)
+    embeddings = data["embeddings"]
+    digest.update(repr((embeddings.shape, data.get("description_dims", 0))).encode())
+    if data.get("description_dims"):
+        digest.update(repr(settings.description_weight).encode())
+    digest.update(np.ascontiguousarray(embeddings))
+    for group in ("filters", "dimensions"):
+        for name, column in sorted(data[group].items()):
+            digest.update(name.encode())
+            digest.update(np.ascontiguousarray(column))
+    return digest.hexdigest()
+
+
+def _record_load(data: dict, started: float) -> None:
+    data["load_seconds"] = time.perf_counter() - started
+    data["resident_bytes"] = category_nbytes(data)
+
+
+async def load_category(pool: asyncpg.Pool, category_id: str) -> dict | None:
+    """Load one category's embeddings, names, filters and search indexes.
+
+    With ``DESCRIPTION_EMBEDDINGS`` the description embeddings are stacked
+    to the right of the name embeddings (see ``_build_category``). The load
+    time, resident size and content fingerprint are stored in
+    ``load_seconds``, ``resident_bytes`` and ``version``.
+    """
+    started = time.perf_counter()
+    description = (
+        ", pad.jina_v2_clip_description_embedding::text"
+        if settings.description_embeddings
+        else ""
     )
-    logger.info(
-        "Total index size: %.1f MB embeddings",
-        sum(d["embeddings"].nbytes for d in index.values()) / 1024 / 1024,
+    rows = await pool.fetch(
+        f"""
+        SELECT p.id, p.name,
+               pad.jina_v2_clip_name_embedding::text{description}
+        FROM product p
+        JOIN product_ai_data pad ON pad.product_id = p.id
+        WHERE p.category_id = $1
+        ORDER BY p.id
+        """,
+        category_id,
     )
+    if not rows:
+        return None
 
-    tiles_category_id = settings.tiles_category_id
-    flooring_id = settings.flooring_category_id
+    data = await asyncio.to_thread(_build_category, rows)
+    await _load_filters(pool, category_id, data)
+    await asyncio.to_thread(_build_search_indexes, data)
 
-    flooring_ids = []
-    flooring_embs = []
-    flooring_names = []
+    filter_names = [
+        name
+        for meta in ENDPOINTS.values()
+        if meta["category_id"] == category_id
+        for name in meta["filters"]
+    ]
+    if filter_names:
+        data["subindexes"] = await asyncio.to_thread(
+            build_subindexes,
+            data,
+            filter_names,
+            settings.subindex_max_mb_per_category * 1024 * 1024,
+        )
+    data["version"] = await asyncio.to_thread(index_version, data)
+    _record_load(data, started)
+    return data
+
+
+def build_flooring(index: dict) -> dict | None:
+    """Build the synthetic flooring category from LVPs and floor tiles in ``index``."""
+    started = time.perf_counter()
+    ids = []
+    embeddings = []
+    names = []
 
     if settings.lvps_category_id in index:
         lvp = index[settings.lvps_category_id]
-        flooring_ids.extend(lvp["product_ids"])
-        flooring_embs.append(lvp["embeddings"])
-        flooring_names.extend(lvp["names"])
-
-    if tiles_category_id in index:
-        tile = index[tiles_category_id]
-        for i, pid in enumerate(tile["product_ids"]):
-            f = tile["filters"].get(pid, {})
-            if f.get("floor"):
-                flooring_ids.append(pid)
-                flooring_embs.append(tile["embeddings"][i : i + 1])
-                flooring_names.append(tile["names"][i])
-
-    if flooring_ids:
-        index[flooring_id] = {
-            "product_ids": flooring_ids,
-            "embeddings": np.concatenate(flooring_embs),
-            "names": flooring_names,
-            "filters": {},
-            "dimensions": {},
-        }
-    logger.info("Loaded flooring (synthetic): %d products", len(flooring_ids))
+        ids.append(lvp["product_ids"])
+        embeddings.append(lvp["embeddings"])
+        names.append(lvp["names"])
+
+    if settings.tiles_category_id in index:
+        tile = index[settings.tiles_category_id]
+        floor = tile["filters"].get("floor")
+        if floor is not None:
+            rows = np.flatnonzero(floor == 1)
+            ids.append(tile["product_ids"].subset(rows))
+            embeddings.append(tile["embeddings"][rows])
+            names.append(tile["names"].subset(rows))
+
+    product_ids = IdColumn.concat(ids)
+    if not len(product_ids):
+        return None
+
+    data = {
+        "product_ids": product_ids,
+        "embeddings": np.concatenate(embeddings),
+        "description_dims": max(
+            index[source].get("description_dims", 0)
+            for source in (settings.lvps_category_id, settings.tiles_category_id)
+            if source in index
+        ),
+        "names": NameColumn.concat(names),
+        "filters": {},
+        "dimensions": {},
+    }
+    _build_search_indexes(data)
+    data["version"] = index_version(data)
+    _record_load(data, started)
+    return data
+
+
+def log_loaded(category_id: str, data: dict) -> None:
+    logger.info(
+        "Loaded category %s: %d products, %.1f MB in %.1fs",
+        category_id,
+        len(data["product_ids"]),
+        data["resident_bytes"] / 1024 / 1024,
+        data["load_seconds"],
+    )
+
+
+def serves_flooring() -> bool:
+    shard = shard_category_ids()
+    return shard is None or settings.flooring_category_id in shard
+
+
+def _load_order(category_ids: list[str]) -> list[str]:
+    """Put categories served by ENDPOINTS first, in ENDPOINTS order."""
+    priority = {meta["category_id"]: i for i, meta in enumerate(ENDPOINTS.values())}
+    return sorted(category_ids, key=lambda c: priority.get(c, len(priority)))
+
+
+def _on_pgvector(category_id: str, products: int, configured: set[str]) -> bool:
+    threshold = settings.pgvector_min_products
+    return category_id in configured or 0 < threshold <= products
+
+
+def _shard_filter(counts: dict[str, int]) -> dict[str, int]:
+    """Keep the categories assigned by ``SHARD_CATEGORIES`` (all when unset).
+
+    A shard serving flooring also keeps LVPs and tiles, which flooring is
+    built from; ``load_all`` drops them again if they are not assigned.
+    """
+    shard = shard_category_ids()
+    if shard is None:
+        return counts
+    keep = set(shard)
+    if settings.flooring_category_id in shard:
+        keep.update((settings.lvps_category_id, settings.tiles_category_id))
+    return {c: n for c, n in counts.items() if c in keep}
+
+
+async def plan_tiers(pool: asyncpg.Pool, vector_categories: dict) -> dict[str, int]:
+    """Split the DB's categories between memory and the pgvector tier.
+
+    Categories listed in ``PGVECTOR_CATEGORIES``, or with at least
+    ``PGVECTOR_MIN_PRODUCTS`` products, get a ``VectorCategory`` in
+    ``vector_categories``. Synthetic flooring goes there too when it is
+    listed or when LVPs or tiles are. With ``SHARD_CATEGORIES`` only the
+    assigned categories are planned.
+
+    Returns:
+        Product count of every category to hold in memory (flooring excluded).
+    """
+    category_rows = await pool.fetch(
+        "SELECT category_id, count(*) AS products FROM product GROUP BY category_id"
+    )
+    counts = _shard_filter(
+        {str(row["category_id"]): row["products"] for row in category_rows}
+    )
+    configured = configured_categories()
+    for category_id, products in counts.items():
+        if _on_pgvector(category_id, products, configured):
+            vector_categories[category_id] = VectorCategory.for_category(
+                category_id, products
+            )
+            logger.info(
+                "Category %s: %d products served from pgvector", category_id, products
+            )
+
+    flooring_sources = (settings.lvps_category_id, settings.tiles_category_id)
+    if serves_flooring() and (
+        settings.flooring_category_id in configured
+        or any(source in vector_categories for source in flooring_sources)
+    ):
+        # Upper bound: every LVP and tile.
+        products = sum(counts.get(source, 0) for source in flooring_sources)
+        vector_categories[settings.flooring_category_id] = (
+            VectorCategory.for_flooring(products)
+        )
+        logger.info("Flooring (synthetic) served from pgvector")
+
+    return {c: n for c, n in counts.items() if c not in vector_categories}
+
+
+async def load_all(
+    pool: asyncpg.Pool,
+    index: dict | None = None,
+    vector_categories: dict | None = None,
+) -> dict:
+    """Load every category into ``index`` and return it.
+
+    Categories are loaded concurrently (bounded by the DB pool size) and each
+    one is published into ``index`` as soon as it is complete, so a caller
+    sharing the dict can serve categories while the rest are still loading.
+
+    Categories on the pgvector tier (see ``plan_tiers``) are not loaded;
+    they are put into ``vector_categories`` instead.
+    """
+    if index is None:
+        index = {}
+    if vector_categories is None:
+        vector_categories = {}
+
+    started = time.perf_counter()
+    counts = await plan_tiers(pool, vector_categories)
+    category_ids = _load_order(list(counts))
+    slots = asyncio.Semaphore(max(1, settings.db_pool_max_size))
+
+    async def load_one(category_id: str) -> None:
+        async with slots:
+            data = await load_category(pool, category_id)
+        if data is None:
+            return
+        index[category_id] = data
+        log_loaded(category_id, data)
+
+    await asyncio.gather(*(load_one(category_id) for category_id in category_ids))
+
+    if serves_flooring() and settings.flooring_category_id not in vector_categories:
+        flooring = await asyncio.to_thread(build_flooring, index)
+        if flooring is not None:
+            index[settings.flooring_category_id] = flooring
+        logger.info(
+            "Loaded flooring (synthetic): %d products",
+            len(flooring["product_ids"]) if flooring else 0,
+        )
+
+    shard = shard_category_ids()
+    if shard is not None:
+        # Flooring sources that were only loaded to build flooring.
+        for category_id in [c for c in index if c not in shard]:
+            del index[category_id]
 
+    logger.info(
+        "Loaded %d products in %d categories in %.1fs",
+        sum(len(d["product_ids"]) for d in index.values()),
+        len(index),
+        time.perf_counter() - started,
+    )
+    logger.info(
+        "Total index size: %.1f MB embeddings",
+        sum(d["embeddings"].nbytes for d in index.values()) / 1024 / 1024,
+    )
+    logger.info(
+        "Compact ID and name columns: %.1f MB",
+        sum(d["product_ids"].nbytes + d["names"].nbytes for d in index.values())
+        / 1024
+        / 1024,
+    )
+    logger.info(
+        "Built lexical indexes: %.1f MB trigram, %.1f MB BM25 postings",
+        sum(d["trigrams"].nbytes for d in index.values()) / 1024 / 1024,
+        sum(d["bm25"].nbytes for d in index.values()) / 1024 / 1024,
+    )
     return index
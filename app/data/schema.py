@@ -0,0 +1,23 @@
+"""DB tables and columns that search filters are read from.
+
+Shared by the in-memory loader and the pgvector tier, so both apply the same
+filter semantics.
+"""
+
+# Faucet hole spacing flag -> ``faucet`` column.
+FAUCET_FLAG_COLUMNS = {
+    "single_hole": "single_hole_spacing_compatible",
+    "widespread": "eight_inch_hole_spacing_compatible",
+    "centerset": "four_inch_hole_spacing_compatible",
+}
+
+# Tile location flag -> ``tile`` column.
+TILE_FLAG_COLUMNS = {
+    "wall": "available_for_wall",
+    "floor": "available_for_floor",
+    "shower_wall": "available_for_shower_wall",
+    "shower_floor": "available_for_shower_floor",
+}
+
+# Tables whose ``render_id`` points at a ``renderable_product`` with dimensions.
+DIMENSION_TABLES = ["vanity", "mirror", "lighting", "shower_glass", "tub_door"]
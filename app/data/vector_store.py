@@ -0,0 +1,169 @@
+"""pgvector tier: categories ranked in Postgres instead of held in memory.
+
+A category on this tier keeps nothing in RAM. Each search asks Postgres for
+the nearest product name embeddings through the HNSW index created by
+``scripts/create_vector_index.sql``, with the endpoint filters pushed into
+the same query. The lexical boost is then applied to those candidates
+in-process, as for in-memory categories.
+"""
+
+import logging
+from typing import Any
+
+import numpy as np
+
+from app.config import settings
+from app.data import db
+from app.data.categories import resolve_categories
+from app.data.schema import DIMENSION_TABLES, FAUCET_FLAG_COLUMNS, TILE_FLAG_COLUMNS
+from app.search.columns import IdColumn, NameColumn
+from app.search.filters import HOLE_SPACING_FLAGS
+
+logger = logging.getLogger(__name__)
+
+# $1 is the query vector and $2 the candidate limit. ``<#>`` is the negative
+# inner product, which equals cosine distance order on normalized vectors
+# and matches the index's ``vector_ip_ops``.
+SEARCH_SQL = """
+SELECT p.id, p.name,
+       -(pad.jina_v2_clip_name_embedding <#> $1::vector) AS similarity
+FROM product_ai_data pad
+JOIN product p ON p.id = pad.product_id
+WHERE {where}
+ORDER BY pad.jina_v2_clip_name_embedding <#> $1::vector
+LIMIT $2
+"""
+
+
+def vector_literal(embedding: np.ndarray) -> str:
+    """Format an embedding as pgvector text input."""
+    return "[" + ",".join(map(str, embedding.tolist())) + "]"
+
+
+def server_settings() -> dict[str, str]:
+    """Session settings for pool connections when the pgvector tier is in use.
+
+    ``hnsw.iterative_scan`` (pgvector 0.8+) keeps scanning the index until
+    enough rows pass the category and filter predicates; older versions
+    ignore it and return at most ``hnsw.ef_search`` rows before filtering.
+    """
+    if not settings.pgvector_categories and settings.pgvector_min_products <= 0:
+        return {}
+    return {
+        "hnsw.ef_search": str(settings.pgvector_ef_search),
+        "hnsw.iterative_scan": "relaxed_order",
+    }
+
+
+def configured_categories() -> set[str]:
+    """Category IDs listed in ``PGVECTOR_CATEGORIES`` (endpoint names or IDs)."""
+    return set(resolve_categories(settings.pgvector_categories))
+
+
+def _filter_clauses(filters: dict[str, Any] | None, params: list) -> list[str]:
+    """SQL predicates equivalent to ``app.search.filters.apply_filters``.
+
+    Values are appended to ``params`` and referenced by position, so the SQL
+    text only depends on which filters are set and asyncpg reuses its
+    prepared statement.
+    """
+    if not filters:
+        return []
+    clauses = []
+
+    spacing = filters.get("holeSpacingCompatibility")
+    flag = HOLE_SPACING_FLAGS.get(spacing) if spacing else None
+    if flag:
+        clauses.append(
+            "EXISTS (SELECT 1 FROM faucet f WHERE f.product_id = p.id"
+            f" AND f.{FAUCET_FLAG_COLUMNS[flag]})"
+        )
+
+    locations = filters.get("locations")
+    if locations:
+        columns = [TILE_FLAG_COLUMNS.get(loc) for loc in locations]
+        if None in columns:
+            clauses.append("FALSE")
+        else:
+            checks = "".join(f" AND t.{column}" for column in columns)
+            clauses.append(
+                f"EXISTS (SELECT 1 FROM tile t WHERE t.product_id = p.id{checks})"
+            )
+
+    if filters.get("hasTubSpout") is not None:
+        params.append(bool(filters["hasTubSpout"]))
+        clauses.append(
+            "EXISTS (SELECT 1 FROM shower_system s WHERE s.product_id = p.id"
+            f" AND COALESCE(s.has_tub_spout, FALSE) = ${len(params)})"
+        )
+
+    renders = " UNION ALL ".join(
+        f"SELECT product_id, render_id FROM {table}" for table in DIMENSION_TABLES
+    )
+    for name, column in (("lengthMax", "length"), ("widthMax", "width")):
+        if filters.get(name) is not None:
+            params.append(float(filters[name]))
+            clauses.append(
+                f"NOT EXISTS (SELECT 1 FROM ({renders}) d"
+                " JOIN renderable_product rp ON rp.id = d.render_id"
+                f" WHERE d.product_id = p.id AND rp.{column} > ${len(params)})"
+            )
+
+    return clauses
+
+
+class VectorCategory:
+    """A category served from pgvector.
+
+    ``where`` selects the category's products (``p`` is ``product``), with
+    its own parameters numbered from ``$3``.
+    """
+
+    def __init__(
+        self, category_id: str, where: str, params: list, products: int
+    ) -> None:
+        self.category_id = category_id
+        self.where = where
+        self.params = params
+        self.products = products
+
+    @classmethod
+    def for_category(cls, category_id: str, products: int) -> "VectorCategory":
+        return cls(category_id, "p.category_id = $3", [category_id], products)
+
+    @classmethod
+    def for_flooring(cls, products: int) -> "VectorCategory":
+        """The synthetic flooring category: LVPs plus tiles available for floors."""
+        return cls(
+            settings.flooring_category_id,
+            "(p.category_id = $3 OR (p.category_id = $4 AND EXISTS ("
+            "SELECT 1 FROM tile t WHERE t.product_id = p.id"
+            f" AND t.{TILE_FLAG_COLUMNS['floor']})))",
+            [settings.lvps_category_id, settings.tiles_category_id],
+            products,
+        )
+
+    async def nearest(
+        self,
+        query_emb: np.ndarray,
+        filters: dict[str, Any] | None,
+        limit: int,
+    ) -> dict[str, Any]:
+        """Return the ``limit`` nearest products passing ``filters``.
+
+        The result has the in-memory category layout (``product_ids``,
+        ``names``) plus ``similarity``, so the lexical features can be
+        computed on it the same way.
+        """
+        params: list = [vector_literal(query_emb), limit, *self.params]
+        clauses = [self.where, *_filter_clauses(filters, params)]
+        records = await db.get_pool().fetch(
+            SEARCH_SQL.format(where=" AND ".join(clauses)), *params
+        )
+        return {
+            "product_ids": IdColumn.from_values(r["id"] for r in records),
+            "names": NameColumn.from_strings(r["name"].lower() for r in records),
+            "similarity": np.array(
+                [r["similarity"] for r in records], dtype=np.float64
+            ),
+        }
@@ -0,0 +1,153 @@
+"""Encoder sidecar: one model per node, shared by every HTTP worker.
+
+    python -m app.encoder_server --socket /run/search/encoder.sock
+
+Workers connect with ``SidecarEncoder`` (set ``ENCODER_SOCKET``). Queries
+arriving from all connections within ``ENCODER_BATCH_WINDOW_MS`` of each other
+(up to ``ENCODER_BATCH_SIZE``) are encoded in one model call.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+import numpy as np
+
+from app.config import settings
+from app.search.encoder import (
+    REQUEST_HEADER,
+    RESPONSE_HEADER,
+    STATUS_ERROR,
+    STATUS_OK,
+    LocalEncoder,
+)
+
+logger = logging.getLogger("app.encoder_server")
+
+# Longest query accepted, in bytes; longer requests close the connection.
+MAX_QUERY_BYTES = 64 * 1024
+
+
+class EncoderServer:
+    """Serve query encodes on a Unix socket, batching across connections."""
+
+    def __init__(self, encoder: LocalEncoder, max_batch: int, window_s: float) -> None:
+        self.encoder = encoder
+        self.max_batch = max(1, max_batch)
+        self.window_s = max(0.0, window_s)
+        self._pending: asyncio.Queue[tuple[str, asyncio.Future]] | None = None
+        self.batches = 0
+        self.encoded = 0
+
+    async def serve(self, path: str) -> None:
+        if os.path.exists(path):
+            os.unlink(path)
+        self._pending = asyncio.Queue()
+        batcher = asyncio.create_task(self._batch_loop())
+        server = await asyncio.start_unix_server(self._handle, path=path)
+        logger.info("Encoder sidecar listening on %s", path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                (size,) = REQUEST_HEADER.unpack(
+                    await reader.readexactly(REQUEST_HEADER.size)
+                )
+                if size > MAX_QUERY_BYTES:
+                    break
+                query = (await reader.readexactly(size)).decode("utf-8")
+                future = loop.create_future()
+                self._pending.put_nowait((query, future))
+                try:
+                    payload = (await future).tobytes()
+                    status = STATUS_OK
+                except Exception as exc:
+                    payload = f"{type(exc).__name__}: {exc}".encode("utf-8")
+                    status = STATUS_ERROR
+                writer.write(RESPONSE_HEADER.pack(status, len(payload)) + payload)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        pending = self._pending
+        while True:
+            batch = [await pending.get()]
+            flush_at = loop.time() + self.window_s
+            while len(batch) < self.max_batch:
+                timeout = flush_at - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(pending.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            while len(batch) < self.max_batch and not pending.empty():
+                batch.append(pending.get_nowait())
+
+            queries = [query for query, _ in batch]
+            try:
+                embeddings: np.ndarray = await asyncio.to_thread(
+                    self.encoder.encode_batch, queries
+                )
+            except Exception as exc:
+                logger.exception("Batch encode failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            self.batches += 1
+            self.encoded += len(batch)
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run the query encoder sidecar on a Unix socket."
+    )
+    parser.add_argument(
+        "--socket",
+        default=settings.encoder_socket,
+        help="Unix socket path (default: ENCODER_SOCKET).",
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.encoder_batch_size)
+    parser.add_argument(
+        "--batch-window-ms", type=float, default=settings.encoder_batch_window_ms
+    )
+    args = parser.parse_args()
+    if not args.socket:
+        parser.error("--socket or ENCODER_SOCKET is required")
+    return args
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(levelname)s: %(name)s: %(message)s",
+        stream=sys.stdout,
+    )
+    args = parse_args()
+    encoder = LocalEncoder()
+    encoder.load()
+    server = EncoderServer(encoder, args.batch_size, args.batch_window_ms / 1000.0)
+    asyncio.run(server.serve(args.socket))
+
+
+if __name__ == "__main__":
+    main()
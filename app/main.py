@@ -1,12 +1,23 @@
 # app/main.py
+import asyncio
+import gc
 import logging
+import os
 import sys
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
+from app.api import ops, suggest
+from app.api.capture import QueryCapture
+from app.api.responses import PageCache
 from app.api.router import router
-from app.search.engine import SearchEngine
+from app.search.encode_queue import DeadlineExceeded, EncoderOverloaded
+from app.search.encoder import EncoderError
+from app.search.engine import CategoryNotFound, SearchEngine, ServiceNotReady
 from app.data import db
+from app.data.categories import resolve_categories
+from app.data.category_cache import CategoryCache
 from app.data.loader import load_all
 from app.config import settings
 
@@ -22,23 +33,124 @@ logger = logging.getLogger(__name__)
 app = FastAPI(title="Product Search API")
 
 
-@app.on_event("startup")
-async def startup():
-    await db.connect(settings.database_url)
-    logger.info("DB connected")
+@app.exception_handler(EncoderOverloaded)
+@app.exception_handler(DeadlineExceeded)
+@app.exception_handler(EncoderError)
+@app.exception_handler(ServiceNotReady)
+async def service_unavailable(
+    request: Request,
+    exc: EncoderOverloaded | DeadlineExceeded | EncoderError | ServiceNotReady,
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(CategoryNotFound)
+async def category_not_found(request: Request, exc: CategoryNotFound) -> JSONResponse:
+    return JSONResponse(status_code=404, content={"detail": str(exc)})
+
+
+async def load_index(engine: SearchEngine) -> None:
+    """Load every category, or with ``LAZY_LOADING`` only ``PRELOAD_CATEGORIES``.
+
+    In lazy mode the other categories are loaded on their first search and
+    evicted least recently used over ``INDEX_MEMORY_BUDGET_MB``.
+    """
+    if not settings.lazy_loading:
+        await load_all(db.get_pool(), engine.index, engine.vector_categories)
+        return
+    engine.categories = CategoryCache(
+        engine.index,
+        settings.index_memory_budget_mb * 1024 * 1024,
+        on_evict=engine.forget_category,
+    )
+    await engine.categories.plan(engine.vector_categories)
+    await engine.categories.preload(resolve_categories(settings.preload_categories))
+
 
-    index = await load_all(db.get_pool())
+async def load_engine(engine: SearchEngine) -> None:
+    """Connect to the DB, then load the model and the index concurrently.
 
-    engine = SearchEngine(index)
-    engine.load_model()
+    Categories are published into ``engine.index`` one by one as they finish,
+    so they become servable before the whole load is done.
+    """
+    engine.index_loading = True
+    try:
+        await db.connect(settings.database_url)
+        logger.info("DB connected")
+
+        await asyncio.gather(
+            asyncio.to_thread(engine.load_model),
+            load_index(engine),
+        )
+        # The index is immutable from here on: move it out of the tracked
+        # generations so later collections don't rescan it.
+        gc.collect()
+        gc.freeze()
+        logger.info("Search engine ready (%d objects frozen)", gc.get_freeze_count())
+    except Exception as exc:
+        app.state.startup_error = f"{type(exc).__name__}: {exc}"
+        logger.exception("Search engine startup failed")
+    finally:
+        engine.index_loading = False
+
+
+async def attach_engine(engine: SearchEngine) -> None:
+    """Prepare an engine inherited from the prefork master (see ``app.server``).
+
+    The model and index are already in memory; the worker only opens its own
+    DB pool (connections are not shared across a fork) and warms the model.
+    """
+    try:
+        await db.connect(settings.database_url)
+        await asyncio.to_thread(engine.warmup)
+        logger.info("Worker %d ready", os.getpid())
+    except Exception as exc:
+        app.state.startup_error = f"{type(exc).__name__}: {exc}"
+        logger.exception("Worker startup failed")
+
+
+@app.on_event("startup")
+async def startup():
+    app.state.loop_lag = ops.LoopLagMonitor()
+    app.state.loop_lag.start()
 
+    engine = getattr(app.state, "preloaded_engine", None)
+    app.state.page_cache = PageCache(settings.response_cache_size)
+    app.state.query_capture = None
+    if settings.capture_path:
+        capture = QueryCapture(
+            settings.capture_path,
+            settings.capture_sample_rate,
+            settings.capture_slow_ms,
+            settings.capture_max_mb * 1024 * 1024,
+            settings.capture_backups,
+        )
+        capture.start()
+        app.state.query_capture = capture
+        logger.info("Capturing queries to %s", capture.path)
+    app.state.startup_error = None
+    if engine is None:
+        engine = SearchEngine({})
+        app.state.startup_task = asyncio.create_task(load_engine(engine))
+    else:
+        app.state.startup_task = asyncio.create_task(attach_engine(engine))
     app.state.engine = engine
-    logger.info("Search engine ready")
 
 
 @app.on_event("shutdown")
 async def shutdown():
+    app.state.loop_lag.stop()
+    app.state.startup_task.cancel()
+    app.state.engine.close()
+    if app.state.query_capture is not None:
+        app.state.query_capture.stop()
     await db.close()
 
 
 app.include_router(router)
+app.include_router(suggest.router)
+app.include_router(ops.router)
@@ -0,0 +1,170 @@
+import uuid
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+
+UUID_BYTES = 16
+
+
+def uuid_bytes(value: Any) -> bytes:
+    if isinstance(value, uuid.UUID):
+        return value.bytes
+    return uuid.UUID(str(value)).bytes
+
+
+class IdColumn:
+    """Product UUIDs of one category as a single ``(n, 16)`` byte array.
+
+    Replaces a list of ``str(UUID)`` objects (about 90 bytes each plus a list
+    slot) with 16 bytes per row. IDs are turned back into strings only for the
+    rows that are actually returned to a client.
+    """
+
+    def __init__(self, raw: np.ndarray) -> None:
+        self._raw = np.ascontiguousarray(raw, dtype=np.uint8).reshape(-1, UUID_BYTES)
+
+    @classmethod
+    def from_values(cls, values: Iterable[Any]) -> "IdColumn":
+        """Build from ``uuid.UUID`` objects or their string form."""
+        buf = b"".join(uuid_bytes(value) for value in values)
+        return cls(np.frombuffer(buf, dtype=np.uint8))
+
+    @classmethod
+    def concat(cls, columns: list["IdColumn"]) -> "IdColumn":
+        if not columns:
+            return cls(np.empty(0, dtype=np.uint8))
+        return cls(np.concatenate([c._raw for c in columns]))
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def __getitem__(self, row: int) -> str:
+        return str(uuid.UUID(bytes=self._raw[row].tobytes()))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.take(np.arange(len(self))))
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + self.nbytes
+
+    @property
+    def nbytes(self) -> int:
+        return self._raw.nbytes
+
+    def digest(self, hasher: Any) -> None:
+        """Feed the raw IDs to a ``hashlib`` object."""
+        hasher.update(self._raw)
+
+    def subset(self, rows: np.ndarray) -> "IdColumn":
+        return IdColumn(self._raw[rows])
+
+    def take(self, rows: np.ndarray) -> list[str]:
+        """Return the string IDs of ``rows``, in order."""
+        raw = self._raw[rows].tobytes()
+        return [
+            str(uuid.UUID(bytes=raw[i : i + UUID_BYTES]))
+            for i in range(0, len(raw), UUID_BYTES)
+        ]
+
+    def row_map(self) -> dict[bytes, int]:
+        """Map raw UUID bytes to row; meant for load time only."""
+        raw = self._raw.tobytes()
+        return {
+            raw[i * UUID_BYTES : (i + 1) * UUID_BYTES]: i for i in range(len(self))
+        }
+
+
+class NameColumn:
+    """Lowercased product names as one UTF-8 buffer plus row offsets.
+
+    Row ``i`` is ``buffer[offsets[i]:offsets[i + 1]]``. Substring checks run
+    on the encoded bytes (UTF-8 is self-synchronizing, so a byte match is a
+    character match) and names are decoded only when a caller needs a ``str``.
+    """
+
+    def __init__(self, buffer: bytes, offsets: np.ndarray) -> None:
+        self._buffer = buffer
+        self._offsets = offsets
+
+    @classmethod
+    def from_strings(cls, names: Iterable[str]) -> "NameColumn":
+        encoded = [name.encode("utf-8") for name in names]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        return cls(b"".join(encoded), offsets)
+
+    @classmethod
+    def concat(cls, columns: list["NameColumn"]) -> "NameColumn":
+        if not columns:
+            return cls(b"", np.zeros(1, dtype=np.int64))
+        offsets = [columns[0]._offsets]
+        base = columns[0]._offsets[-1]
+        for column in columns[1:]:
+            offsets.append(column._offsets[1:] + base)
+            base += column._offsets[-1]
+        return cls(b"".join(c._buffer for c in columns), np.concatenate(offsets))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, row: int) -> str:
+        start, end = self._offsets[row], self._offsets[row + 1]
+        return self._buffer[start:end].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        buffer = self._buffer
+        bounds = self._offsets.tolist()
+        for start, end in zip(bounds, bounds[1:]):
+            yield buffer[start:end].decode("utf-8")
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + self.nbytes
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buffer) + self._offsets.nbytes
+
+    def digest(self, hasher: Any) -> None:
+        """Feed the names and row offsets to a ``hashlib`` object."""
+        hasher.update(self._buffer)
+        hasher.update(self._offsets)
+
+    def subset(self, rows: np.ndarray) -> "NameColumn":
+        buffer = self._buffer
+        bounds = self._offsets.tolist()
+        pieces = [buffer[bounds[i] : bounds[i + 1]] for i in np.asarray(rows).tolist()]
+        offsets = np.zeros(len(pieces) + 1, dtype=np.int64)
+        np.cumsum([len(p) for p in pieces], out=offsets[1:])
+        return NameColumn(b"".join(pieces), offsets)
+
+    def find(self, substring: str, rows: np.ndarray | None = None) -> np.ndarray:
+        """Return sorted rows (of ``rows``, or all) whose name contains ``substring``."""
+        needle = substring.encode("utf-8")
+        buffer = self._buffer
+        offsets = self._offsets
+        if rows is not None:
+            starts = offsets[rows].tolist()
+            ends = offsets[rows + 1].tolist()
+            return np.array(
+                [
+                    row
+                    for row, start, end in zip(rows.tolist(), starts, ends)
+                    if buffer.find(needle, start, end) != -1
+                ],
+                dtype=np.int32,
+            )
+
+        if not needle:
+            return np.arange(len(self), dtype=np.int32)
+        found = []
+        pos = buffer.find(needle)
+        while pos != -1:
+            row = int(np.searchsorted(offsets, pos, side="right")) - 1
+            end = int(offsets[row + 1])
+            if pos + len(needle) <= end:
+                found.append(row)
+                pos = buffer.find(needle, end)
+            else:
+                # Match spans two names; retry from the next byte.
+                pos = buffer.find(needle, pos + 1)
+        return np.array(found, dtype=np.int32)
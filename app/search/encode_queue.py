@@ -0,0 +1,191 @@
+"""Admission-controlled queue for query encodes."""
+
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import numpy as np
+
+
+class EncoderOverloaded(RuntimeError):
+    """Raised when a new encode would wait longer than the configured budget."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Query encoder is overloaded, retry later.")
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class DeadlineExceeded(RuntimeError):
+    """Raised for queued encodes whose request deadline passed before encoding."""
+
+    def __init__(self) -> None:
+        super().__init__("Request deadline passed while waiting for the encoder.")
+        self.retry_after = 1
+
+
+@dataclass
+class _Job:
+    query: str
+    future: asyncio.Future
+    deadline: float | None
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class EncodeQueue:
+    """Serialize model encodes behind a bounded FIFO queue.
+
+    One worker task encodes queued queries one at a time on a thread (the
+    model is not run concurrently, to keep memory flat). New work is rejected
+    up front with ``EncoderOverloaded`` when the queue is full or when the
+    estimated wait (queue depth x average encode time) exceeds the budget.
+    Jobs whose deadline has passed by the time they reach the head of the
+    queue are dropped without encoding.
+
+    Background jobs (encodes that only fill a cache) wait in a separate
+    queue that runs only when no request is waiting, and do not count toward
+    ``depth`` or the wait estimate. A request for a query that is still
+    queued in the background takes that job over instead of encoding again.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[str], np.ndarray],
+        max_depth: int,
+        wait_budget_s: float,
+        initial_encode_s: float = 0.05,
+    ) -> None:
+        self._encode = encode
+        self.max_depth = max_depth
+        self.wait_budget_s = wait_budget_s
+        self._jobs: deque[_Job] = deque()
+        self._background_jobs: deque[_Job] = deque()
+        self._wakeup: asyncio.Event | None = None
+        self._worker: asyncio.Task | None = None
+        self._busy = False
+        self.encode_time_s = initial_encode_s
+        self.encoded = 0
+        self.shed = 0
+        self.expired = 0
+        self.abandoned = 0
+        self.promoted = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._jobs) + (1 if self._busy else 0)
+
+    def estimated_wait(self) -> float:
+        """Estimated seconds a new job would wait before its encode starts."""
+        return self.depth * self.encode_time_s
+
+    async def submit(
+        self, query: str, deadline: float | None = None, background: bool = False
+    ) -> np.ndarray:
+        """Queue ``query`` for encoding and wait for its embedding.
+
+        Args:
+            query: Raw query text passed to the model.
+            deadline: Absolute ``time.monotonic()`` after which the result is
+                no longer useful; the job is dropped if it is still queued.
+            background: Queue behind every request, outside the wait budget
+                (only bounded by ``max_depth``).
+
+        Raises:
+            EncoderOverloaded: The queue is full or over its wait budget.
+            DeadlineExceeded: The deadline passed before the encode started.
+        """
+        if background:
+            if len(self._background_jobs) >= self.max_depth:
+                self.shed += 1
+                raise EncoderOverloaded(self.estimated_wait())
+            return await self._enqueue(self._background_jobs, query, deadline)
+
+        wait = self.estimated_wait()
+        if len(self._jobs) >= self.max_depth or (
+            self.wait_budget_s > 0 and wait > self.wait_budget_s
+        ):
+            self.shed += 1
+            raise EncoderOverloaded(wait)
+
+        for job in self._background_jobs:
+            if job.query == query and not job.future.done():
+                self._background_jobs.remove(job)
+                if job.deadline is not None:
+                    job.deadline = None if deadline is None else max(job.deadline, deadline)
+                self._jobs.append(job)
+                self.promoted += 1
+                return await job.future
+        return await self._enqueue(self._jobs, query, deadline)
+
+    async def _enqueue(
+        self, jobs: deque[_Job], query: str, deadline: float | None
+    ) -> np.ndarray:
+        self._ensure_worker()
+        job = _Job(query, asyncio.get_running_loop().create_future(), deadline)
+        jobs.append(job)
+        self._wakeup.set()
+        return await job.future
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            if not self._jobs and not self._background_jobs:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            job = (self._jobs or self._background_jobs).popleft()
+            if job.future.done():
+                self.abandoned += 1
+                continue
+            if job.deadline is not None and time.monotonic() > job.deadline:
+                self.expired += 1
+                job.future.set_exception(DeadlineExceeded())
+                continue
+
+            self._busy = True
+            started = time.monotonic()
+            try:
+                embedding = await asyncio.to_thread(self._encode, job.query)
+            except Exception as exc:  # noqa: BLE001
+                if not job.future.done():
+                    job.future.set_exception(exc)
+                continue
+            finally:
+                self._busy = False
+
+            elapsed = time.monotonic() - started
+            self.encode_time_s = 0.8 * self.encode_time_s + 0.2 * elapsed
+            self.encoded += 1
+            if not job.future.done():
+                job.future.set_result(embedding)
+
+    def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        for jobs in (self._jobs, self._background_jobs):
+            while jobs:
+                job = jobs.popleft()
+                if not job.future.done():
+                    job.future.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "background_depth": len(self._background_jobs),
+            "max_depth": self.max_depth,
+            "estimated_wait_ms": self.estimated_wait() * 1000.0,
+            "encode_time_ms_avg": self.encode_time_s * 1000.0,
+            "encoded": self.encoded,
+            "shed": self.shed,
+            "expired": self.expired,
+            "abandoned": self.abandoned,
+            "promoted": self.promoted,
+        }
@@ -0,0 +1,193 @@
+"""Query encoders: the in-process model, or a client for the encoder sidecar."""
+
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from typing import TYPE_CHECKING, Protocol
+
+import numpy as np
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "jinaai/jina-clip-v2"
+
+# Sidecar wire format. Request: u32 length + UTF-8 query. Response: u8 status
+# + u32 length + payload, where the payload is the float32 embedding (status
+# OK) or a UTF-8 error message.
+REQUEST_HEADER = struct.Struct("!I")
+RESPONSE_HEADER = struct.Struct("!BI")
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# How long SidecarEncoder.load() waits for the sidecar socket to appear.
+CONNECT_TIMEOUT_S = 300.0
+
+
+class EncoderError(RuntimeError):
+    """Raised when the encoder sidecar fails or returns an error."""
+
+    retry_after = 1
+
+
+class QueryEncoder(Protocol):
+    """What ``SearchEngine`` needs from a query encoder."""
+
+    @property
+    def loaded(self) -> bool: ...
+
+    def load(self, warmup: bool = True) -> None: ...
+
+    def warmup(self) -> None: ...
+
+    def encode(self, query: str) -> np.ndarray: ...
+
+    def close(self) -> None: ...
+
+
+class LocalEncoder:
+    """jina-clip-v2 loaded in this process (the default)."""
+
+    def __init__(self) -> None:
+        self.model: "SentenceTransformer | None" = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None
+
+    def load(self, warmup: bool = True) -> None:
+        """Load the model; ``sentence_transformers`` is imported only here."""
+        from sentence_transformers import SentenceTransformer
+
+        logger.info("Loading JINA CLIP v2 model...")
+        model = SentenceTransformer(MODEL_NAME, trust_remote_code=True)
+        if warmup:
+            model.encode(["warmup"], normalize_embeddings=True)
+        self.model = model
+        logger.info("Model loaded!")
+
+    def warmup(self) -> None:
+        if self.model is not None:
+            self.model.encode(["warmup"], normalize_embeddings=True)
+
+    def encode(self, query: str) -> np.ndarray:
+        return self.encode_batch([query])[0]
+
+    def encode_batch(self, queries: list[str]) -> np.ndarray:
+        embeddings = self.model.encode(
+            queries, batch_size=len(queries), normalize_embeddings=True
+        )
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def close(self) -> None:
+        pass
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytearray:
+    buf = bytearray(size)
+    view = memoryview(buf)
+    read = 0
+    while read < size:
+        n = sock.recv_into(view[read:])
+        if n == 0:
+            raise EncoderError("Encoder sidecar closed the connection.")
+        read += n
+    return buf
+
+
+class SidecarEncoder:
+    """Client for ``app.encoder_server`` over a Unix socket.
+
+    The model lives in one sidecar process per node, which batches queries
+    from every HTTP worker. Embeddings come back as raw float32 bytes and are
+    wrapped with ``np.frombuffer`` without a copy. The connection is opened
+    lazily and reopened after a fork, so it is never shared between processes.
+    """
+
+    def __init__(self, path: str, timeout_s: float) -> None:
+        self.path = path
+        self.timeout_s = timeout_s
+        self._sock: socket.socket | None = None
+        self._pid = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, warmup: bool = True) -> None:
+        """Wait until the sidecar answers, then drop the probe connection."""
+        logger.info("Waiting for encoder sidecar at %s...", self.path)
+        started = time.monotonic()
+        while True:
+            try:
+                self.encode("warmup")
+                break
+            except (OSError, EncoderError):
+                if time.monotonic() - started > CONNECT_TIMEOUT_S:
+                    raise
+                time.sleep(0.5)
+        self.close()
+        self._loaded = True
+        logger.info("Encoder sidecar connected")
+
+    def warmup(self) -> None:
+        self.encode("warmup")
+
+    def _connect(self) -> socket.socket:
+        if self._sock is None or self._pid != os.getpid():
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout_s)
+            sock.connect(self.path)
+            self._sock = sock
+            self._pid = os.getpid()
+        return self._sock
+
+    def encode(self, query: str) -> np.ndarray:
+        payload = query.encode("utf-8")
+        with self._lock:
+            for attempt in (0, 1):
+                try:
+                    sock = self._connect()
+                    sock.sendall(REQUEST_HEADER.pack(len(payload)) + payload)
+                    status, size = RESPONSE_HEADER.unpack(
+                        _recv_exactly(sock, RESPONSE_HEADER.size)
+                    )
+                    body = _recv_exactly(sock, size)
+                    break
+                except (OSError, EncoderError) as exc:
+                    # A stale connection (sidecar restarted) is retried once.
+                    self._drop()
+                    if attempt:
+                        if isinstance(exc, EncoderError):
+                            raise
+                        raise EncoderError(f"Encoder sidecar unavailable: {exc}") from exc
+        if status != STATUS_OK:
+            raise EncoderError(body.decode("utf-8", "replace"))
+        return np.frombuffer(body, dtype=np.float32)
+
+    def _drop(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._drop()
+
+
+def create_encoder() -> QueryEncoder:
+    """Return the sidecar client if ``ENCODER_SOCKET`` is set, else the local model."""
+    if settings.encoder_socket:
+        return SidecarEncoder(
+            settings.encoder_socket, settings.encoder_timeout_ms / 1000.0
+        )
+    return LocalEncoder()
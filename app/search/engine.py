@@ -2,110 +2,766 @@
 
 import asyncio
 import logging
+import time
 from collections import OrderedDict
+from dataclasses import dataclass, field
 from typing import Any
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
 from app.config import settings
-from app.search.filters import apply_filters
-from app.search.scorer import score_products
+from app.data.categories import shard_category_ids
+from app.data.category_cache import CategoryCache
+from app.data.vector_store import VectorCategory
+from app.search.columns import IdColumn
+from app.search.encoder import QueryEncoder, create_encoder
+from app.search.encode_queue import DeadlineExceeded, EncodeQueue
+from app.search.executor import RankingExecutor
+from app.search.filters import apply_filters, normalize_filters, select_subindex
+from app.search.ranking_cache import Ranking, RankingCache
+from app.search.score_batcher import ScoreBatcher
+from app.search.scorer import (
+    name_embeddings,
+    score_candidates,
+    score_products,
+    score_products_lexical,
+    scoring_matrix,
+    stacked_query,
+)
+from app.search.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Scores below this never pass the result threshold, whatever the filters.
+MIN_SCORE = 0.10
+
+
+class ServiceNotReady(RuntimeError):
+    """Raised while the model or a requested category is still loading."""
+
+    retry_after = 5
+
+
+class CategoryNotFound(LookupError):
+    """Raised for a category that is not in the index after loading finished."""
+
+
+@dataclass
+class SearchResult:
+    """Ranked rows of a category and the ranking mode that produced them.
+
+    ``mode`` is ``"hybrid"`` for the normal vector + lexical ranking, or
+    ``"lexical"`` when the encoder was saturated and the query was ranked
+    with the BM25 index only. Rows index into ``ids``, the category's
+    compact ID column; use :meth:`product_ids` to get strings for a slice.
+    ``timings`` holds the milliseconds spent getting the query embedding
+    (``embed_ms``), querying pgvector (``db_ms``, pgvector-tier categories
+    only) and ranking (``rank_ms``, including the executor queue).
+    ``version`` is the index version of the category data that was ranked,
+    or None for pgvector-tier categories, whose rows are read live.
+    """
+
+    rows: np.ndarray
+    ids: IdColumn
+    mode: str = "hybrid"
+    timings: dict[str, float] = field(default_factory=dict)
+    version: str | None = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def degraded(self) -> bool:
+        return self.mode != "hybrid"
+
+    def product_ids(self, start: int = 0, stop: int | None = None) -> list[str]:
+        """Return the product IDs of ranked rows ``start:stop``."""
+        return self.ids.take(self.rows[start:stop])
+
 
 class SearchEngine:
     """Serve semantic search over preloaded category indices."""
 
-    def __init__(self, index: dict[str, dict[str, Any]]) -> None:
+    def __init__(
+        self,
+        index: dict[str, dict[str, Any]],
+        encoder: QueryEncoder | None = None,
+    ) -> None:
         """Initialize the search engine with in-memory index data.
 
         Args:
             index: Per-category index with product IDs, embeddings, names, and filter metadata.
+                Categories on the pgvector tier are in ``vector_categories``
+                instead, filled by ``load_all``. With ``LAZY_LOADING`` the
+                index is managed by ``categories``, which loads and evicts
+                categories on demand.
+            encoder: Query encoder; defaults to ``create_encoder()`` (the local
+                model, or the encoder sidecar when ``ENCODER_SOCKET`` is set).
         """
         self.index = index
+        self.vector_categories: dict[str, VectorCategory] = {}
+        self.categories: CategoryCache | None = None
+        self._shard = shard_category_ids()
+        self.encoder = encoder if encoder is not None else create_encoder()
         self._embedding_cache: OrderedDict[str, np.ndarray] = OrderedDict()
         self._embedding_cache_size = settings.embedding_cache_size
-        self._encode_lock = asyncio.Lock()
-        self.model: SentenceTransformer | None = None
+        self._encode_queue = EncodeQueue(
+            self._encode_sync,
+            max_depth=settings.encode_queue_max_depth,
+            wait_budget_s=settings.encode_wait_budget_ms / 1000.0,
+        )
+        self._encode_flight = SingleFlight()
+        self._background_flight = SingleFlight()
+        self._search_flight = SingleFlight()
+        self._ranking_flight = SingleFlight()
+        self._rankings = (
+            RankingCache(settings.ranking_cache_mb * 1024 * 1024)
+            if settings.ranking_cache_mb > 0
+            else None
+        )
+        self._executor = RankingExecutor(
+            settings.search_workers, settings.search_queue_size
+        )
+        self._score_batcher = (
+            ScoreBatcher(
+                self._executor,
+                settings.score_batch_window_ms / 1000.0,
+                settings.score_batch_max,
+            )
+            if settings.score_batch_window_ms > 0
+            else None
+        )
+        self._background: set[asyncio.Task] = set()
+        self.degraded_searches = 0
+        self.catalog_name_hits = 0
+        self.background_encodes = 0
+        self.index_loading = False
+
+    def load_model(self, warmup: bool = True) -> None:
+        """Load the query encoder (blocking).
+
+        For the local encoder this loads the model; ``sentence_transformers``
+        (and torch) are imported only then, so importing the app stays cheap
+        and the model can load on a thread while the index loads. For the
+        sidecar it waits until the sidecar answers.
+
+        Args:
+            warmup: Run one encode after loading. The prefork server skips it
+                in the master so torch's thread pool is first started in the
+                workers, after the fork.
+        """
+        self.encoder.load(warmup)
+
+    def warmup(self) -> None:
+        """Run one throwaway encode so the first real query is not slow."""
+        if self.encoder.loaded:
+            self.encoder.warmup()
 
-    def load_model(self) -> None:
-        """Load and warm up the embedding model used for query encoding."""
-        logger.info("Loading JINA CLIP v2 model...")
-        self.model = SentenceTransformer("jinaai/jina-clip-v2", trust_remote_code=True)
-        self.model.encode(["warmup"], normalize_embeddings=True)
-        logger.info("Model loaded!")
+    @property
+    def model_loaded(self) -> bool:
+        return self.encoder.loaded
 
-    async def get_query_embedding(self, query: str) -> np.ndarray:
+    @property
+    def ready(self) -> bool:
+        """True once the model is loaded and every category has been loaded."""
+        return self.encoder.loaded and not self.index_loading
+
+    async def get_query_embedding(
+        self,
+        query: str,
+        deadline: float | None = None,
+        category_id: str | None = None,
+    ) -> np.ndarray:
         """Return a normalized embedding for a search query.
 
-        Uses an LRU cache to avoid recomputing embeddings for repeated queries.
-        Embedding generation is serialized via lock to reduce memory spikes.
+        Uses an LRU cache to avoid recomputing embeddings for repeated queries;
+        cache hits never wait behind pending encodes. A query that is exactly a
+        catalog product name reuses that product's stored name embedding (same
+        model, normalized), skipping the encode. Concurrent misses for the
+        same query share a single encode, and misses go through a bounded
+        encode queue that serializes model calls to reduce memory spikes.
 
         Args:
             query: Free-text user query.
+            deadline: Optional absolute ``time.monotonic()`` deadline; the
+                encode is dropped if it is still queued after this time.
+            category_id: Optional category to check first for a name match.
 
         Returns:
             Query embedding vector as float32 NumPy array.
+
+        Raises:
+            EncoderOverloaded: The encode queue is over its depth or wait budget.
+            DeadlineExceeded: The deadline passed while the encode was queued.
+            ServiceNotReady: The model is not loaded yet.
         """
-        if self.model is None:
-            raise RuntimeError(
+        if not self.encoder.loaded:
+            raise ServiceNotReady(
                 "Search model is not loaded. Call load_model() before search."
             )
 
         cache_key = query.strip().lower()
+        cached = self._cached_embedding(cache_key)
+        if cached is not None:
+            return cached
+
+        stored = self._catalog_embedding(cache_key, category_id)
+        if stored is not None:
+            self.catalog_name_hits += 1
+            return stored
+
+        while True:
+            try:
+                return await self._encode_flight.do(
+                    cache_key, lambda: self._encode(query, cache_key, deadline)
+                )
+            except DeadlineExceeded:
+                # A shared encode runs under the deadline of the caller that
+                # started it; callers with time left start another one.
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise
+
+    def _cached_embedding(self, cache_key: str) -> np.ndarray | None:
         if self._embedding_cache_size > 0 and cache_key in self._embedding_cache:
             self._embedding_cache.move_to_end(cache_key)
             return self._embedding_cache[cache_key]
+        return None
 
-        async with self._encode_lock:
-            if self._embedding_cache_size > 0 and cache_key in self._embedding_cache:
-                self._embedding_cache.move_to_end(cache_key)
-                return self._embedding_cache[cache_key]
+    def _catalog_embedding(
+        self, query: str, category_id: str | None = None
+    ) -> np.ndarray | None:
+        """Return the stored name embedding of a product named exactly ``query``."""
+        order = list(self.index)
+        if category_id in self.index:
+            order.remove(category_id)
+            order.insert(0, category_id)
+        for cat_id in order:
+            cat_data = self.index.get(cat_id)
+            name_index = cat_data.get("name_index") if cat_data else None
+            if name_index is None:
+                continue
+            row = name_index.find(query)
+            if row is not None:
+                return name_embeddings(cat_data)[row]
+        return None
 
-            embedding = await asyncio.to_thread(
-                lambda: self.model.encode([query], normalize_embeddings=True)[0]
-            )
-            embedding = np.array(embedding, dtype=np.float32)
+    def _has_embedding(self, query: str, category_id: str) -> bool:
+        """True if the query embedding is available without the model."""
+        cache_key = query.strip().lower()
+        return (
+            self._cached_embedding(cache_key) is not None
+            or self._catalog_embedding(cache_key, category_id) is not None
+        )
 
-            if self._embedding_cache_size > 0:
-                self._embedding_cache[cache_key] = embedding
-                self._embedding_cache.move_to_end(cache_key)
-                if len(self._embedding_cache) > self._embedding_cache_size:
-                    self._embedding_cache.popitem(last=False)
-            return embedding
+    def _encode_sync(self, query: str) -> np.ndarray:
+        """Encode one query with the configured encoder (blocking)."""
+        return self.encoder.encode(query)
+
+    async def _encode(
+        self, query: str, cache_key: str, deadline: float | None, background: bool = False
+    ) -> np.ndarray:
+        """Encode a query through the encode queue and store it in the LRU cache."""
+        embedding = await self._encode_queue.submit(query, deadline, background)
+
+        if self._embedding_cache_size > 0:
+            self._embedding_cache[cache_key] = embedding
+            self._embedding_cache.move_to_end(cache_key)
+            if len(self._embedding_cache) > self._embedding_cache_size:
+                self._embedding_cache.popitem(last=False)
+        return embedding
 
     async def search(
         self,
         category_id: str,
         query: str,
         filters: dict[str, Any] | None = None,
-    ) -> list[str]:
+        deadline: float | None = None,
+    ) -> SearchResult:
         """Search products in a category and return ranked product IDs.
 
+        When the query embedding is not cached and the encoder is saturated
+        (queue depth at ``DEGRADE_QUEUE_DEPTH``) or the remaining deadline is
+        shorter than the expected encode wait, the category is ranked with its
+        BM25 index only and the query is queued for background encoding, so
+        later identical searches get the full hybrid ranking.
+
         Args:
             category_id: Target category identifier from settings/endpoints map.
             query: Free-text query to score against product embeddings.
             filters: Optional endpoint-specific filters (dimensions, booleans, etc.).
+            deadline: Optional absolute ``time.monotonic()`` deadline for the
+                query encode (see ``get_query_embedding``).
+
+        Returns:
+            Search result with product IDs sorted by descending relevance
+            score. Concurrent calls with the same category, normalized query
+            and filters share one result, so callers must not mutate it.
+
+        Raises:
+            ServiceNotReady: The category (or the model) is still loading.
+            CategoryNotFound: The category is not in the loaded index.
+        """
+        cat_data = await self._resident(category_id)
+
+        key = (category_id, query.strip().lower(), normalize_filters(filters))
+        if cat_data is None:
+            return await self._search_flight.do(
+                key, lambda: self._rank_vector(category_id, query, filters, deadline)
+            )
+        return await self._search_flight.do(
+            key, lambda: self._rank(category_id, cat_data, query, filters, deadline)
+        )
+
+    async def _resident(self, category_id: str) -> dict[str, Any] | None:
+        """Return the category's in-memory data, loading it first in lazy mode.
+
+        None for pgvector-tier categories. The returned dict stays usable for
+        the whole search even if ``categories`` evicts the category meanwhile,
+        so callers must use it rather than look the category up again.
+
+        Raises:
+            ServiceNotReady: The category is still loading, or was evicted
+                before it could be used.
+            CategoryNotFound: The category is not available.
+        """
+        cat_data = None
+        if self.categories is not None:
+            cat_data = await self.categories.ensure(category_id)
+        self._check_category(category_id)
+        if category_id in self.vector_categories:
+            return None
+        if cat_data is None:
+            cat_data = self.index.get(category_id)
+        if cat_data is None:
+            raise ServiceNotReady(f"Category {category_id} was evicted; retry.")
+        return cat_data
+
+    async def _rank(
+        self,
+        category_id: str,
+        cat_data: dict[str, Any],
+        query: str,
+        filters: dict[str, Any] | None,
+        deadline: float | None,
+    ) -> SearchResult:
+        """Encode the query and rank the category's products off the event loop.
+
+        With the ranking cache (``RANKING_CACHE_MB``) the category's
+        unfiltered ranking for the query is cached, and every filter variant
+        of the query is a mask over it: a cache hit skips the encode and the
+        scoring altogether. On a miss, filters covered by a sub-index are
+        scored on the sub-index as before; the unfiltered ranking is built
+        (and cached) only for unfiltered searches and other filters.
+        """
+        version = cat_data.get("version")
+        cache_key = (category_id, query.strip().lower())
+        cacheable = self._rankings is not None and version is not None
+        ranking = self._rankings.get(cache_key, version) if cacheable else None
+        if ranking is not None:
+            started = time.perf_counter()
+            rows = await self._executor.run(
+                self.filter_ranking, cat_data, ranking, filters
+            )
+            timings = {"rank_ms": (time.perf_counter() - started) * 1000.0}
+            return SearchResult(
+                rows, cat_data["product_ids"], timings=timings, version=version
+            )
+
+        if (
+            "bm25" in cat_data
+            and self._should_degrade(deadline)
+            and not self._has_embedding(query, category_id)
+        ):
+            self.degraded_searches += 1
+            self._encode_in_background(query)
+            started = time.perf_counter()
+            rows = await self._executor.run(
+                self.rank_products_lexical, cat_data, query, filters
+            )
+            timings = {"rank_ms": (time.perf_counter() - started) * 1000.0}
+            return SearchResult(
+                rows,
+                cat_data["product_ids"],
+                mode="lexical",
+                timings=timings,
+                version=version,
+            )
+
+        started = time.perf_counter()
+        query_emb = await self.get_query_embedding(query, deadline, category_id)
+        embedded = time.perf_counter()
+        if cacheable and select_subindex(cat_data, filters)[0] is None:
+            ranking = await self._ranking_flight.do(
+                cache_key,
+                lambda: self._build_ranking(cache_key, cat_data, query, query_emb),
+            )
+            scored = time.perf_counter()
+            rows = await self._executor.run(
+                self.filter_ranking, cat_data, ranking, filters
+            )
+            timings = {
+                "embed_ms": (embedded - started) * 1000.0,
+                "score_ms": (scored - embedded) * 1000.0,
+                "rank_ms": (time.perf_counter() - scored) * 1000.0,
+            }
+            return SearchResult(
+                rows, cat_data["product_ids"], timings=timings, version=version
+            )
+
+        vector_scores = await self._score_batched(cat_data, query_emb, filters)
+        scored = time.perf_counter()
+        rows = await self._executor.run(
+            self.rank_products, cat_data, query, query_emb, filters, vector_scores
+        )
+        timings = {
+            "embed_ms": (embedded - started) * 1000.0,
+            "rank_ms": (time.perf_counter() - scored) * 1000.0,
+        }
+        if vector_scores is not None:
+            timings["score_ms"] = (scored - embedded) * 1000.0
+        return SearchResult(
+            rows, cat_data["product_ids"], timings=timings, version=version
+        )
+
+    async def _build_ranking(
+        self,
+        cache_key: tuple[str, str],
+        cat_data: dict[str, Any],
+        query: str,
+        query_emb: np.ndarray,
+    ) -> Ranking:
+        """Score every row of the category once and cache the sorted result."""
+        vector_scores = await self._score_batched(cat_data, query_emb, None)
+        rows, scores = await self._executor.run(
+            self.rank_unfiltered, cat_data, query, query_emb, vector_scores
+        )
+        ranking = Ranking(cat_data["version"], rows, scores)
+        # Not cached if the category was evicted (and purged) meanwhile.
+        if self.index.get(cache_key[0]) is cat_data:
+            self._rankings.put(cache_key, ranking)
+        return ranking
+
+    async def _score_batched(
+        self,
+        cat_data: dict[str, Any],
+        query_emb: np.ndarray,
+        filters: dict[str, Any] | None,
+    ) -> np.ndarray | None:
+        """Vector scores from the score batcher, or None to score inline.
+
+        Only matrices of at least ``SCORE_BATCH_MIN_ROWS`` rows are batched;
+        for smaller ones the GEMV is cheaper than the wait. The matrix is the
+        one ``rank_products`` would score (same sub-index selection).
+        """
+        if self._score_batcher is None:
+            return None
+        subset, _ = select_subindex(cat_data, filters)
+        size = len(subset.rows) if subset is not None else len(cat_data["product_ids"])
+        if size < settings.score_batch_min_rows:
+            return None
+        return await self._score_batcher.score(
+            (id(cat_data), id(subset)),
+            lambda: scoring_matrix(cat_data, subset),
+            stacked_query(cat_data, query_emb),
+        )
+
+    async def _rank_vector(
+        self,
+        category_id: str,
+        query: str,
+        filters: dict[str, Any] | None,
+        deadline: float | None,
+    ) -> SearchResult:
+        """Rank a pgvector-tier category: nearest candidates from SQL, then boost.
+
+        Only the top ``PGVECTOR_CANDIDATES`` products by vector similarity are
+        considered, so a strong lexical match outside them is not returned.
+        Scoring that many rows is cheap, so it runs on the event loop.
+        """
+        started = time.perf_counter()
+        query_emb = await self.get_query_embedding(query, deadline, category_id)
+        embedded = time.perf_counter()
+        candidates = await self.vector_categories[category_id].nearest(
+            query_emb, filters, settings.pgvector_candidates
+        )
+        fetched = time.perf_counter()
+        rows, scores = score_candidates(candidates, query)
+        rows = self._finalize(rows, scores, candidates, None)
+        timings = {
+            "embed_ms": (embedded - started) * 1000.0,
+            "db_ms": (fetched - embedded) * 1000.0,
+            "rank_ms": (time.perf_counter() - fetched) * 1000.0,
+        }
+        return SearchResult(rows, candidates["product_ids"], timings=timings)
+
+    def _should_degrade(self, deadline: float | None) -> bool:
+        """Return True if a cache miss should be answered lexically."""
+        if not settings.lexical_fallback:
+            return False
+        queue = self._encode_queue
+        # Encodes registered in the single-flight layer may not have reached
+        # the queue yet, so count whichever is larger.
+        pending = max(queue.depth, self._encode_flight.in_flight)
+        if 0 < settings.degrade_queue_depth <= pending:
+            return True
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            return remaining < (pending + 1) * queue.encode_time_s
+        return False
+
+    def _encode_in_background(self, query: str) -> None:
+        """Queue an encode whose only purpose is to fill the embedding cache.
+
+        It runs at background priority and in its own single-flight group, so
+        it counts toward neither ``_should_degrade`` nor shedding and cannot
+        keep the service in lexical mode.
+        """
+        cache_key = query.strip().lower()
+        if cache_key in self._encode_flight:
+            return
+        deadline = time.monotonic() + settings.request_deadline_ms / 1000.0
+        task = asyncio.ensure_future(
+            self._background_flight.do(
+                cache_key, lambda: self._encode(query, cache_key, deadline, background=True)
+            )
+        )
+        self._background.add(task)
+        self.background_encodes += 1
+
+        def done(t: asyncio.Task) -> None:
+            self._background.discard(t)
+            if not t.cancelled() and t.exception() is not None:
+                logger.debug("Background encode failed: %s", t.exception())
+
+        task.add_done_callback(done)
+
+    @staticmethod
+    def rank_products(
+        cat_data: dict[str, Any],
+        query: str,
+        query_emb: np.ndarray,
+        filters: dict[str, Any] | None,
+        vector_scores: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Score, filter, sort and threshold one category (blocking).
+
+        Args:
+            cat_data: Category index entry.
+            query: Free-text query used for lexical features.
+            query_emb: Normalized query embedding.
+            filters: Optional endpoint-specific filters.
+            vector_scores: Precomputed vector scores of the rows that will be
+                scored (see ``_score_batched``), if any.
 
         Returns:
-            Product IDs sorted by descending relevance score.
+            Category rows sorted by descending relevance score.
+        """
+        subset, filters = select_subindex(cat_data, filters)
+        rows, scores = score_products(
+            cat_data, query, query_emb, subset, vector_scores
+        )
+        return SearchEngine._finalize(rows, scores, cat_data, filters)
+
+    @staticmethod
+    def rank_unfiltered(
+        cat_data: dict[str, Any],
+        query: str,
+        query_emb: np.ndarray,
+        vector_scores: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Score and sort every row, dropping rows below ``MIN_SCORE`` (blocking).
+
+        Returns ``(rows, scores)`` by descending score; any filter's result is
+        a subsequence of it (see ``filter_ranking``).
+        """
+        rows, scores = score_products(cat_data, query, query_emb, None, vector_scores)
+        order = np.argsort(-scores, kind="stable")
+        rows, scores = rows[order], scores[order]
+        keep = scores >= MIN_SCORE
+        return rows[keep], scores[keep]
+
+    @staticmethod
+    def filter_ranking(
+        cat_data: dict[str, Any],
+        ranking: Ranking,
+        filters: dict[str, Any] | None,
+    ) -> np.ndarray:
+        """Mask a cached unfiltered ranking with ``filters`` and threshold it.
+
+        Gives the same rows as ``rank_products``: masking keeps the order, and
+        the threshold is taken from the best row that passes the filters.
         """
-        query_emb = await self.get_query_embedding(query)
+        rows, scores = ranking.rows, ranking.scores
+        if filters:
+            keep = apply_filters(rows, cat_data, filters)
+            rows, scores = rows[keep], scores[keep]
+        return SearchEngine._threshold(rows, scores)
 
-        cat_data = self.index[category_id]
-        results = score_products(cat_data, query, query_emb)
+    @staticmethod
+    def rank_products_lexical(
+        cat_data: dict[str, Any],
+        query: str,
+        filters: dict[str, Any] | None,
+    ) -> np.ndarray:
+        """Rank one category with the BM25 index only (blocking, no model)."""
+        subset, filters = select_subindex(cat_data, filters)
+        rows, scores = score_products_lexical(cat_data, query, subset)
+        return SearchEngine._finalize(rows, scores, cat_data, filters)
 
+    @staticmethod
+    def _finalize(
+        rows: np.ndarray,
+        scores: np.ndarray,
+        cat_data: dict[str, Any],
+        filters: dict[str, Any] | None,
+    ) -> np.ndarray:
+        """Apply filters, sort by score and drop weak matches."""
         if filters:
-            results = apply_filters(results, cat_data, filters)
+            keep = apply_filters(rows, cat_data, filters)
+            rows, scores = rows[keep], scores[keep]
+
+        # Stable, so equal scores keep row order like the former list sort.
+        order = np.argsort(-scores, kind="stable")
+        return SearchEngine._threshold(rows[order], scores[order])
+
+    @staticmethod
+    def _threshold(rows: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        """Drop weak matches from rows sorted by descending score."""
+        if len(scores):
+            threshold = max(MIN_SCORE, float(scores[0]) * 0.25)
+            rows = rows[scores >= threshold]
+        return rows
+
+    def has_category(self, category_id: str) -> bool:
+        """True if the category is in memory, served from pgvector or loadable.
 
-        results.sort(key=lambda x: x[1], reverse=True)
+        With ``SHARD_CATEGORIES`` only the categories assigned to this node
+        count.
+        """
+        if self._shard is not None and category_id not in self._shard:
+            return False
+        return (
+            category_id in self.index
+            or category_id in self.vector_categories
+            or (self.categories is not None and self.categories.knows(category_id))
+        )
+
+    def forget_category(self, category_id: str) -> None:
+        """Drop cached rankings of a category evicted from memory."""
+        if self._rankings is not None:
+            self._rankings.purge(category_id)
+
+    def index_version(self, category_id: str) -> str | None:
+        """Content version of an in-memory category, or None.
+
+        None for categories not loaded (yet) and for the pgvector tier, whose
+        rows are read live from the DB.
+        """
+        cat_data = self.index.get(category_id)
+        return cat_data.get("version") if cat_data is not None else None
+
+    def _check_category(self, category_id: str) -> None:
+        if not self.has_category(category_id):
+            if self._shard is not None and category_id not in self._shard:
+                raise CategoryNotFound(
+                    f"Category {category_id} is not served by this shard."
+                )
+            if self.index_loading:
+                raise ServiceNotReady(f"Category {category_id} is still loading.")
+            raise CategoryNotFound(f"Category {category_id} is not available.")
+
+    async def suggest(self, category_id: str, prefix: str, limit: int) -> list[str]:
+        """Return name completions for a prefix within one category.
+
+        Answered from the category's in-memory prefix index; no model call.
+        A lazily loaded category is loaded first. Categories on the pgvector
+        tier have no prefix index and return none.
+
+        Raises:
+            ServiceNotReady: The category is still loading.
+            CategoryNotFound: The category is not in the loaded index.
+        """
+        cat_data = await self._resident(category_id)
+        if cat_data is None:
+            # pgvector tier: names are not held in memory.
+            return []
+        prefix_index = cat_data.get("prefix_index")
+        if prefix_index is None:
+            return []
+        return [name for name, _ in prefix_index.complete(prefix, limit)]
+
+    def suggest_all(
+        self, category_ids: list[str], prefix: str, limit: int
+    ) -> list[tuple[str, str, float]]:
+        """Return the best ``limit`` (category_id, name, prior) completions across categories.
+
+        Completions are ordered by descending prior. A name found in several
+        categories (e.g. tiles and the synthetic flooring category) is
+        returned once, for the first category listed. Only categories
+        currently in memory contribute.
+        """
+        candidates: list[tuple[float, str, str]] = []
+        for category_id in category_ids:
+            cat_data = self.index.get(category_id)
+            prefix_index = cat_data.get("prefix_index") if cat_data else None
+            if prefix_index is None:
+                continue
+            for name, prior in prefix_index.complete(prefix, limit):
+                candidates.append((prior, category_id, name))
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        results: list[tuple[str, str, float]] = []
+        seen: set[str] = set()
+        for prior, category_id, name in candidates:
+            if name not in seen:
+                seen.add(name)
+                results.append((category_id, name, prior))
+                if len(results) == limit:
+                    break
+        return results
 
-        # Remove products that are not good matches
-        if results:
-            top_score = results[0][1]
-            threshold = max(0.10, top_score * 0.25)
-            results = [(pid, s) for pid, s in results if s >= threshold]
+    def stats(self) -> dict[str, Any]:
+        """Return runtime counters for monitoring."""
+        return {
+            "embedding_cache": {
+                "size": len(self._embedding_cache),
+                "max_size": self._embedding_cache_size,
+                "catalog_name_hits": self.catalog_name_hits,
+            },
+            "encode_queue": self._encode_queue.stats(),
+            "encode_coalescing": self._encode_flight.stats(),
+            "background_encode_coalescing": self._background_flight.stats(),
+            "search_coalescing": self._search_flight.stats(),
+            "ranking_cache": (
+                self._rankings.stats() if self._rankings is not None else None
+            ),
+            "ranking_executor": self._executor.stats(),
+            "score_batching": (
+                self._score_batcher.stats() if self._score_batcher is not None else None
+            ),
+            "degraded": {
+                "searches": self.degraded_searches,
+                "background_encodes": self.background_encodes,
+            },
+            "categories": {
+                category_id: {
+                    "products": len(data["product_ids"]),
+                    "resident_mb": round(data["resident_bytes"] / 1024 / 1024, 1),
+                    "load_seconds": round(data["load_seconds"], 2),
+                    "version": data.get("version"),
+                }
+                for category_id, data in self.index.items()
+            },
+            "category_cache": (
+                self.categories.stats() if self.categories is not None else None
+            ),
+        }
 
-        return [r[0] for r in results]
+    def close(self) -> None:
+        """Release worker threads and pending encodes."""
+        for task in self._background:
+            task.cancel()
+        self._encode_queue.close()
+        if self._score_batcher is not None:
+            self._score_batcher.close()
+        self._executor.shutdown()
+        self.encoder.close()
@@ -0,0 +1,90 @@
+"""Bounded worker pool for CPU-bound ranking work."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class RankingExecutor:
+    """Run blocking ranking functions on a bounded thread pool.
+
+    Threads are enough here because the heavy parts (matrix products, sorts)
+    run in NumPy with the GIL released. At most ``max_workers + max_queue``
+    jobs are admitted at once; further callers wait on the event loop, which
+    keeps memory bounded under bursts. Queue time is measured from the call
+    until a worker thread picks the job up.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int) -> None:
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._slots: asyncio.Semaphore | None = None
+        self._pool: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.active = 0
+        self._queue_time_total = 0.0
+        self._queue_time_max = 0.0
+        self._run_time_total = 0.0
+
+    def _ensure_started(self) -> None:
+        # Created lazily so the pool is never inherited across a fork.
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="ranking"
+            )
+            self._slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` on a worker thread and return its result."""
+        self._ensure_started()
+        queued_at = time.perf_counter()
+        async with self._slots:
+            self.submitted += 1
+
+            def job() -> T:
+                started = time.perf_counter()
+                with self._lock:
+                    self.active += 1
+                    wait = started - queued_at
+                    self._queue_time_total += wait
+                    self._queue_time_max = max(self._queue_time_max, wait)
+                try:
+                    return fn(*args)
+                finally:
+                    with self._lock:
+                        self.active -= 1
+                        self.completed += 1
+                        self._run_time_total += time.perf_counter() - started
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, job)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            completed = self.completed
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": self.active,
+                "queued": self.submitted - completed - self.active,
+                "submitted": self.submitted,
+                "completed": completed,
+                "queue_time_ms_avg": (
+                    self._queue_time_total / completed * 1000.0 if completed else 0.0
+                ),
+                "queue_time_ms_max": self._queue_time_max * 1000.0,
+                "run_time_ms_avg": (
+                    self._run_time_total / completed * 1000.0 if completed else 0.0
+                ),
+            }
@@ -1,54 +1,170 @@
+from dataclasses import dataclass
+from itertools import combinations
 from typing import Any
 
+import numpy as np
+
+HOLE_SPACING_FLAGS = {
+    "Single Hole": "single_hole",
+    "Widespread": "widespread",
+    "Centerset": "centerset",
+}
+TILE_LOCATIONS = ["wall", "floor", "shower_wall", "shower_floor"]
+
+
+def _flag(cat_data: dict[str, Any], name: str, rows: np.ndarray) -> np.ndarray:
+    """Return a flag column for ``rows``: 1 true, 0 false, -1 unknown."""
+    column = cat_data["filters"].get(name)
+    if column is None:
+        return np.full(len(rows), -1, dtype=np.int8)
+    return column[rows]
+
+
+def _dimension_exceeds(
+    cat_data: dict[str, Any], name: str, rows: np.ndarray, limit: float
+) -> np.ndarray:
+    column = cat_data["dimensions"].get(name)
+    if column is None:
+        return np.zeros(len(rows), dtype=bool)
+    # Unknown dimensions are NaN, which never compare greater.
+    return column[rows] > limit
+
 
 def apply_filters(
-    results: list[tuple[str, float]],
+    rows: np.ndarray,
     cat_data: dict[str, Any],
     filters: dict[str, Any],
-) -> list[tuple[str, float]]:
-    filtered: list[tuple[str, float]] = []
-
-    for pid, score in results:
-        keep = True
-
-        if (
-            "holeSpacingCompatibility" in filters
-            and filters["holeSpacingCompatibility"]
-        ):
-            f = cat_data["filters"].get(pid, {})
-            value = filters["holeSpacingCompatibility"]
-            if value == "Single Hole" and not f.get("single_hole"):
-                keep = False
-            elif value == "Widespread" and not f.get("widespread"):
-                keep = False
-            elif value == "Centerset" and not f.get("centerset"):
-                keep = False
-
-        if "locations" in filters and filters["locations"]:
-            f = cat_data["filters"].get(pid, {})
-            for loc in filters["locations"]:
-                if not f.get(loc):
-                    keep = False
-                    break
-
-        if "hasTubSpout" in filters and filters["hasTubSpout"] is not None:
-            f = cat_data["filters"].get(pid, {})
-            if f.get("has_tub_spout") != filters["hasTubSpout"]:
-                keep = False
-
-        if "lengthMax" in filters and filters["lengthMax"] is not None:
-            d = cat_data["dimensions"].get(pid, {})
-            length = d.get("length")
-            if length and length > filters["lengthMax"]:
-                keep = False
-
-        if "widthMax" in filters and filters["widthMax"] is not None:
-            d = cat_data["dimensions"].get(pid, {})
-            width = d.get("width")
-            if width and width > filters["widthMax"]:
-                keep = False
-
-        if keep:
-            filtered.append((pid, score))
-
-    return filtered
+) -> np.ndarray:
+    """Return a boolean mask over ``rows`` of the products that pass ``filters``."""
+    keep = np.ones(len(rows), dtype=bool)
+
+    if "holeSpacingCompatibility" in filters and filters["holeSpacingCompatibility"]:
+        flag = HOLE_SPACING_FLAGS.get(filters["holeSpacingCompatibility"])
+        if flag:
+            keep &= _flag(cat_data, flag, rows) == 1
+
+    if "locations" in filters and filters["locations"]:
+        for loc in filters["locations"]:
+            keep &= _flag(cat_data, loc, rows) == 1
+
+    if "hasTubSpout" in filters and filters["hasTubSpout"] is not None:
+        keep &= _flag(cat_data, "has_tub_spout", rows) == int(filters["hasTubSpout"])
+
+    if "lengthMax" in filters and filters["lengthMax"] is not None:
+        keep &= ~_dimension_exceeds(cat_data, "length", rows, filters["lengthMax"])
+
+    if "widthMax" in filters and filters["widthMax"] is not None:
+        keep &= ~_dimension_exceeds(cat_data, "width", rows, filters["widthMax"])
+
+    return keep
+
+
+def normalize_filters(filters: dict[str, Any] | None) -> tuple:
+    """Return a hashable, order-independent form of request filters."""
+    if not filters:
+        return ()
+    return tuple(
+        sorted(
+            (name, tuple(sorted(value)) if isinstance(value, list) else value)
+            for name, value in filters.items()
+            if value is not None
+        )
+    )
+
+
+@dataclass
+class SubIndex:
+    """Rows of a category matching one filter value, optionally materialized.
+
+    ``embeddings`` is a contiguous copy of ``embeddings[rows]`` when it fit in
+    the memory cap; otherwise it is None and rows are gathered per request.
+    """
+
+    rows: np.ndarray
+    embeddings: np.ndarray | None = None
+
+
+def _subindex_rows(
+    cat_data: dict[str, Any], filter_name: str
+) -> dict[tuple, np.ndarray]:
+    """Return matching rows for every value of a low-cardinality filter."""
+    all_rows = np.arange(len(cat_data["product_ids"]))
+
+    if filter_name == "holeSpacingCompatibility":
+        return {
+            (filter_name, value): np.flatnonzero(
+                _flag(cat_data, flag, all_rows) == 1
+            ).astype(np.int32)
+            for value, flag in HOLE_SPACING_FLAGS.items()
+        }
+
+    if filter_name == "hasTubSpout":
+        spout = _flag(cat_data, "has_tub_spout", all_rows)
+        return {
+            (filter_name, value): np.flatnonzero(spout == int(value)).astype(np.int32)
+            for value in (True, False)
+        }
+
+    if filter_name == "locations":
+        # One bit per location; a requested set matches rows having all its bits.
+        bits = np.zeros(len(all_rows), dtype=np.uint8)
+        for bit, loc in enumerate(TILE_LOCATIONS):
+            bits |= (_flag(cat_data, loc, all_rows) == 1).astype(np.uint8) << bit
+        result = {}
+        for size in range(1, len(TILE_LOCATIONS) + 1):
+            for wanted in combinations(range(len(TILE_LOCATIONS)), size):
+                mask = sum(1 << bit for bit in wanted)
+                key = frozenset(TILE_LOCATIONS[bit] for bit in wanted)
+                result[(filter_name, key)] = np.flatnonzero(
+                    (bits & mask) == mask
+                ).astype(np.int32)
+        return result
+
+    return {}
+
+
+def build_subindexes(
+    cat_data: dict[str, Any],
+    filter_names: list[str],
+    max_bytes: int,
+) -> dict[tuple, SubIndex]:
+    """Precompute row sets (and embedding sub-matrices) per filter value.
+
+    Only low-cardinality filters are materialized (faucet hole spacing, tile
+    locations, shower tub spout). Sub-matrices are copied smallest key first
+    (single values before combinations) until ``max_bytes`` is used; the rest
+    keep row lists only.
+    """
+    subindexes: dict[tuple, SubIndex] = {}
+    embeddings = cat_data["embeddings"]
+    row_bytes = embeddings.strides[0] if embeddings.ndim == 2 else 0
+    used = 0
+    for filter_name in filter_names:
+        for key, rows in _subindex_rows(cat_data, filter_name).items():
+            sub = SubIndex(rows)
+            size = len(rows) * row_bytes
+            if used + size <= max_bytes:
+                sub.embeddings = np.ascontiguousarray(embeddings[rows])
+                used += size
+            subindexes[key] = sub
+    return subindexes
+
+
+def select_subindex(
+    cat_data: dict[str, Any],
+    filters: dict[str, Any] | None,
+) -> tuple[SubIndex | None, dict[str, Any] | None]:
+    """Return a sub-index covering one of the filters and the filters left over."""
+    subindexes = cat_data.get("subindexes")
+    if not filters or not subindexes:
+        return None, filters
+
+    for name, value in filters.items():
+        if value is None or value == []:
+            continue
+        key = (name, frozenset(value) if isinstance(value, list) else value)
+        sub = subindexes.get(key)
+        if sub is not None:
+            remaining = {k: v for k, v in filters.items() if k != name}
+            return sub, remaining or None
+    return None, filters
@@ -0,0 +1,66 @@
+import math
+from typing import Sequence
+
+import numpy as np
+
+
+class BM25Index:
+    """Okapi BM25 over whitespace tokens of lowercased names.
+
+    Needs no model, so it can rank a category while the query encoder is
+    saturated. Posting lists also give the per-row token overlap used by the
+    hybrid scorer without re-tokenizing every name per request.
+    """
+
+    def __init__(self, names: Sequence[str], k1: float = 1.2, b: float = 0.75) -> None:
+        postings: dict[str, dict[int, int]] = {}
+        doc_len = np.zeros(len(names), dtype=np.float32)
+        for row, name in enumerate(names):
+            tokens = name.split()
+            doc_len[row] = len(tokens)
+            for token in tokens:
+                counts = postings.setdefault(token, {})
+                counts[row] = counts.get(row, 0) + 1
+
+        self.k1 = k1
+        self.b = b
+        self.size = len(names)
+        avgdl = float(doc_len.mean()) if len(names) else 0.0
+        # Per-row length normalization term of the BM25 denominator.
+        self._norm = (
+            k1 * (1.0 - b + b * doc_len / avgdl)
+            if avgdl > 0
+            else np.full(len(names), k1, dtype=np.float32)
+        ).astype(np.float32)
+        self._postings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self._idf: dict[str, float] = {}
+        for token, counts in postings.items():
+            rows = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+            tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            self._postings[token] = (rows, tf)
+            df = len(counts)
+            self._idf[token] = math.log(1.0 + (self.size - df + 0.5) / (df + 0.5))
+
+    @property
+    def nbytes(self) -> int:
+        return self._norm.nbytes + sum(
+            rows.nbytes + tf.nbytes for rows, tf in self._postings.values()
+        )
+
+    def rows_with(self, token: str) -> np.ndarray | None:
+        """Return rows whose name contains ``token``, or None if none do."""
+        entry = self._postings.get(token)
+        return entry[0] if entry is not None else None
+
+    def score(self, query_tokens: set[str]) -> np.ndarray:
+        """Return BM25 scores of every row for a set of query tokens."""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for token in query_tokens:
+            entry = self._postings.get(token)
+            if entry is None:
+                continue
+            rows, tf = entry
+            scores[rows] += (
+                self._idf[token] * tf * (self.k1 + 1.0) / (tf + self._norm[rows])
+            )
+        return scores
@@ -0,0 +1,48 @@
+from hashlib import blake2b
+from typing import Sequence
+
+import numpy as np
+
+
+def normalize_name(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _name_hash(text: str) -> int:
+    return int.from_bytes(blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class NameIndex:
+    """Exact lookup from a normalized product name to its row.
+
+    Names are normalized (lowercased, whitespace collapsed) and hashed to
+    64 bits; hashes are kept in one sorted array next to their rows, so a
+    lookup is a binary search plus a string comparison on the (rare) hash
+    collision candidates.
+    """
+
+    def __init__(self, names: Sequence[str]) -> None:
+        hashes = np.fromiter(
+            (_name_hash(normalize_name(name)) for name in names),
+            dtype=np.uint64,
+            count=len(names),
+        )
+        order = np.argsort(hashes, kind="stable")
+        self._names = names
+        self._hashes = hashes[order]
+        self._rows = order.astype(np.int32)
+
+    @property
+    def nbytes(self) -> int:
+        return self._hashes.nbytes + self._rows.nbytes
+
+    def find(self, text: str) -> int | None:
+        """Return the first row whose normalized name equals ``text``, if any."""
+        key = normalize_name(text)
+        h = np.uint64(_name_hash(key))
+        lo = int(np.searchsorted(self._hashes, h, side="left"))
+        hi = int(np.searchsorted(self._hashes, h, side="right"))
+        for row in self._rows[lo:hi].tolist():
+            if normalize_name(self._names[row]) == key:
+                return row
+        return None
@@ -0,0 +1,63 @@
+import numpy as np
+
+from app.search.columns import NameColumn
+
+GRAM_SIZE = 3
+
+# Once this few candidates remain, verifying them directly is cheaper than
+# intersecting further posting lists.
+VERIFY_THRESHOLD = 64
+
+
+def _grams(text: str) -> set[str]:
+    return {text[i : i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class TrigramIndex:
+    """Inverted index from character trigrams to rows of lowercased names.
+
+    Used to find the names that contain a query as a substring without
+    scanning every name: the trigram posting lists of the query are
+    intersected (rarest first) and only the surviving candidates are
+    verified with a real substring check.
+    """
+
+    def __init__(self, names: NameColumn) -> None:
+        postings: dict[str, list[int]] = {}
+        for row, name in enumerate(names):
+            for gram in _grams(name):
+                postings.setdefault(gram, []).append(row)
+
+        self._names = names
+        self._postings = {
+            gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(rows.nbytes for rows in self._postings.values())
+
+    def find(self, substring: str) -> np.ndarray:
+        """Return sorted row indices whose name contains ``substring``."""
+        names = self._names
+        if len(substring) < GRAM_SIZE:
+            return names.find(substring)
+
+        lists = []
+        for gram in _grams(substring):
+            rows = self._postings.get(gram)
+            if rows is None:
+                return np.empty(0, dtype=np.int32)
+            lists.append(rows)
+        lists.sort(key=len)
+
+        candidates = lists[0]
+        for rows in lists[1:]:
+            if len(candidates) <= VERIFY_THRESHOLD:
+                break
+            candidates = np.intersect1d(candidates, rows, assume_unique=True)
+
+        return names.find(substring, candidates)
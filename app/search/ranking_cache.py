@@ -0,0 +1,96 @@
+"""Unfiltered rankings reused across the filter variants of a query."""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+
+@dataclass
+class Ranking:
+    """A category's rows sorted by descending score, weak rows dropped.
+
+    Built for one index ``version`` of the category; ``rows`` index into that
+    version's columns only.
+    """
+
+    version: str
+    rows: np.ndarray
+    scores: np.ndarray
+
+    @property
+    def nbytes(self) -> int:
+        return self.rows.nbytes + self.scores.nbytes
+
+
+class RankingCache:
+    """LRU cache of unfiltered rankings under a byte budget.
+
+    Keyed by ``(category_id, normalized query)``. All entries of a category
+    are built for one index version: when a lookup or a new entry shows the
+    category was reloaded with different content, its older entries are
+    purged at once. ``purge`` also drops a category evicted from memory.
+    Rankings larger than the whole budget are not cached.
+    """
+
+    def __init__(self, budget_bytes: int) -> None:
+        self.budget_bytes = budget_bytes
+        self._items: OrderedDict[tuple[str, str], Ranking] = OrderedDict()
+        self._versions: dict[str, str] = {}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple[str, str], version: str) -> Ranking | None:
+        self._check_version(key[0], version)
+        ranking = self._items.get(key)
+        if ranking is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return ranking
+
+    def put(self, key: tuple[str, str], ranking: Ranking) -> None:
+        self._check_version(key[0], ranking.version)
+        if ranking.nbytes > self.budget_bytes:
+            return
+        if key in self._items:
+            self._remove(key)
+        self._items[key] = ranking
+        self._versions[key[0]] = ranking.version
+        self.nbytes += ranking.nbytes
+        while self.nbytes > self.budget_bytes:
+            self._remove(next(iter(self._items)))
+
+    def purge(self, category_id: str) -> None:
+        """Drop every ranking of a category."""
+        for key in [key for key in self._items if key[0] == category_id]:
+            self._remove(key)
+        self._versions.pop(category_id, None)
+
+    def _check_version(self, category_id: str, version: str) -> None:
+        cached = self._versions.get(category_id)
+        if cached is not None and cached != version:
+            self.purge(category_id)
+            self.invalidations += 1
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        self.nbytes -= self._items.pop(key).nbytes
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._versions.clear()
+        self.nbytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._items),
+            "mb": round(self.nbytes / 1024 / 1024, 1),
+            "budget_mb": round(self.budget_bytes / 1024 / 1024, 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
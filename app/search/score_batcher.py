@@ -0,0 +1,121 @@
+"""Batching of concurrent vector scoring against the same embedding matrix."""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable
+
+import numpy as np
+
+from app.search.executor import RankingExecutor
+
+
+@dataclass
+class _Batch:
+    matrix: Callable[[], np.ndarray]
+    queries: list[np.ndarray] = field(default_factory=list)
+    futures: list[asyncio.Future] = field(default_factory=list)
+    timer: asyncio.TimerHandle | None = None
+
+
+class ScoreBatcher:
+    """Score queries for the same matrix together, one GEMM per batch.
+
+    A single ``embeddings @ query`` streams the whole matrix from memory for
+    one query. Queries for the same matrix key that arrive within
+    ``window_s`` of the first one (up to ``max_batch``) are stacked and
+    multiplied in one matrix-matrix product on the ranking executor, so the
+    matrix is read once for the whole batch. Each caller gets its own row of
+    scores back and finishes its ranking on its own.
+    """
+
+    def __init__(
+        self, executor: RankingExecutor, window_s: float, max_batch: int
+    ) -> None:
+        self._executor = executor
+        self.window_s = max(0.0, window_s)
+        self.max_batch = max(1, max_batch)
+        self._open: dict[Hashable, _Batch] = {}
+        self._running: set[asyncio.Task] = set()
+        self.batches = 0
+        self.scored = 0
+        self.largest = 0
+
+    async def score(
+        self,
+        key: Hashable,
+        matrix: Callable[[], np.ndarray],
+        query: np.ndarray,
+    ) -> np.ndarray:
+        """Return ``matrix() @ query``, computed together with concurrent queries.
+
+        Args:
+            key: Identifies the matrix; calls with equal keys must pass
+                callables returning the same matrix.
+            matrix: Builds the matrix to score (called once per batch, on a
+                worker thread).
+            query: Query vector matching the matrix's columns.
+        """
+        loop = asyncio.get_running_loop()
+        batch = self._open.get(key)
+        if batch is None:
+            batch = self._open[key] = _Batch(matrix)
+            batch.timer = loop.call_later(self.window_s, self._flush, key, batch)
+        future = loop.create_future()
+        batch.queries.append(query)
+        batch.futures.append(future)
+        if len(batch.queries) >= self.max_batch:
+            self._flush(key, batch)
+        return await future
+
+    def _flush(self, key: Hashable, batch: _Batch) -> None:
+        if self._open.get(key) is not batch:
+            return
+        del self._open[key]
+        batch.timer.cancel()
+        self.batches += 1
+        self.scored += len(batch.queries)
+        self.largest = max(self.largest, len(batch.queries))
+        task = asyncio.ensure_future(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: _Batch) -> None:
+        try:
+            scores = await self._executor.run(_multiply, batch.matrix, batch.queries)
+        except asyncio.CancelledError:
+            for future in batch.futures:
+                future.cancel()
+            raise
+        except Exception as exc:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for future, row in zip(batch.futures, scores):
+            if not future.done():
+                future.set_result(row)
+
+    def close(self) -> None:
+        for batch in self._open.values():
+            batch.timer.cancel()
+            for future in batch.futures:
+                future.cancel()
+        self._open.clear()
+        for task in self._running:
+            task.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "window_ms": self.window_s * 1000.0,
+            "max_batch": self.max_batch,
+            "open": len(self._open),
+            "batches": self.batches,
+            "scored": self.scored,
+            "avg_batch": self.scored / self.batches if self.batches else 0.0,
+            "largest": self.largest,
+        }
+
+
+def _multiply(matrix: Callable[[], np.ndarray], queries: list[np.ndarray]) -> np.ndarray:
+    # (batch, dims) @ (dims, rows): each result row is contiguous.
+    return np.stack(queries) @ matrix().T
@@ -1,31 +1,153 @@
 import numpy as np
 from typing import Any
 
+from app.config import settings
+from app.search.filters import SubIndex
+
+
+def exact_match_rows(cat_data: dict[str, Any], query_lower: str) -> np.ndarray:
+    trigrams = cat_data.get("trigrams")
+    if trigrams is not None:
+        return trigrams.find(query_lower)
+    return cat_data["names"].find(query_lower)
+
+
+def token_overlap(cat_data: dict[str, Any], query_tokens: set[str]) -> np.ndarray:
+    overlap = np.zeros(len(cat_data["product_ids"]), dtype=np.float64)
+    if not query_tokens:
+        return overlap
+
+    bm25 = cat_data.get("bm25")
+    if bm25 is not None:
+        for token in query_tokens:
+            rows = bm25.rows_with(token)
+            if rows is not None:
+                overlap[rows] += 1.0
+    else:
+        for i, name in enumerate(cat_data["names"]):
+            overlap[i] = len(query_tokens & set(name.split()))
+    return overlap / len(query_tokens)
+
+
+def lexical_features(
+    cat_data: dict[str, Any], query_lower: str
+) -> tuple[np.ndarray, np.ndarray]:
+    exact_match = np.zeros(len(cat_data["product_ids"]), dtype=np.float64)
+    exact_match[exact_match_rows(cat_data, query_lower)] = 1.0
+    overlap = token_overlap(cat_data, set(query_lower.split()))
+    return exact_match, overlap
+
+
+def name_embeddings(cat_data: dict[str, Any]) -> np.ndarray:
+    """The name half of a category's embedding matrix (a view)."""
+    embeddings = cat_data["embeddings"]
+    dims = cat_data.get("description_dims", 0)
+    return embeddings[:, : embeddings.shape[1] - dims] if dims else embeddings
+
+
+def stacked_query(cat_data: dict[str, Any], query_emb: np.ndarray) -> np.ndarray:
+    """Query vector whose product with a stacked embedding row is the fused score.
+
+    Rows hold ``[name | description[:k]]``, so multiplying by
+    ``[(1 - w) * q | w * normalize(q[:k])]`` gives
+    ``(1 - w) * name_sim + w * description_sim`` in a single GEMV.
+    """
+    dims = cat_data.get("description_dims", 0)
+    if not dims:
+        return query_emb
+    weight = settings.description_weight
+    head = query_emb[:dims]
+    norm = float(np.linalg.norm(head))
+    return np.concatenate(
+        [(1.0 - weight) * query_emb, weight * head / (norm or 1.0)]
+    ).astype(query_emb.dtype, copy=False)
+
+
+def _rows(cat_data: dict[str, Any], subset: SubIndex | None) -> np.ndarray:
+    if subset is None:
+        return np.arange(len(cat_data["product_ids"]), dtype=np.int32)
+    return subset.rows
+
+
+def scoring_matrix(
+    cat_data: dict[str, Any], subset: SubIndex | None = None
+) -> np.ndarray:
+    """Embedding rows scored for a search: the category's, or ``subset``'s."""
+    if subset is None:
+        return cat_data["embeddings"]
+    if subset.embeddings is not None:
+        return subset.embeddings
+    return cat_data["embeddings"][subset.rows]
+
 
 def score_products(
     cat_data: dict[str, Any],
     query: str,
     query_emb: np.ndarray,
-) -> list[tuple[str, float]]:
-    query_lower = query.lower().strip()
-    query_tokens = set(query_lower.split())
+    subset: SubIndex | None = None,
+    vector_scores: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Hybrid scores for every row, or only for the rows of ``subset``.
 
-    product_ids = cat_data["product_ids"]
-    embeddings = cat_data["embeddings"]
-    names = cat_data["names"]
+    With description embeddings loaded, the vector score is the weighted
+    name/description fusion (see ``stacked_query``). ``vector_scores`` may be
+    passed in when it was already computed for the same rows (batched
+    scoring); otherwise it is computed here.
 
-    vector_scores = embeddings @ query_emb
+    Returns ``(rows, scores)``; product IDs are resolved by the caller for
+    the rows it actually returns.
+    """
+    query_lower = query.lower().strip()
 
-    results: list[tuple[str, float]] = []
-    for i, pid in enumerate(product_ids):
-        vs = float(vector_scores[i])
-        exact_match = 1.0 if query_lower in names[i] else 0.0
-        name_tokens = set(names[i].split())
-        overlap = (
-            len(query_tokens & name_tokens) / len(query_tokens) if query_tokens else 0.0
+    if vector_scores is None:
+        vector_scores = scoring_matrix(cat_data, subset) @ stacked_query(
+            cat_data, query_emb
         )
+    vector_scores = vector_scores.astype(np.float64)
+
+    exact_match, overlap = lexical_features(cat_data, query_lower)
+    if subset is not None:
+        exact_match = exact_match[subset.rows]
+        overlap = overlap[subset.rows]
+
+    scores = 0.70 * vector_scores + 0.20 * exact_match + 0.10 * overlap
+    return _rows(cat_data, subset), scores
+
+
+def score_candidates(
+    candidates: dict[str, Any], query: str
+) -> tuple[np.ndarray, np.ndarray]:
+    """Hybrid scores for pgvector candidates, using their stored similarity.
+
+    ``candidates`` comes from ``VectorCategory.nearest``; the lexical
+    features are computed over the candidate names only.
+    """
+    exact_match, overlap = lexical_features(candidates, query.lower().strip())
+    scores = 0.70 * candidates["similarity"] + 0.20 * exact_match + 0.10 * overlap
+    return _rows(candidates, None), scores
+
+
+def score_products_lexical(
+    cat_data: dict[str, Any],
+    query: str,
+    subset: SubIndex | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Model-free scoring: BM25 takes the place of vector similarity.
+
+    BM25 is scaled to [0, 1] by the best row so the usual weights and
+    threshold still apply. Rows without any lexical match are dropped.
+    """
+    query_lower = query.lower().strip()
 
-        score = 0.70 * vs + 0.20 * exact_match + 0.10 * overlap
-        results.append((pid, score))
+    bm25 = cat_data["bm25"].score(set(query_lower.split())).astype(np.float64)
+    top = float(bm25.max()) if len(bm25) else 0.0
+    if top > 0:
+        bm25 /= top
+    exact_match, overlap = lexical_features(cat_data, query_lower)
 
-    return results
+    scores = 0.70 * bm25 + 0.20 * exact_match + 0.10 * overlap
+    rows = _rows(cat_data, subset)
+    if subset is not None:
+        scores = scores[rows]
+    matched = np.flatnonzero(scores > 0)
+    return rows[matched], scores[matched]
@@ -0,0 +1,82 @@
+import math
+import sys
+from bisect import bisect_left
+from typing import Sequence
+
+import numpy as np
+
+from app.search.name_index import normalize_name
+
+# Longest prefix indexed; only the lookup key of a longer name is cut, the
+# completion returned is the full name.
+MAX_SUGGESTION_CHARS = 120
+
+
+class PrefixIndex:
+    """Sorted array of distinct product names for typeahead completion.
+
+    A prefix maps to a contiguous range of the sorted names (two binary
+    searches); completions in the range are ranked by a precomputed prior
+    that favours names shared by many products and shorter names. At most
+    ``max_entries`` names (highest prior first) are kept per category.
+    """
+
+    def __init__(self, names: Sequence[str], max_entries: int) -> None:
+        counts: dict[str, int] = {}
+        for name in names:
+            name = normalize_name(name)
+            if name:
+                counts[name] = counts.get(name, 0) + 1
+
+        entries = [(name, math.log1p(n) - 0.01 * len(name)) for name, n in counts.items()]
+        if max_entries > 0 and len(entries) > max_entries:
+            entries.sort(key=lambda e: e[1], reverse=True)
+            entries = entries[:max_entries]
+        entries.sort()
+
+        self._names = [name for name, _ in entries]
+        # Sorted like ``_names``, since cutting names keeps their order;
+        # names within the limit share the string object.
+        self._keys = [name[:MAX_SUGGESTION_CHARS] for name in self._names]
+        self._prior = np.array([prior for _, prior in entries], dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            sys.getsizeof(self._names)
+            + sum(sys.getsizeof(name) for name in self._names)
+            + sys.getsizeof(self._keys)
+            + sum(
+                sys.getsizeof(key)
+                for key, name in zip(self._keys, self._names)
+                if key is not name
+            )
+            + self._prior.nbytes
+        )
+
+    def complete(self, prefix: str, limit: int) -> list[tuple[str, float]]:
+        """Return up to ``limit`` (name, prior) pairs starting with ``prefix``."""
+        prefix = normalize_name(prefix)
+        if not prefix or limit <= 0:
+            return []
+        key = prefix[:MAX_SUGGESTION_CHARS]
+        lo = bisect_left(self._keys, key)
+        hi = bisect_left(self._keys, key + "\U0010ffff", lo)
+        if lo >= hi:
+            return []
+
+        rows = np.arange(lo, hi)
+        if len(prefix) > len(key):
+            # Keys hold the first MAX_SUGGESTION_CHARS characters only.
+            longer = [self._names[i].startswith(prefix) for i in rows.tolist()]
+            rows = rows[np.array(longer, dtype=bool)]
+        prior = self._prior[rows]
+        if len(rows) > limit:
+            top = np.argpartition(-prior, limit - 1)[:limit]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-prior[top], kind="stable")]
+        return [(self._names[rows[i]], float(prior[i])) for i in top.tolist()]
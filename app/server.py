@@ -0,0 +1,212 @@
+"""Prefork server: load the model and index once, then fork HTTP workers.
+
+    python -m app.server --workers 4 --port 8000 --pin-workers
+
+The master process connects to the DB, loads the model and every category,
+closes its DB pool, freezes the GC and binds the listening socket. Workers are
+forked from it and serve from the inherited model and index, whose pages stay
+shared copy-on-write as long as nobody writes to them (``gc.freeze()`` keeps
+the collector from touching object headers). Each worker opens its own DB pool
+and warms the model; torch's thread pool is only started after the fork.
+
+With a single worker (the ``WORKERS`` default) there is nothing to share, so
+the app is served by uvicorn directly: it binds first and loads in the
+background, answering ``/healthz`` and per-category 503s while loading.
+"""
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+from app.config import settings
+from app.data import db
+from app.main import app, load_index
+from app.search.engine import SearchEngine
+
+logger = logging.getLogger("app.server")
+
+# A worker that exits sooner than this after being started is not respawned,
+# so a worker that crashes on startup doesn't restart in a tight loop.
+MIN_WORKER_UPTIME_S = 5.0
+
+
+async def preload() -> SearchEngine:
+    """Load the model and the index (see ``load_index``) in the master process.
+
+    Categories loaded lazily later are loaded by each worker on its own and
+    are not shared.
+    """
+    engine = SearchEngine({})
+    engine.index_loading = True
+    await db.connect(settings.database_url)
+    try:
+        await asyncio.gather(
+            asyncio.to_thread(engine.load_model, False),
+            load_index(engine),
+        )
+    finally:
+        await db.close()
+        engine.index_loading = False
+    return engine
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def worker_cpus(index: int, pin: bool) -> set[int] | None:
+    """CPU set for worker ``index``: one core each, round-robin, if pinning."""
+    if not pin or not hasattr(os, "sched_getaffinity"):
+        return None
+    cpus = sorted(os.sched_getaffinity(0))
+    return {cpus[index % len(cpus)]}
+
+
+def run_worker(
+    engine: SearchEngine, sock: socket.socket, cpus: set[int] | None, log_level: str
+) -> None:
+    """Serve the app in a forked child; never returns."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    if cpus is not None:
+        os.sched_setaffinity(0, cpus)
+        torch = sys.modules.get("torch")
+        if torch is not None:
+            torch.set_num_threads(len(cpus))
+
+    app.state.preloaded_engine = engine
+    config = uvicorn.Config(app, log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+    os._exit(0)
+
+
+def spawn(
+    engine: SearchEngine,
+    sock: socket.socket,
+    index: int,
+    pin: bool,
+    log_level: str,
+) -> int:
+    cpus = worker_cpus(index, pin)
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(engine, sock, cpus, log_level)
+        finally:
+            os._exit(1)
+    logger.info(
+        "Started worker %d (pid %d%s)",
+        index,
+        pid,
+        f", cpus {sorted(cpus)}" if cpus else "",
+    )
+    return pid
+
+
+def serve(host: str, port: int, workers: int, pin: bool, log_level: str) -> None:
+    started = time.perf_counter()
+    engine = asyncio.run(preload())
+    if not engine.model_loaded:
+        raise RuntimeError("Model failed to load; not starting workers.")
+    if not (engine.index or engine.vector_categories or engine.categories is not None):
+        # Lazy loading and the pgvector tier serve with an empty ``index``.
+        raise RuntimeError("No category was loaded; not starting workers.")
+
+    # Everything allocated so far is the shared, read-only part.
+    gc.collect()
+    gc.freeze()
+    logger.info(
+        "Master loaded model and %d categories in %.1fs (%d objects frozen)",
+        len(engine.index),
+        time.perf_counter() - started,
+        gc.get_freeze_count(),
+    )
+
+    sock = bind_socket(host, port)
+    children: dict[int, tuple[int, float]] = {}
+    for i in range(workers):
+        children[spawn(engine, sock, i, pin, log_level)] = (i, time.monotonic())
+
+    stopping = False
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        index, spawned_at = children.pop(pid, (None, 0.0))
+        if index is None:
+            continue
+        code = os.waitstatus_to_exitcode(status)
+        if stopping:
+            logger.info("Worker %d (pid %d) stopped", index, pid)
+        elif time.monotonic() - spawned_at < MIN_WORKER_UPTIME_S:
+            logger.error("Worker %d (pid %d) exited on startup (%d)", index, pid, code)
+        else:
+            logger.warning("Worker %d (pid %d) exited (%d), restarting", index, pid, code)
+            children[spawn(engine, sock, index, pin, log_level)] = (
+                index,
+                time.monotonic(),
+            )
+    sock.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run the search API with workers forked from a preloaded master."
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.workers,
+        help="Number of worker processes (default: WORKERS).",
+    )
+    parser.add_argument(
+        "--pin-workers",
+        action=argparse.BooleanOptionalAction,
+        default=settings.pin_workers,
+        help="Pin each worker to one CPU, round-robin (default: PIN_WORKERS).",
+    )
+    parser.add_argument("--log-level", default="info")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.workers <= 1:
+        uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level)
+        return
+    serve(args.host, args.port, args.workers, args.pin_workers, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,451 @@
+"""Shard router: one API in front of nodes that each serve some categories.
+
+    python -m app.shard_router --shards http://10.0.0.2:8000,http://10.0.0.3:8000
+
+Each shard is a regular API node started with ``SHARD_CATEGORIES``. The router
+polls every shard's ``/readyz`` (every ``ROUTER_HEALTH_INTERVAL_MS``) to learn
+which endpoints it serves and whether it is ready, so nodes serving the same
+endpoints are replicas of each other. A search is forwarded to a ready replica
+of its endpoint, round-robin; a replica that cannot be reached, or answers
+503, is skipped for the next one. ``/batch`` is split into one sub-batch per
+replica set and ``/suggest`` is sent to every replica set, and the answers are
+merged. ``scripts/run_shards.py`` starts shards and a router as local
+processes.
+"""
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import sys
+import time
+from typing import Any
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Query, Request, Response
+from fastapi.responses import JSONResponse
+
+from app.api.suggest import MAX_LIMIT
+from app.config import settings
+from app.data.categories import ENDPOINTS
+
+logger = logging.getLogger("app.shard_router")
+
+# Shard response headers passed through to the client.
+FORWARDED_HEADERS = ("X-Search-Mode", "Retry-After", "ETag", "Cache-Control")
+
+
+class Shard:
+    """One shard node and what its last health check reported."""
+
+    def __init__(self, url: str) -> None:
+        self.url = url.rstrip("/")
+        self.endpoints: set[str] = set()
+        self.ready = False
+        self.reachable = False
+        self.checked_at = 0.0
+        self.forwarded = 0
+        self.failures = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "endpoints": sorted(self.endpoints, key=list(ENDPOINTS).index),
+            "ready": self.ready,
+            "reachable": self.reachable,
+            "forwarded": self.forwarded,
+            "failures": self.failures,
+        }
+
+
+class ShardRouter:
+    """Route requests to shards by endpoint, with health-aware failover."""
+
+    def __init__(self, urls: list[str], timeout_s: float, health_interval_s: float) -> None:
+        self.shards = [Shard(url) for url in urls]
+        self.timeout_s = timeout_s
+        self.health_interval_s = health_interval_s
+        self._client: httpx.AsyncClient | None = None
+        self._poller: asyncio.Task | None = None
+        self._turn = itertools.count()
+        self.failovers = 0
+        self.unavailable = 0
+
+    async def start(self) -> None:
+        self._client = httpx.AsyncClient(timeout=self.timeout_s)
+        await self.check_all()
+        self._poller = asyncio.get_running_loop().create_task(self._poll())
+
+    async def stop(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval_s)
+            await self.check_all()
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(self._check(shard) for shard in self.shards))
+
+    async def _check(self, shard: Shard) -> None:
+        try:
+            response = await self._client.get(
+                shard.url + "/readyz", timeout=min(self.timeout_s, 2.0)
+            )
+            body = response.json()
+        except (httpx.HTTPError, ValueError):
+            if shard.reachable:
+                logger.warning("Shard %s is unreachable", shard.url)
+            shard.reachable = shard.ready = False
+        else:
+            if not shard.ready and response.status_code == 200:
+                logger.info(
+                    "Shard %s ready: %s", shard.url, ", ".join(body.get("endpoints", []))
+                )
+            shard.reachable = True
+            shard.ready = response.status_code == 200
+            shard.endpoints = set(body.get("endpoints", []))
+        shard.checked_at = time.monotonic()
+
+    def replicas(self, endpoint: str) -> list[Shard]:
+        """Shards serving ``endpoint``: ready ones first, rotated per call."""
+        owners = [s for s in self.shards if endpoint in s.endpoints and s.reachable]
+        ready = [s for s in owners if s.ready]
+        rest = [s for s in owners if not s.ready]
+        if ready:
+            turn = next(self._turn) % len(ready)
+            ready = ready[turn:] + ready[:turn]
+        return ready + rest
+
+    def serves(self, endpoint: str) -> bool:
+        return any(endpoint in s.endpoints for s in self.shards)
+
+    async def forward(
+        self,
+        replicas: list[Shard],
+        method: str,
+        path: str,
+        **kwargs: Any,
+    ) -> httpx.Response | None:
+        """Send a request to the first replica that answers without a 503.
+
+        Returns the last 503 if every replica answered 503, or None if none
+        could be reached.
+        """
+        last = None
+        for i, shard in enumerate(replicas):
+            if i:
+                self.failovers += 1
+            try:
+                response = await self._client.request(method, shard.url + path, **kwargs)
+            except httpx.HTTPError as exc:
+                logger.warning("Shard %s failed: %s", shard.url, exc)
+                shard.failures += 1
+                # Skipped until the next health check reaches it again.
+                shard.reachable = shard.ready = False
+                continue
+            shard.forwarded += 1
+            if response.status_code != 503:
+                return response
+            last = response
+        return last
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "shards": {shard.url: shard.stats() for shard in self.shards},
+            "failovers": self.failovers,
+            "unavailable": self.unavailable,
+        }
+
+
+app = FastAPI(title="Product Search Router")
+
+
+def _passthrough(response: httpx.Response) -> Response:
+    headers = {
+        name: response.headers[name]
+        for name in FORWARDED_HEADERS
+        if name in response.headers
+    }
+    return Response(
+        content=response.content,
+        status_code=response.status_code,
+        media_type=response.headers.get("content-type", "application/json"),
+        headers=headers,
+    )
+
+
+def _detail(response: httpx.Response) -> Any:
+    try:
+        return response.json().get("detail")
+    except (ValueError, AttributeError):
+        return response.text
+
+
+def _unavailable(router: ShardRouter, endpoint: str) -> JSONResponse:
+    if not router.serves(endpoint):
+        return JSONResponse(
+            status_code=404, content={"detail": f"No shard serves {endpoint}."}
+        )
+    router.unavailable += 1
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"No shard for {endpoint} is available."},
+        headers={"Retry-After": "1"},
+    )
+
+
+def _replica_sets(router: ShardRouter, endpoints: list[str]) -> dict[tuple, list]:
+    """Group endpoints by the replicas serving them (one fan-out per group)."""
+    groups: dict[tuple, list] = {}
+    for endpoint in endpoints:
+        replicas = router.replicas(endpoint)
+        if replicas:
+            key = tuple(sorted(s.url for s in replicas))
+            groups.setdefault(key, [replicas, []])[1].append(endpoint)
+    return groups
+
+
+@app.on_event("startup")
+async def startup() -> None:
+    urls = [url.strip() for url in settings.router_shards.split(",") if url.strip()]
+    if not urls:
+        raise RuntimeError("ROUTER_SHARDS (or --shards) lists no shard URLs.")
+    router = ShardRouter(
+        urls,
+        settings.router_timeout_ms / 1000.0,
+        settings.router_health_interval_ms / 1000.0,
+    )
+    await router.start()
+    app.state.router = router
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await app.state.router.stop()
+
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz() -> dict[str, str]:
+    return {"status": "ok"}
+
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz(request: Request) -> JSONResponse:
+    """Ready when every endpoint has at least one ready shard."""
+    router: ShardRouter = request.app.state.router
+    pending = [
+        name
+        for name in ENDPOINTS
+        if not any(s.ready for s in router.replicas(name))
+    ]
+    return JSONResponse(
+        status_code=503 if pending else 200,
+        content={
+            "ready": not pending,
+            "endpoints": [name for name in ENDPOINTS if name not in pending],
+            "endpoints_pending": pending,
+        },
+    )
+
+
+@app.get("/stats", include_in_schema=False)
+async def stats(request: Request) -> dict[str, Any]:
+    return request.app.state.router.stats()
+
+
+@app.get("/suggest")
+async def suggest_all(
+    request: Request,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=MAX_LIMIT),
+) -> Response:
+    """Fan out to one replica per replica set and merge the completions.
+
+    Each shard returns its completions by descending score; the lists are
+    merged by that score (ties in shard order), keeping the first
+    occurrence of a name, as a single process ranks them.
+    """
+    router: ShardRouter = request.app.state.router
+    groups = _replica_sets(router, list(ENDPOINTS))
+    responses = await asyncio.gather(
+        *(
+            router.forward(replicas, "GET", "/suggest", params={"q": q, "limit": limit})
+            for replicas, _ in groups.values()
+        )
+    )
+    ranked = []
+    for (_, endpoints), response in zip(groups.values(), responses):
+        if response is not None and response.status_code == 200:
+            ranked.append([r for r in response.json() if r["endpoint"] in endpoints])
+
+    merged, seen = [], set()
+    for row in heapq.merge(*ranked, key=lambda r: -r["score"]):
+        if row["suggestion"] not in seen:
+            seen.add(row["suggestion"])
+            merged.append(row)
+            if len(merged) == limit:
+                break
+    return Response(
+        content=json.dumps(merged, separators=(",", ":")).encode("utf-8"),
+        media_type="application/json",
+    )
+
+
+@app.get("/suggest/{endpoint}")
+async def suggest_category(endpoint: str, request: Request) -> Response:
+    router: ShardRouter = request.app.state.router
+    response = await router.forward(
+        router.replicas(endpoint),
+        "GET",
+        f"/suggest/{endpoint}",
+        params=request.query_params,
+    )
+    if response is None:
+        return _unavailable(router, endpoint)
+    return _passthrough(response)
+
+
+@app.post("/batch")
+async def search_batch(request: Request) -> Response:
+    """Split a batch by replica set, run the parts concurrently, reassemble.
+
+    Items without an endpoint name get a 422 status and items for endpoints
+    without an available shard their own 404/503; the other fields are
+    validated by the shards.
+    """
+    router: ShardRouter = request.app.state.router
+    try:
+        items = json.loads(await request.body())["requests"]
+    except (ValueError, KeyError, TypeError):
+        items = None
+    if not isinstance(items, list) or not 1 <= len(items) <= settings.batch_max_requests:
+        return JSONResponse(
+            status_code=422,
+            content={
+                "detail": "Expected {\"requests\": [...]} with 1 to "
+                f"{settings.batch_max_requests} items."
+            },
+        )
+
+    results: list[Any] = [None] * len(items)
+    endpoints: list[str | None] = []
+    for i, item in enumerate(items):
+        endpoint = item.get("endpoint") if isinstance(item, dict) else None
+        if not isinstance(endpoint, str):
+            endpoint = None
+            results[i] = {"status": 422, "detail": "Each request needs an endpoint name."}
+        endpoints.append(endpoint)
+
+    parts = []
+    names = list(dict.fromkeys(e for e in endpoints if e is not None))
+    for replicas, group in _replica_sets(router, names).values():
+        positions = [i for i, e in enumerate(endpoints) if e in group]
+        parts.append((replicas, positions))
+
+    responses = await asyncio.gather(
+        *(
+            router.forward(
+                replicas, "POST", "/batch", json={"requests": [items[i] for i in positions]}
+            )
+            for replicas, positions in parts
+        )
+    )
+    for (_, positions), response in zip(parts, responses):
+        if response is None or response.status_code != 200:
+            if response is None:
+                status, detail = 503, "No shard is available."
+            else:
+                status, detail = response.status_code, _detail(response)
+            for i in positions:
+                results[i] = {"status": status, "detail": detail}
+            continue
+        for i, result in zip(positions, response.json()):
+            results[i] = result
+
+    for i, endpoint in enumerate(endpoints):
+        if results[i] is None:
+            unavailable = _unavailable(router, endpoint)
+            results[i] = {
+                "status": unavailable.status_code,
+                "detail": json.loads(unavailable.body)["detail"],
+            }
+    return Response(
+        content=json.dumps(results, separators=(",", ":")).encode("utf-8"),
+        media_type="application/json",
+    )
+
+
+def _conditional_headers(request: Request) -> dict[str, str]:
+    # Replicas of a category load the same rows, so their ETags agree.
+    value = request.headers.get("if-none-match")
+    return {"if-none-match": value} if value else {}
+
+
+@app.post("/{endpoint}")
+async def search(endpoint: str, request: Request) -> Response:
+    """Forward a search to a replica serving ``endpoint``."""
+    router: ShardRouter = request.app.state.router
+    response = await router.forward(
+        router.replicas(endpoint),
+        "POST",
+        f"/{endpoint}",
+        content=await request.body(),
+        headers={"content-type": "application/json", **_conditional_headers(request)},
+    )
+    if response is None:
+        return _unavailable(router, endpoint)
+    return _passthrough(response)
+
+
+@app.get("/{endpoint}")
+async def search_get(endpoint: str, request: Request) -> Response:
+    """Forward the GET form of a search (shards need ``SEARCH_GET_ROUTES``)."""
+    router: ShardRouter = request.app.state.router
+    response = await router.forward(
+        router.replicas(endpoint),
+        "GET",
+        f"/{endpoint}",
+        params=request.query_params,
+        headers=_conditional_headers(request),
+    )
+    if response is None:
+        return _unavailable(router, endpoint)
+    return _passthrough(response)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Route search requests to category shards."
+    )
+    parser.add_argument(
+        "--shards",
+        default=settings.router_shards,
+        help="Comma-separated shard base URLs (default: ROUTER_SHARDS).",
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--log-level", default="info")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    settings.router_shards = args.shards
+    logging.basicConfig(
+        level=logging.INFO,
+        stream=sys.stdout,
+        format="%(levelname)s: %(name)s: %(message)s",
+    )
+    # One line per health check otherwise.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level)
+
+
+if __name__ == "__main__":
+    main()
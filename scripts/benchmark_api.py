@@ -4,7 +4,9 @@ Simple API benchmark runner for ~10k queries.
 
 Supports:
 - .txt file: one query string per line -> {"query": "..."}
-- .jsonl file: one JSON body per line
+- .jsonl file: one JSON body per line; an "endpoint" key sends that line to
+  that endpoint instead of --endpoint, and a "capture" key (query capture
+  metadata, see CAPTURE_PATH) is dropped, so a capture file replays as-is
 """
 
 import argparse
@@ -16,6 +18,9 @@ import urllib.error
 import urllib.request
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+# Keys of a .jsonl line that are not part of the request body.
+ROUTING_KEYS = ("endpoint", "capture")
+
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Benchmark API endpoint.")
@@ -62,6 +67,18 @@ def load_payloads(path: str) -> list[dict]:
     return payloads
 
 
+def target_requests(
+    base: str, default_endpoint: str, payloads: list[dict]
+) -> list[tuple[str, dict]]:
+    """Pair each payload with its URL, honouring a per-line "endpoint" key."""
+    requests: list[tuple[str, dict]] = []
+    for payload in payloads:
+        endpoint = str(payload.get("endpoint") or default_endpoint).strip("/")
+        body = {k: v for k, v in payload.items() if k not in ROUTING_KEYS}
+        requests.append((f"{base}/{endpoint}", body))
+    return requests
+
+
 def one_call(
     url: str, payload: dict, timeout: float
 ) -> tuple[bool, float, int, str, str]:
@@ -111,8 +128,7 @@ def percentile(values: list[float], p: float) -> float:
 
 def run_phase(
     name: str,
-    target_url: str,
-    payloads: list[dict],
+    requests: list[tuple[str, dict]],
     total_requests: int,
     concurrency: int,
     timeout: float,
@@ -122,12 +138,11 @@ def run_phase(
     fail_count = 0
     fail_samples: list[str] = []
 
-    stream = itertools.islice(itertools.cycle(payloads), total_requests)
+    stream = itertools.islice(itertools.cycle(requests), total_requests)
     start = time.perf_counter()
     with ThreadPoolExecutor(max_workers=concurrency) as executor:
         futures = [
-            executor.submit(one_call, target_url, payload, timeout)
-            for payload in stream
+            executor.submit(one_call, url, payload, timeout) for url, payload in stream
         ]
         for fut in as_completed(futures):
             ok, latency, status, err, payload_text = fut.result()
@@ -171,23 +186,25 @@ def main():
     payloads = load_payloads(args.queries_file)
     base = args.url.rstrip("/")
     endpoint = args.endpoint if args.endpoint.startswith("/") else f"/{args.endpoint}"
-    target_url = f"{base}{endpoint}"
+    requests = target_requests(base, endpoint, payloads)
+    endpoints = sorted({url for url, _ in requests})
 
-    print(f"Target: {target_url}")
+    print(f"Target: {endpoints[0] if len(endpoints) == 1 else base}")
+    if len(endpoints) > 1:
+        print(f"Endpoints: {len(endpoints)} (from the queries file)")
     print(f"Payload templates loaded: {len(payloads)}")
 
     if args.warmup > 0:
         run_phase(
             "Warmup",
-            target_url,
-            payloads,
+            requests,
             args.warmup,
             min(args.concurrency, 10),
             args.timeout,
         )
 
     run_phase(
-        "Benchmark", target_url, payloads, args.requests, args.concurrency, args.timeout
+        "Benchmark", requests, args.requests, args.concurrency, args.timeout
     )
 
 
@@ -0,0 +1,46 @@
+-- Indexes for the pgvector tier (PGVECTOR_CATEGORIES / PGVECTOR_MIN_PRODUCTS).
+--
+--   psql "$DATABASE_URL" -f scripts/create_vector_index.sql
+--
+-- Works against the pgvector/pgvector image from docker-compose.yml. The HNSW
+-- index needs a dimensioned column: the ALTER checks every row under an
+-- exclusive lock, so drop it if the column is already vector(1024). The
+-- indexes are built CONCURRENTLY (psql runs each statement outside a
+-- transaction block).
+
+CREATE EXTENSION IF NOT EXISTS vector;
+
+ALTER TABLE product_ai_data
+    ALTER COLUMN jina_v2_clip_name_embedding TYPE vector(1024);
+
+SET maintenance_work_mem = '1GB';
+
+-- Inner product: embeddings are normalized, so this is cosine order, and it
+-- matches the `<#>` operator used by app/data/vector_store.py.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS product_ai_data_name_embedding_hnsw
+    ON product_ai_data
+    USING hnsw (jina_v2_clip_name_embedding vector_ip_ops)
+    WITH (m = 16, ef_construction = 64);
+
+-- Category predicate and the filter subqueries join on these.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS product_category_id_idx
+    ON product (category_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS faucet_product_id_idx
+    ON faucet (product_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS tile_product_id_idx
+    ON tile (product_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS shower_system_product_id_idx
+    ON shower_system (product_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS vanity_product_id_idx
+    ON vanity (product_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS mirror_product_id_idx
+    ON mirror (product_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS lighting_product_id_idx
+    ON lighting (product_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS shower_glass_product_id_idx
+    ON shower_glass (product_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS tub_door_product_id_idx
+    ON tub_door (product_id);
+
+ANALYZE product_ai_data;
+ANALYZE product;
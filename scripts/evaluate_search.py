@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Offline recall/latency evaluation of approximate search modes.
+
+Replays the benchmark queries against the exact ranking
+(SearchEngine.search) and compares each candidate mode with it:
+- recall@10 and recall@50 against the reference result list
+- top-1 agreement
+- nDCG@10, with graded relevance from the reference rank
+- per-query ranking latency (mean / p50 / p95)
+
+Modes:
+- exact:       SearchEngine.rank_products (sanity check, should score 1.0)
+- lexical:     BM25-only ranking used when the encoder is saturated
+- names:       name embeddings only (with DESCRIPTION_EMBEDDINGS on, shows
+               how far the description fusion moves the ranking)
+- float16:     product and query embeddings stored as float16
+- truncate-N:  first N embedding dimensions, re-normalized (--truncate)
+
+The index and the query embeddings are cached under --cache-dir, so after the
+first run no DB or model is needed (--refresh-index / --refresh-embeddings to
+rebuild them).
+
+Examples:
+  python3 scripts/evaluate_search.py
+  python3 scripts/evaluate_search.py --modes exact,float16,truncate --truncate 256,512
+  python3 scripts/evaluate_search.py --jsonl requests.jsonl --json-out eval.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import pickle
+import statistics
+import sys
+import time
+from pathlib import Path
+import numpy as np
+
+# Allow running as: python3 scripts/evaluate_search.py
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from load_generator import (  # noqa: E402
+    NON_FILTER_KEYS,
+    load_csv_queries,
+    load_jsonl,
+    load_txt_queries,
+)
+
+from app.data.categories import ENDPOINTS  # noqa: E402
+from app.search.encoder import MODEL_NAME, create_encoder  # noqa: E402
+from app.search.engine import SearchEngine  # noqa: E402
+from app.search.scorer import name_embeddings  # noqa: E402
+
+
+# ---------------------------------------------------------------------------
+# Cached inputs
+# ---------------------------------------------------------------------------
+
+
+async def _load_index_from_db() -> dict:
+    from app.config import settings
+    from app.data import db
+    from app.data.loader import load_all
+
+    await db.connect(settings.database_url)
+    try:
+        return await load_all(db.get_pool())
+    finally:
+        await db.close()
+
+
+def load_index(cache_dir: Path, refresh: bool) -> dict:
+    from app.config import settings
+
+    # The index layout depends on DESCRIPTION_EMBEDDINGS; cache each separately.
+    name = "index.pkl"
+    if settings.description_embeddings:
+        name = f"index-description{settings.description_dims}.pkl"
+    path = cache_dir / name
+    if path.exists() and not refresh:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    index = asyncio.run(_load_index_from_db())
+    with open(path, "wb") as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return index
+
+
+def load_embeddings(
+    cache_dir: Path, queries: list[str], refresh: bool
+) -> dict[str, np.ndarray]:
+    """Return an embedding per query, encoding only those not cached yet."""
+    path = cache_dir / f"queries-{MODEL_NAME.replace('/', '_')}.npz"
+    cached: dict[str, np.ndarray] = {}
+    if path.exists() and not refresh:
+        data = np.load(path, allow_pickle=False)
+        cached = dict(zip(data["queries"].tolist(), data["embeddings"]))
+
+    missing = sorted({q for q in queries if q not in cached})
+    if missing:
+        encoder = create_encoder()
+        encoder.load()
+        for i, query in enumerate(missing, 1):
+            cached[query] = encoder.encode(query)
+            if i % 500 == 0:
+                print(f"Encoded {i}/{len(missing)} queries", file=sys.stderr)
+        encoder.close()
+        keys = sorted(cached)
+        np.savez(
+            path,
+            queries=np.array(keys),
+            embeddings=np.stack([cached[k] for k in keys]),
+        )
+    return cached
+
+
+# ---------------------------------------------------------------------------
+# Candidate modes
+# ---------------------------------------------------------------------------
+
+
+def _with_embeddings(cat_data: dict, embeddings: np.ndarray) -> dict:
+    # Sub-indexes hold float32 copies of the original rows; drop them so the
+    # variant embeddings are used for every query. Variants are name-only.
+    variant = {
+        k: v
+        for k, v in cat_data.items()
+        if k not in ("subindexes", "description_dims")
+    }
+    variant["embeddings"] = embeddings
+    return variant
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.where(norms == 0, 1, norms)
+
+
+def build_modes(index: dict, names: list[str], truncate: list[int]) -> dict[str, tuple]:
+    """Return mode name -> (variant index, query transform, rank function)."""
+    modes: dict[str, tuple] = {}
+    for name in names:
+        if name == "exact":
+            modes[name] = (index, lambda q: q, SearchEngine.rank_products)
+        elif name == "lexical":
+            modes[name] = (
+                index,
+                lambda q: q,
+                lambda cat, query, _, filters: SearchEngine.rank_products_lexical(
+                    cat, query, filters
+                ),
+            )
+        elif name == "names":
+            variant = {
+                c: _with_embeddings(d, np.ascontiguousarray(name_embeddings(d)))
+                for c, d in index.items()
+            }
+            modes[name] = (variant, lambda q: q, SearchEngine.rank_products)
+        elif name == "float16":
+            variant = {
+                c: _with_embeddings(d, name_embeddings(d).astype(np.float16))
+                for c, d in index.items()
+            }
+            modes[name] = (
+                variant,
+                lambda q: q.astype(np.float16),
+                SearchEngine.rank_products,
+            )
+        elif name == "truncate":
+            for dims in truncate:
+                variant = {
+                    c: _with_embeddings(
+                        d,
+                        np.ascontiguousarray(
+                            _normalize(name_embeddings(d)[:, :dims]), dtype=np.float32
+                        ),
+                    )
+                    for c, d in index.items()
+                }
+                modes[f"truncate-{dims}"] = (
+                    variant,
+                    lambda q, dims=dims: _normalize(q[:dims]).astype(np.float32),
+                    SearchEngine.rank_products,
+                )
+        else:
+            raise SystemExit(f"Unknown mode: {name}")
+    return modes
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+
+def recall_at(reference: list[str], candidate: list[str], k: int) -> float:
+    expected = set(reference[:k])
+    if not expected:
+        return 1.0 if not candidate else 0.0
+    return len(expected & set(candidate[:k])) / len(expected)
+
+
+def ndcg_at(reference: list[str], candidate: list[str], k: int) -> float:
+    """nDCG@k where the reference's rank-r item has relevance k - r."""
+    relevance = {pid: k - r for r, pid in enumerate(reference[:k])}
+    if not relevance:
+        return 1.0 if not candidate else 0.0
+
+    def dcg(items: list[str]) -> float:
+        return sum(
+            relevance.get(pid, 0) / math.log2(i + 2) for i, pid in enumerate(items[:k])
+        )
+
+    return dcg(candidate) / dcg(reference)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+class CachedEncoder:
+    """Encoder that answers from the precomputed embeddings only."""
+
+    def __init__(self, embeddings: dict[str, np.ndarray]) -> None:
+        self._embeddings = embeddings
+        self.loaded = True
+
+    def load(self, warmup: bool = True) -> None:
+        pass
+
+    def warmup(self) -> None:
+        pass
+
+    def encode(self, query: str) -> np.ndarray:
+        return self._embeddings[query]
+
+    def close(self) -> None:
+        pass
+
+
+async def reference_rankings(
+    index: dict, items: list[tuple[str, str, dict | None]], embeddings: dict
+) -> tuple[list[list[str]], list[np.ndarray], list[float]]:
+    """Rank every item with SearchEngine.search (the exact path).
+
+    Also returns the query embedding the engine used for each item (a query
+    that is a product name uses the product's stored embedding), so the
+    candidate modes start from the same vector.
+    """
+    engine = SearchEngine(index, encoder=CachedEncoder(embeddings))
+    results, query_embs, latencies = [], [], []
+    try:
+        for category_id, query, filters in items:
+            started = time.perf_counter()
+            result = await engine.search(category_id, query, filters)
+            latencies.append((time.perf_counter() - started) * 1000)
+            results.append(result.product_ids(0, 50))
+            # Served from the engine's embedding cache, filled by the search.
+            query_embs.append(await engine.get_query_embedding(query, None, category_id))
+    finally:
+        engine.close()
+    return results, query_embs, latencies
+
+
+def evaluate(args) -> dict:
+    cache_dir = Path(args.cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    payloads = []
+    if not args.no_csv:
+        payloads += load_csv_queries(ROOT_DIR / "data" / "queries.csv")
+    if not args.no_txt:
+        payloads += load_txt_queries(ROOT_DIR / "queries")
+    for path in args.jsonl:
+        payloads += load_jsonl(Path(path))[0]
+
+    index = load_index(cache_dir, args.refresh_index)
+    items = []
+    for endpoint, body in payloads:
+        meta = ENDPOINTS.get(endpoint)
+        if meta is None or meta["category_id"] not in index:
+            continue
+        filters = {k: v for k, v in body.items() if k not in NON_FILTER_KEYS}
+        items.append((meta["category_id"], body["query"], filters or None, endpoint))
+    if args.limit:
+        items = items[: args.limit]
+    if not items:
+        raise SystemExit("No queries matched the loaded categories.")
+
+    embeddings = load_embeddings(
+        cache_dir, [query for _, query, _, _ in items], args.refresh_embeddings
+    )
+    reference, query_embs, reference_ms = asyncio.run(
+        reference_rankings(index, [item[:3] for item in items], embeddings)
+    )
+
+    report = {
+        "queries": len(items),
+        "reference": {
+            "latency_ms": {
+                "mean": statistics.fmean(reference_ms),
+                "p50": percentile(reference_ms, 50),
+                "p95": percentile(reference_ms, 95),
+            }
+        },
+        "modes": {},
+    }
+    modes = build_modes(index, args.modes, args.truncate)
+    for name, (variant, transform, rank) in modes.items():
+        recall10, recall50, top1, ndcg, latency = [], [], [], [], []
+        for (category_id, query, filters, _), ref, emb in zip(
+            items, reference, query_embs
+        ):
+            cat_data = variant[category_id]
+            query_emb = transform(emb)
+            started = time.perf_counter()
+            rows = rank(cat_data, query, query_emb, filters)
+            latency.append((time.perf_counter() - started) * 1000)
+            candidate = cat_data["product_ids"].take(rows[:50])
+
+            recall10.append(recall_at(ref, candidate, 10))
+            recall50.append(recall_at(ref, candidate, 50))
+            top1.append(1.0 if ref[:1] == candidate[:1] else 0.0)
+            ndcg.append(ndcg_at(ref, candidate, 10))
+
+        report["modes"][name] = {
+            "recall@10": statistics.fmean(recall10),
+            "recall@50": statistics.fmean(recall50),
+            "top1_agreement": statistics.fmean(top1),
+            "ndcg@10": statistics.fmean(ndcg),
+            "latency_ms": {
+                "mean": statistics.fmean(latency),
+                "p50": percentile(latency, 50),
+                "p95": percentile(latency, 95),
+            },
+        }
+    return report
+
+
+def print_report(report: dict) -> None:
+    ref = report["reference"]["latency_ms"]
+    print(f"Queries: {report['queries']}")
+    print(
+        f"Reference (SearchEngine.search): mean {ref['mean']:.2f} ms, "
+        f"p50 {ref['p50']:.2f} ms, p95 {ref['p95']:.2f} ms"
+    )
+    print(
+        f"\n{'mode':<16} {'R@10':>6} {'R@50':>6} {'top1':>6} {'nDCG':>6} "
+        f"{'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8}"
+    )
+    for name, m in report["modes"].items():
+        lat = m["latency_ms"]
+        print(
+            f"{name:<16} {m['recall@10']:>6.3f} {m['recall@50']:>6.3f} "
+            f"{m['top1_agreement']:>6.3f} {m['ndcg@10']:>6.3f} "
+            f"{lat['mean']:>8.2f} {lat['p50']:>8.2f} {lat['p95']:>8.2f}"
+        )
+
+
+def parse_csv_list(value: str) -> list[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare approximate search modes with the exact ranking."
+    )
+    parser.add_argument(
+        "--modes",
+        type=parse_csv_list,
+        default=["exact", "lexical", "float16", "truncate"],
+        help="Comma-separated modes: exact, lexical, names, float16, truncate",
+    )
+    parser.add_argument(
+        "--truncate",
+        type=lambda v: [int(x) for x in parse_csv_list(v)],
+        default=[256, 512],
+        help="Dimensions for the truncate mode, e.g. 256,512",
+    )
+    parser.add_argument("--jsonl", action="append", default=[], help="Extra .jsonl workload")
+    parser.add_argument("--no-csv", action="store_true", help="Skip data/queries.csv")
+    parser.add_argument("--no-txt", action="store_true", help="Skip queries/*.txt")
+    parser.add_argument("--limit", type=int, default=0, help="Evaluate the first N queries")
+    parser.add_argument(
+        "--cache-dir",
+        default=str(ROOT_DIR / ".cache" / "evaluate_search"),
+        help="Where the index and query embeddings are cached",
+    )
+    parser.add_argument("--refresh-index", action="store_true")
+    parser.add_argument("--refresh-embeddings", action="store_true")
+    parser.add_argument("--json-out", default=None, help="Write the report as JSON")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = evaluate(args)
+    print_report(report)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
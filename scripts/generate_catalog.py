@@ -0,0 +1,576 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic catalog in a local Postgres for load and scale tests.
+
+Creates the tables the loader reads (product, product_ai_data with pgvector
+columns, faucet, tile, shower_system, renderable_product and the vanity /
+mirror / lighting / shower_glass / tub_door render links) and fills them with
+--products products per ENDPOINTS category (flooring is synthetic and built
+by the loader from LVPs and tiles).
+
+- Names are drawn from per-category vocabularies (brand, collection, size,
+  finish, product type, ...), e.g. "Moen Arbor 8-in Widespread Matte Black
+  Bathroom Sink Faucet".
+- Embeddings are random but not unrelated to the names: each vocabulary
+  word has a fixed random vector, and a product's name embedding is the
+  normalized sum of its words' vectors plus noise, so products sharing words
+  are close, as with a real model; a --noise that would drown the words is
+  refused up front. Description embeddings are a noisy copy of the name
+  embedding (missing for --missing-descriptions of products).
+- Filter flags and dimensions follow plausible per-category distributions,
+  including unknown (NULL) values.
+
+Rows are written with COPY in chunks of --chunk-size, so memory stays flat at
+any scale. Category IDs come from the *_CATEGORY_ID settings, so the API
+started against the same settings serves the generated catalog.
+
+Examples:
+  python3 scripts/generate_catalog.py --database-url postgresql://postgres@localhost/synthetic --drop
+  python3 scripts/generate_catalog.py --products 100000 --categories faucets,tiles,vanities
+  psql "$DATABASE_URL" -f scripts/create_vector_index.sql   # for the pgvector tier
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import struct
+import sys
+import time
+import uuid
+import zlib
+from pathlib import Path
+
+import asyncpg
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from app.config import settings  # noqa: E402
+from app.data.categories import ENDPOINTS  # noqa: E402
+from app.data.schema import DIMENSION_TABLES  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+SCHEMA_SQL = """
+CREATE EXTENSION IF NOT EXISTS vector;
+CREATE TABLE IF NOT EXISTS product (
+    id uuid PRIMARY KEY,
+    name text NOT NULL,
+    description text,
+    category_id text NOT NULL
+);
+CREATE TABLE IF NOT EXISTS product_ai_data (
+    product_id uuid PRIMARY KEY REFERENCES product (id),
+    jina_v2_clip_name_embedding vector({dims}),
+    jina_v2_clip_description_embedding vector({dims})
+);
+CREATE TABLE IF NOT EXISTS faucet (
+    product_id uuid REFERENCES product (id),
+    single_hole_spacing_compatible boolean,
+    four_inch_hole_spacing_compatible boolean,
+    eight_inch_hole_spacing_compatible boolean
+);
+CREATE TABLE IF NOT EXISTS tile (
+    product_id uuid REFERENCES product (id),
+    available_for_wall boolean,
+    available_for_floor boolean,
+    available_for_shower_wall boolean,
+    available_for_shower_floor boolean
+);
+CREATE TABLE IF NOT EXISTS shower_system (
+    product_id uuid REFERENCES product (id),
+    has_tub_spout boolean
+);
+CREATE TABLE IF NOT EXISTS renderable_product (
+    id uuid PRIMARY KEY,
+    length double precision,
+    width double precision
+);
+"""
+
+# One render link table per dimension-aware category.
+RENDER_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    product_id uuid REFERENCES product (id),
+    render_id uuid REFERENCES renderable_product (id)
+);
+"""
+
+DROP_SQL = "DROP TABLE IF EXISTS {tables} CASCADE;"
+
+BRANDS = [
+    "Moen", "Delta", "Kohler", "American Standard", "Pfister", "Glacier Bay",
+    "allen + roth", "Style Selections", "Project Source", "Origin 21",
+    "Hansgrohe", "Grohe", "Sterling", "Jacuzzi", "DreamLine", "Kichler",
+    "Quoizel", "Mohawk", "Daltile", "Satori", "Valspar", "NuWallpaper",
+]
+COLLECTIONS = [
+    "Arbor", "Brecklyn", "Connery", "Eastport", "Align", "Trinsic", "Lindley",
+    "Kinsley", "Chateau", "Harbor", "Willow", "Aspen", "Ridgewood", "Maddox",
+    "Larkin", "Presley", "Bellamy", "Rowan", "Sutton", "Hollis", "Canterbury",
+]
+FINISHES = [
+    "Matte Black", "Brushed Nickel", "Chrome", "Spot Defense Stainless",
+    "Brushed Gold", "Oil-Rubbed Bronze", "Polished Nickel", "White", "Gray",
+    "Warm Oak", "Espresso", "Natural Walnut", "Navy Blue", "Sage Green",
+]
+
+# Per category: sizes, materials/features and product type nouns. Each name
+# is brand, collection, size, finish, material and noun.
+VOCABULARY = {
+    "faucets": (
+        ["Single Hole", "4-in Centerset", "8-in Widespread", "1-handle", "2-handle"],
+        ["WaterSense", "with Drain", "with Deck Plate", "Touchless", "High-arc"],
+        ["Bathroom Sink Faucet", "Kitchen Faucet", "Pull-down Kitchen Faucet",
+         "Bar Faucet", "Vessel Sink Faucet"],
+    ),
+    "tiles": (
+        ["3-in x 12-in", "12-in x 24-in", "24-in x 48-in", "2-in x 2-in", "8-in x 8-in"],
+        ["Porcelain", "Ceramic", "Marble", "Glass", "Natural Stone"],
+        ["Subway Tile", "Floor Tile", "Wall Tile", "Mosaic Tile", "Hexagon Tile"],
+    ),
+    "shower-systems": (
+        ["2-function", "3-function", "Single-handle", "Rain", "Dual"],
+        ["with Tub Spout", "Thermostatic", "Pressure Balance", "with Handheld", "Valve Included"],
+        ["Shower System", "Shower Faucet", "Tub and Shower Faucet", "Rain Shower Kit"],
+    ),
+    "vanities": (
+        ["24-in", "30-in", "36-in", "48-in", "60-in", "72-in"],
+        ["Single Sink", "Double Sink", "Undermount Sink", "Freestanding", "Floating"],
+        ["Bathroom Vanity with Top", "Bathroom Vanity Cabinet", "Vanity with Cultured Marble Top"],
+    ),
+    "lightings": (
+        ["1-light", "2-light", "3-light", "4-light", "5-light"],
+        ["Glass Shade", "LED", "Dimmable", "Globe", "Drum"],
+        ["Vanity Light Bar", "Pendant Light", "Chandelier", "Flush Mount Light", "Wall Sconce"],
+    ),
+    "shower-glasses": (
+        ["30-in x 72-in", "48-in x 74-in", "60-in x 76-in", "34-in x 72-in"],
+        ["Frameless", "Semi-frameless", "Clear Glass", "Frosted Glass", "Sliding"],
+        ["Shower Door", "Shower Screen", "Pivot Shower Door", "Bypass Shower Door"],
+    ),
+    "tub-doors": (
+        ["56-in x 58-in", "60-in x 59-in", "60-in x 62-in"],
+        ["Frameless", "Semi-frameless", "Clear Glass", "Frosted Glass", "Sliding"],
+        ["Bathtub Door", "Tub Screen", "Sliding Tub Door"],
+    ),
+    "mirrors": (
+        ["20-in x 28-in", "24-in x 36-in", "30-in x 40-in", "36-in x 36-in", "48-in x 30-in"],
+        ["Framed", "Frameless", "LED Lighted", "Beveled", "Anti-fog"],
+        ["Bathroom Vanity Mirror", "Oval Mirror", "Rectangular Mirror", "Arched Mirror"],
+    ),
+    "tubs": (
+        ["60-in x 30-in", "60-in x 32-in", "67-in x 30-in", "72-in x 36-in"],
+        ["Acrylic", "Cast Iron", "Solid Surface", "Left Drain", "Center Drain"],
+        ["Freestanding Bathtub", "Alcove Bathtub", "Drop-in Bathtub", "Soaking Tub"],
+    ),
+    "toilets": (
+        ["Elongated", "Round", "Chair Height", "Standard Height", "12-in Rough-In"],
+        ["WaterSense", "Dual Flush", "Soft Close Seat", "Skirted", "1.28-GPF"],
+        ["2-piece Toilet", "1-piece Toilet", "Wall-hung Toilet", "Smart Toilet"],
+    ),
+    "paints": (
+        ["1-gallon", "5-gallon", "Quart", "8-oz Sample"],
+        ["Flat", "Eggshell", "Satin", "Semi-gloss", "Paint and Primer"],
+        ["Interior Paint", "Exterior Paint", "Cabinet Paint", "Ceiling Paint"],
+    ),
+    "lvps": (
+        ["7-in x 48-in", "9-in x 60-in", "6-in x 36-in", "12-mil", "20-mil"],
+        ["Waterproof", "Click Lock", "Glue Down", "Wood Look", "Stone Look"],
+        ["Luxury Vinyl Plank Flooring", "Vinyl Plank", "Rigid Core Vinyl Flooring"],
+    ),
+    "tub-fillers": (
+        ["Floor-mount", "Deck-mount", "Wall-mount", "1-handle", "2-handle"],
+        ["with Handshower", "High-flow", "Freestanding", "Roman", "Waterfall"],
+        ["Tub Filler", "Bathtub Faucet", "Roman Tub Faucet"],
+    ),
+    "towel-bars": (
+        ["18-in", "24-in", "30-in", "Double"],
+        ["Wall Mount", "Stainless Steel", "Zinc", "Brass", "Concealed Screw"],
+        ["Towel Bar", "Double Towel Bar", "Towel Rack"],
+    ),
+    "wallpapers": (
+        ["30.75-sq ft", "56-sq ft", "20.5-in x 33-ft", "Mural"],
+        ["Peel and Stick", "Unpasted", "Prepasted", "Vinyl", "Textured"],
+        ["Wallpaper", "Botanical Wallpaper", "Geometric Wallpaper", "Striped Wallpaper"],
+    ),
+    "toilet-paper-holders": (
+        ["Wall Mount", "Freestanding", "Pivoting", "Double Post"],
+        ["Stainless Steel", "Zinc", "Brass", "with Shelf", "Spring-loaded"],
+        ["Toilet Paper Holder", "Toilet Tissue Holder"],
+    ),
+    "robe-hooks": (
+        ["Single", "Double", "Triple", "Wall Mount"],
+        ["Stainless Steel", "Zinc", "Brass", "Over-the-door", "Concealed Screw"],
+        ["Robe Hook", "Towel Hook", "Bathroom Hook"],
+    ),
+    "towel-rings": (
+        ["6-in", "7-in", "8-in", "Wall Mount"],
+        ["Stainless Steel", "Zinc", "Brass", "Open Ring", "Closed Ring"],
+        ["Towel Ring", "Hand Towel Ring"],
+    ),
+    "shelves": (
+        ["12-in", "18-in", "24-in", "2-tier", "3-tier"],
+        ["Floating", "Glass", "Wood", "Metal", "Corner"],
+        ["Bathroom Shelf", "Wall Shelf", "Over-the-toilet Storage Shelf"],
+    ),
+}
+
+# Name slots; every word of every slot gets its own embedding direction.
+SLOTS = ("brand", "collection", "size", "finish", "material", "noun")
+
+# Render link table -> (endpoint, length choices, width choices), in inches.
+DIMENSIONS = {
+    "vanity": ("vanities", [24, 30, 36, 48, 60, 72], [18, 19, 21, 22]),
+    "mirror": ("mirrors", [24, 28, 32, 36, 40], [20, 24, 30, 36, 48]),
+    "lighting": ("lightings", [6, 12, 18, 24, 36, 48], [5, 8, 10, 14]),
+    "shower_glass": ("shower-glasses", [30, 34, 48, 60], [72, 74, 76]),
+    "tub_door": ("tub-doors", [56, 58, 60], [57, 59, 62]),
+}
+
+# Minimum gap between the mean cosine of same-name and of random product pairs.
+MIN_SEPARATION = 0.3
+
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+PGCOPY_TRAILER = struct.pack("!h", -1)
+
+
+def slot_words(endpoint: str) -> dict[str, list[str]]:
+    sizes, materials, nouns = VOCABULARY[endpoint]
+    return {
+        "brand": BRANDS,
+        "collection": COLLECTIONS,
+        "size": sizes,
+        "finish": FINISHES,
+        "material": materials,
+        "noun": nouns,
+    }
+
+
+class CategoryGenerator:
+    """Products of one category: names, embeddings and attributes."""
+
+    def __init__(self, endpoint: str, dims: int, seed: int, noise: float) -> None:
+        self.endpoint = endpoint
+        self.category_id = ENDPOINTS[endpoint]["category_id"]
+        self.words = slot_words(endpoint)
+        self.noise = noise
+        # Word vectors depend on the word only, so words shared by categories
+        # (brands, finishes, "Stainless Steel") point the same way everywhere.
+        self.vectors = {
+            slot: np.stack([word_vector(w, dims, seed) for w in words])
+            for slot, words in self.words.items()
+        }
+        self.seed = [seed, zlib.crc32(endpoint.encode())]
+        self.rng = np.random.default_rng(self.seed)
+
+    def products(self, count: int) -> dict:
+        rng = self.rng
+        choice = {slot: rng.integers(0, len(w), count) for slot, w in self.words.items()}
+        names = [
+            " ".join(self.words[slot][choice[slot][i]] for slot in SLOTS)
+            for i in range(count)
+        ]
+        dims = self.vectors["brand"].shape[1]
+        embeddings = self.embed(choice, rng)
+        descriptions = normalize(
+            embeddings + 0.5 * rng.standard_normal((count, dims)) / np.sqrt(dims)
+        ).astype(np.float32)
+        ids = [uuid.UUID(bytes=rng.bytes(16), version=4) for _ in range(count)]
+        return {
+            "ids": ids,
+            "names": names,
+            "descriptions": [
+                f"{name}. {self.words['material'][choice['material'][i]]} design "
+                f"in {self.words['finish'][choice['finish'][i]].lower()}."
+                for i, name in enumerate(names)
+            ],
+            "embeddings": embeddings,
+            "description_embeddings": descriptions,
+        }
+
+
+    def embed(self, choice: dict[str, np.ndarray], rng: np.random.Generator) -> np.ndarray:
+        """Normalized sum of the chosen words' vectors plus noise.
+
+        The noise is scaled by ``1/sqrt(dims)`` so its norm is about
+        ``self.noise`` at any dimensionality, against about ``sqrt(6)`` for
+        the six unit word vectors.
+        """
+        embeddings = sum(self.vectors[slot][choice[slot]] for slot in SLOTS)
+        noise = rng.standard_normal(embeddings.shape) / np.sqrt(embeddings.shape[1])
+        return normalize(embeddings + self.noise * noise).astype(np.float32)
+
+    def separation(self, pairs: int = 500) -> tuple[float, float]:
+        """Mean cosine of same-name pairs and of random pairs.
+
+        Uses its own generator, so checking does not change the catalog.
+        """
+        rng = np.random.default_rng([*self.seed, pairs])
+        first = {slot: rng.integers(0, len(w), pairs) for slot, w in self.words.items()}
+        other = {slot: rng.integers(0, len(w), pairs) for slot, w in self.words.items()}
+        same = (self.embed(first, rng) * self.embed(first, rng)).sum(axis=1)
+        random = (self.embed(first, rng) * self.embed(other, rng)).sum(axis=1)
+        return float(same.mean()), float(random.mean())
+
+
+def word_vector(word: str, dims: int, seed: int) -> np.ndarray:
+    digest = uuid.uuid5(uuid.NAMESPACE_OID, f"{seed}:{word}").int % 2**32
+    vector = np.random.default_rng(digest).standard_normal(dims)
+    return vector / np.linalg.norm(vector)
+
+
+def normalize(x: np.ndarray) -> np.ndarray:
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def flags(rng: np.random.Generator, count: int, p_true: float, p_null: float) -> list:
+    """Booleans with ``p_true`` of the known values true and ``p_null`` unknown."""
+    values = rng.random(count) < p_true
+    unknown = rng.random(count) < p_null
+    return [None if u else bool(v) for v, u in zip(values, unknown)]
+
+
+def ai_data_copy(ids: list[uuid.UUID], names: np.ndarray, descriptions: np.ndarray,
+                 has_description: np.ndarray) -> bytes:
+    """Binary COPY stream for product_ai_data (pgvector binary format)."""
+    dims = names.shape[1]
+    vector = [("len", ">i4"), ("dim", ">i2"), ("unused", ">i2"), ("values", ">f4", (dims,))]
+    parts = [PGCOPY_HEADER]
+    for with_description in (True, False):
+        rows = np.flatnonzero(has_description == with_description)
+        fields = [("ncols", ">i2"), ("id_len", ">i4"), ("id", "V16")]
+        fields += [(f"n_{name}", *spec) for name, *spec in vector]
+        fields += (
+            [(f"d_{name}", *spec) for name, *spec in vector]
+            if with_description
+            else [("d_len", ">i4")]
+        )
+        block = np.zeros(len(rows), dtype=np.dtype(fields))
+        block["ncols"] = 3
+        block["id_len"] = 16
+        block["id"] = np.frombuffer(
+            b"".join(ids[i].bytes for i in rows), dtype="V16"
+        )
+        block["n_len"] = 4 + 4 * dims
+        block["n_dim"] = dims
+        block["n_values"] = names[rows]
+        if with_description:
+            block["d_len"] = 4 + 4 * dims
+            block["d_dim"] = dims
+            block["d_values"] = descriptions[rows]
+        else:
+            block["d_len"] = -1
+        parts.append(block.tobytes())
+    parts.append(PGCOPY_TRAILER)
+    return b"".join(parts)
+
+
+async def copy_chunk(
+    conn: asyncpg.Connection,
+    generator: CategoryGenerator,
+    count: int,
+    missing_descriptions: float,
+) -> None:
+    endpoint = generator.endpoint
+    rng = generator.rng
+    batch = generator.products(count)
+    ids = batch["ids"]
+
+    await conn.copy_records_to_table(
+        "product",
+        records=[
+            (pid, name, description, generator.category_id)
+            for pid, name, description in zip(ids, batch["names"], batch["descriptions"])
+        ],
+        columns=["id", "name", "description", "category_id"],
+    )
+    has_description = rng.random(count) >= missing_descriptions
+    await conn.copy_to_table(
+        "product_ai_data",
+        source=io.BytesIO(
+            ai_data_copy(
+                ids,
+                batch["embeddings"],
+                batch["description_embeddings"],
+                has_description,
+            )
+        ),
+        columns=[
+            "product_id",
+            "jina_v2_clip_name_embedding",
+            "jina_v2_clip_description_embedding",
+        ],
+        format="binary",
+    )
+
+    if endpoint == "faucets":
+        await conn.copy_records_to_table(
+            "faucet",
+            records=list(
+                zip(
+                    ids,
+                    flags(rng, count, 0.55, 0.05),
+                    flags(rng, count, 0.30, 0.05),
+                    flags(rng, count, 0.35, 0.05),
+                )
+            ),
+        )
+    elif endpoint == "tiles":
+        await conn.copy_records_to_table(
+            "tile",
+            records=list(
+                zip(
+                    ids,
+                    flags(rng, count, 0.85, 0.02),
+                    flags(rng, count, 0.55, 0.02),
+                    flags(rng, count, 0.60, 0.02),
+                    flags(rng, count, 0.25, 0.02),
+                )
+            ),
+        )
+    elif endpoint == "shower-systems":
+        # Some shower systems have no shower_system row at all.
+        rows = np.flatnonzero(rng.random(count) < 0.9)
+        await conn.copy_records_to_table(
+            "shower_system",
+            records=list(zip([ids[i] for i in rows], flags(rng, len(rows), 0.4, 0.1))),
+        )
+
+    for table, (owner, lengths, widths) in DIMENSIONS.items():
+        if owner != endpoint:
+            continue
+        # Mostly one render per product, a few with two, some with none.
+        renders_per_product = rng.choice([0, 1, 2], size=count, p=[0.05, 0.85, 0.10])
+        products = np.repeat(np.arange(count), renders_per_product)
+        renders = [uuid.UUID(bytes=rng.bytes(16), version=4) for _ in products]
+        length = rng.choice(lengths, len(products)) + rng.choice([0, 0, 0.5], len(products))
+        width = rng.choice(widths, len(products)).astype(float)
+        unknown = rng.random(len(products)) < 0.08
+        await conn.copy_records_to_table(
+            "renderable_product",
+            records=[
+                (r, None if u else float(l), None if u else float(w))
+                for r, l, w, u in zip(renders, length, width, unknown)
+            ],
+        )
+        await conn.copy_records_to_table(
+            table, records=[(ids[p], r) for p, r in zip(products, renders)]
+        )
+
+
+async def generate(args: argparse.Namespace) -> None:
+    endpoints = (
+        [e.strip() for e in args.categories.split(",") if e.strip()]
+        if args.categories
+        else [e for e in ENDPOINTS if e in VOCABULARY]
+    )
+    unknown = [e for e in endpoints if e not in VOCABULARY]
+    if unknown:
+        raise SystemExit(f"No vocabulary for: {', '.join(unknown)}")
+    # Same-name products must stay clearly closer than unrelated ones, or the
+    # catalog is random vectors and relevance runs on it mean nothing.
+    for endpoint in endpoints:
+        same, random = CategoryGenerator(endpoint, args.dims, args.seed, args.noise).separation()
+        if same - random < MIN_SEPARATION:
+            raise SystemExit(
+                f"{endpoint}: same-name cosine {same:.3f} vs random {random:.3f}; "
+                f"lower --noise (now {args.noise})"
+            )
+
+    conn = await asyncpg.connect(args.database_url.replace("+asyncpg", ""))
+    try:
+        tables = ["product_ai_data", "faucet", "tile", "shower_system"]
+        tables += list(DIMENSION_TABLES) + ["renderable_product", "product"]
+        if args.drop:
+            await conn.execute(DROP_SQL.format(tables=", ".join(tables)))
+        await conn.execute(SCHEMA_SQL.format(dims=args.dims))
+        for table in DIMENSION_TABLES:
+            await conn.execute(RENDER_TABLE_SQL.format(table=table))
+
+        started = time.perf_counter()
+        total = 0
+        for endpoint in endpoints:
+            generator = CategoryGenerator(endpoint, args.dims, args.seed, args.noise)
+            category_started = time.perf_counter()
+            for offset in range(0, args.products, args.chunk_size):
+                count = min(args.chunk_size, args.products - offset)
+                async with conn.transaction():
+                    await copy_chunk(conn, generator, count, args.missing_descriptions)
+            total += args.products
+            logger.info(
+                "%s (%s): %d products in %.1fs",
+                endpoint,
+                generator.category_id,
+                args.products,
+                time.perf_counter() - category_started,
+            )
+
+        logger.info("Indexing and analyzing...")
+        for table in DIMENSION_TABLES + ["faucet", "tile", "shower_system"]:
+            await conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_product_id_idx ON {table} (product_id)"
+            )
+        await conn.execute(
+            "CREATE INDEX IF NOT EXISTS product_category_id_idx ON product (category_id)"
+        )
+        await conn.execute("ANALYZE")
+        logger.info(
+            "Generated %d products in %d categories in %.1fs",
+            total,
+            len(endpoints),
+            time.perf_counter() - started,
+        )
+    finally:
+        await conn.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Fill a local Postgres with a synthetic product catalog."
+    )
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="Target DB (default: DATABASE_URL or DB_* settings). Use a scratch database.",
+    )
+    parser.add_argument(
+        "--products", type=int, default=10000, help="Products per category."
+    )
+    parser.add_argument(
+        "--categories",
+        default=None,
+        help="Comma-separated endpoint names (default: every endpoint but flooring).",
+    )
+    parser.add_argument("--dims", type=int, default=1024, help="Embedding dimensions.")
+    parser.add_argument(
+        "--noise",
+        type=float,
+        default=1.0,
+        help="Noise norm added to the summed word vectors (each of norm 1) before normalizing.",
+    )
+    parser.add_argument(
+        "--missing-descriptions",
+        type=float,
+        default=0.1,
+        help="Share of products without a description embedding.",
+    )
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--drop",
+        action="store_true",
+        help="Drop the catalog tables first (otherwise rows are appended).",
+    )
+    args = parser.parse_args()
+    if args.database_url is None:
+        args.database_url = settings.database_url
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(generate(parse_args()))
@@ -0,0 +1,759 @@
+#!/usr/bin/env python3
+"""
+Asyncio load generator with open-loop (fixed arrival rate) traffic.
+
+Unlike benchmark_api.py, requests are issued on a schedule that does not
+depend on how fast the server answers, and latency is measured from the
+intended send time, so queueing inside the server is not hidden
+(coordinated omission).
+
+Workload sources (mixed together):
+- data/queries.csv: category,query rows mapped to endpoints
+- queries/<endpoint>.txt: one query string per line
+- .jsonl files (e.g. requests.jsonl): one JSON body per line; an optional
+  "endpoint" key routes the line, and filter fields are reused as filters
+
+Rate profiles:
+- constant: --rate R for --duration S
+- ramp:     --rate R0 --rate-end R1 linearly over --duration S
+- step:     --steps 50:30,100:30,200:30 (rate:seconds pairs)
+
+Examples:
+  python3 scripts/load_generator.py --url http://localhost:8000 --rate 50 --duration 60
+  python3 scripts/load_generator.py --url http://localhost:8000 --profile step \\
+      --steps 20:30,60:30,120:30 --jsonl requests.jsonl --json-out run.json
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import math
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+# Labels used in data/queries.csv -> API endpoint.
+CSV_CATEGORY_ENDPOINTS = {
+    "decorative lighting": "lightings",
+    "faucets": "faucets",
+    "flooring": "flooring",
+    "mirror": "mirrors",
+    "paint": "paints",
+    "robe hook": "robe-hooks",
+    "shower systems": "shower-systems",
+    "tile": "tiles",
+    "toilet": "toilets",
+    "toilet paper holder": "toilet-paper-holders",
+    "towel bar": "towel-bars",
+    "tub doors": "tub-doors",
+    "tubs": "tubs",
+    "vanities": "vanities",
+    "wallpaper": "wallpapers",
+}
+
+# Filter fields accepted by each endpoint (mirrors app/data/categories.py).
+ENDPOINT_FILTERS = {
+    "faucets": ["holeSpacingCompatibility"],
+    "vanities": ["lengthMax"],
+    "lightings": ["lengthMax"],
+    "tiles": ["locations"],
+    "shower-systems": ["hasTubSpout"],
+    "shower-glasses": ["lengthMax"],
+    "mirrors": ["widthMax"],
+    "tub-doors": ["lengthMax"],
+}
+
+NON_FILTER_KEYS = {"query", "page", "endpoint", "capture"}
+
+
+# ---------------------------------------------------------------------------
+# Histogram
+# ---------------------------------------------------------------------------
+
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of latencies in microseconds.
+
+    Values below 2**sub_bits are stored exactly; larger values keep
+    ``sub_bits - 1`` bits of mantissa, i.e. a relative error below
+    ``2 ** -(sub_bits - 1)`` (under 1% with the default of 8 bits).
+    Histograms are mergeable, so per-endpoint and total views are exact.
+    """
+
+    def __init__(self, sub_bits: int = 8) -> None:
+        self.sub_bits = sub_bits
+        self.counts: dict[int, int] = {}
+        self.total = 0
+        self.sum_us = 0
+        self.min_us: int | None = None
+        self.max_us = 0
+
+    def _bucket(self, value: int) -> int:
+        sub_count = 1 << self.sub_bits
+        if value < sub_count:
+            return value
+        shift = value.bit_length() - self.sub_bits
+        mantissa = value >> shift
+        half = sub_count >> 1
+        return sub_count + (shift - 1) * half + (mantissa - half)
+
+    def _bucket_value(self, bucket: int) -> int:
+        sub_count = 1 << self.sub_bits
+        if bucket < sub_count:
+            return bucket
+        half = sub_count >> 1
+        offset = bucket - sub_count
+        shift = offset // half + 1
+        mantissa = offset % half + half
+        low = mantissa << shift
+        return low + ((1 << shift) >> 1)
+
+    def record(self, latency_ms: float) -> None:
+        value = max(0, int(latency_ms * 1000.0))
+        bucket = self._bucket(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+        self.sum_us += value
+        self.max_us = max(self.max_us, value)
+        self.min_us = value if self.min_us is None else min(self.min_us, value)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += other.total
+        self.sum_us += other.sum_us
+        self.max_us = max(self.max_us, other.max_us)
+        if other.min_us is not None:
+            self.min_us = (
+                other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+            )
+
+    def percentile(self, p: float) -> float:
+        """Return the p-th percentile (0..100) in milliseconds."""
+        if not self.total:
+            return 0.0
+        rank = max(1, math.ceil(self.total * p / 100.0))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self._bucket_value(bucket), self.max_us) / 1000.0
+        return self.max_us / 1000.0
+
+    def summary(self) -> dict:
+        return {
+            "count": self.total,
+            "mean_ms": (self.sum_us / self.total / 1000.0) if self.total else 0.0,
+            "min_ms": (self.min_us or 0) / 1000.0,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "p999_ms": self.percentile(99.9),
+            "max_ms": self.max_us / 1000.0,
+        }
+
+    def buckets(self) -> list[list[float]]:
+        """Return [upper-ish value ms, count] pairs for plotting."""
+        return [
+            [self._bucket_value(b) / 1000.0, self.counts[b]] for b in sorted(self.counts)
+        ]
+
+
+@dataclass
+class EndpointStats:
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    service: LatencyHistogram = field(default_factory=LatencyHistogram)
+    ok: int = 0
+    failed: int = 0
+    statuses: dict[int, int] = field(default_factory=dict)
+    fail_samples: list[str] = field(default_factory=list)
+
+    def record(
+        self, ok: bool, status: int, latency_ms: float, service_ms: float, err: str
+    ) -> None:
+        self.latency.record(latency_ms)
+        self.service.record(service_ms)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if ok:
+            self.ok += 1
+        else:
+            self.failed += 1
+            if len(self.fail_samples) < 5:
+                self.fail_samples.append(f"status={status}, err={err}")
+
+
+# ---------------------------------------------------------------------------
+# Minimal HTTP/1.1 keep-alive client
+# ---------------------------------------------------------------------------
+
+
+class HttpConnectionPool:
+    """Small keep-alive HTTP/1.1 client on top of asyncio streams."""
+
+    def __init__(self, base_url: str, max_connections: int, timeout: float) -> None:
+        parts = urlsplit(base_url)
+        if parts.scheme != "http":
+            raise ValueError("Only http:// URLs are supported.")
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def _read_body(self, reader: asyncio.StreamReader, headers: dict) -> bytes:
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size_line = await reader.readline()
+                size = int(size_line.split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            return b"".join(chunks)
+        length = int(headers.get("content-length", "0"))
+        return await reader.readexactly(length) if length else b""
+
+    async def _roundtrip(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        path: str,
+        body: bytes,
+    ) -> tuple[int, dict, bytes]:
+        head = (
+            f"POST {self.prefix}{path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode("ascii")
+        writer.write(head + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        status = int(status_line.split()[1])
+        headers: dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        payload = await self._read_body(reader, headers)
+        return status, headers, payload
+
+    async def post(self, path: str, body: bytes) -> tuple[int, dict, bytes, float]:
+        """POST a JSON body; return (status, headers, body, send timestamp)."""
+        async with self._slots:
+            sent_at = time.perf_counter()
+            if self._idle:
+                reader, writer = self._idle.pop()
+            else:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                status, headers, payload = await asyncio.wait_for(
+                    self._roundtrip(reader, writer, path, body), self.timeout
+                )
+            except BaseException:
+                writer.close()
+                raise
+            if headers.get("connection", "").lower() == "close":
+                writer.close()
+            else:
+                self._idle.append((reader, writer))
+            return status, headers, payload, sent_at
+
+    async def close(self) -> None:
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+
+# ---------------------------------------------------------------------------
+# Workload
+# ---------------------------------------------------------------------------
+
+
+def load_csv_queries(path: Path) -> list[tuple[str, dict]]:
+    items: list[tuple[str, dict]] = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            endpoint = CSV_CATEGORY_ENDPOINTS.get(row["category"].strip().lower())
+            query = (row.get("query") or "").strip()
+            if endpoint and query:
+                items.append((endpoint, {"query": query}))
+    return items
+
+
+def load_txt_queries(directory: Path) -> list[tuple[str, dict]]:
+    items: list[tuple[str, dict]] = []
+    for path in sorted(directory.glob("*.txt")):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                query = line.strip()
+                if query:
+                    items.append((path.stem, {"query": query}))
+    return items
+
+
+def load_jsonl(path: Path) -> tuple[list[tuple[str, dict]], dict[str, list[dict]]]:
+    """Return (routed payloads, filter sets per endpoint) from a .jsonl file.
+
+    Lines without a usable query are skipped, so unrelated JSONL files do
+    not break the run.
+    """
+    items: list[tuple[str, dict]] = []
+    filters: dict[str, list[dict]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                payload = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(payload, dict) or not isinstance(
+                payload.get("query"), str
+            ):
+                continue
+
+            endpoint = str(payload.get("endpoint") or "").strip("/")
+            found = {
+                k: v
+                for k, v in payload.items()
+                if k not in NON_FILTER_KEYS and v is not None
+            }
+            targets = (
+                [endpoint]
+                if endpoint
+                else [
+                    ep
+                    for ep, keys in ENDPOINT_FILTERS.items()
+                    if found and set(found) <= set(keys)
+                ]
+            )
+            for ep in targets:
+                if found:
+                    filters.setdefault(ep, []).append(found)
+            if endpoint:
+                body = {k: v for k, v in payload.items() if k not in ("endpoint", "capture")}
+                items.append((endpoint, body))
+    return items, filters
+
+
+def parse_mix(value: str | None) -> dict[str, float]:
+    if not value:
+        return {}
+    mix: dict[str, float] = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip():
+            mix[name.strip().strip("/")] = float(weight or 1.0)
+    return mix
+
+
+class Workload:
+    """Weighted random mix of (endpoint, body) payloads."""
+
+    def __init__(
+        self,
+        items: list[tuple[str, dict]],
+        filters: dict[str, list[dict]],
+        filter_rate: float,
+        mix: dict[str, float],
+        max_page: int,
+        seed: int,
+    ) -> None:
+        self.rng = random.Random(seed)
+        self.filters = filters
+        self.filter_rate = filter_rate
+        self.max_page = max_page
+        by_endpoint: dict[str, list[dict]] = {}
+        for endpoint, body in items:
+            by_endpoint.setdefault(endpoint, []).append(body)
+        if mix:
+            by_endpoint = {ep: by_endpoint[ep] for ep in mix if ep in by_endpoint}
+        if not by_endpoint:
+            raise RuntimeError("Workload is empty: no queries for selected endpoints.")
+        self.by_endpoint = by_endpoint
+        self.endpoints = list(by_endpoint)
+        self.weights = [
+            mix.get(ep, float(len(by_endpoint[ep]))) for ep in self.endpoints
+        ]
+
+    def next(self) -> tuple[str, dict]:
+        endpoint = self.rng.choices(self.endpoints, weights=self.weights)[0]
+        body = dict(self.rng.choice(self.by_endpoint[endpoint]))
+        candidates = self.filters.get(endpoint)
+        if candidates and self.rng.random() < self.filter_rate:
+            for key, value in self.rng.choice(candidates).items():
+                body.setdefault(key, value)
+        if self.max_page > 1 and "page" not in body:
+            body["page"] = self.rng.randint(1, self.max_page)
+        return endpoint, body
+
+
+# ---------------------------------------------------------------------------
+# Arrival schedule
+# ---------------------------------------------------------------------------
+
+
+def parse_steps(value: str) -> list[tuple[float, float]]:
+    steps = []
+    for part in value.split(","):
+        rate, _, seconds = part.partition(":")
+        steps.append((float(rate), float(seconds)))
+    return steps
+
+
+def rate_at(args, t: float) -> float:
+    if args.profile == "ramp":
+        frac = min(1.0, t / args.duration) if args.duration > 0 else 1.0
+        return args.rate + (args.rate_end - args.rate) * frac
+    if args.profile == "step":
+        elapsed = 0.0
+        for rate, seconds in args.steps:
+            elapsed += seconds
+            if t < elapsed:
+                return rate
+        return args.steps[-1][0]
+    return args.rate
+
+
+def total_duration(args) -> float:
+    if args.profile == "step":
+        return sum(seconds for _, seconds in args.steps)
+    return args.duration
+
+
+def arrival_offsets(args, rng: random.Random):
+    """Yield intended send offsets (seconds from start) for the profile."""
+    duration = total_duration(args)
+    t = 0.0
+    while t < duration:
+        rate = rate_at(args, t)
+        if rate <= 0:
+            t += 0.01
+            continue
+        yield t
+        if args.arrivals == "poisson":
+            t += rng.expovariate(rate)
+        else:
+            t += 1.0 / rate
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.per_endpoint: dict[str, EndpointStats] = {}
+        self.windows: dict[int, list[int]] = {}
+
+    def record(
+        self,
+        endpoint: str,
+        ok: bool,
+        status: int,
+        latency_ms: float,
+        service_ms: float,
+        err: str,
+        second: int,
+    ) -> None:
+        stats = self.per_endpoint.setdefault(endpoint, EndpointStats())
+        stats.record(ok, status, latency_ms, service_ms, err)
+        window = self.windows.setdefault(second, [0, 0])
+        window[0 if ok else 1] += 1
+
+
+async def issue(
+    client: HttpConnectionPool,
+    recorder: Recorder,
+    endpoint: str,
+    body: dict,
+    intended_at: float,
+    started: float,
+) -> None:
+    payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+    sent_at = intended_at
+    try:
+        status, _, _, sent_at = await client.post(f"/{endpoint}", payload)
+        ok = 200 <= status < 300
+        err = ""
+    except Exception as e:  # noqa: BLE001
+        status, ok, err = 0, False, f"{type(e).__name__}: {e}"
+    done = time.perf_counter()
+    recorder.record(
+        endpoint,
+        ok,
+        status,
+        (done - intended_at) * 1000.0,
+        (done - sent_at) * 1000.0,
+        err,
+        int(intended_at - started),
+    )
+
+
+async def run_open_loop(
+    args, client: HttpConnectionPool, workload: Workload, recorder: Recorder
+) -> float:
+    rng = random.Random(args.seed)
+    tasks: set[asyncio.Task] = set()
+    started = time.perf_counter()
+    for offset in arrival_offsets(args, rng):
+        intended_at = started + offset
+        delay = intended_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        endpoint, body = workload.next()
+        task = asyncio.create_task(
+            issue(client, recorder, endpoint, body, intended_at, started)
+        )
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+    return time.perf_counter() - started
+
+
+async def run_closed_loop(
+    args, client: HttpConnectionPool, workload: Workload, recorder: Recorder
+) -> float:
+    started = time.perf_counter()
+    deadline = started + total_duration(args)
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            endpoint, body = workload.next()
+            await issue(
+                client, recorder, endpoint, body, time.perf_counter(), started
+            )
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return time.perf_counter() - started
+
+
+def build_report(args, recorder: Recorder, elapsed: float) -> dict:
+    total = LatencyHistogram()
+    total_service = LatencyHistogram()
+    endpoints = {}
+    ok = failed = 0
+    for endpoint in sorted(recorder.per_endpoint):
+        stats = recorder.per_endpoint[endpoint]
+        total.merge(stats.latency)
+        total_service.merge(stats.service)
+        ok += stats.ok
+        failed += stats.failed
+        endpoints[endpoint] = {
+            "ok": stats.ok,
+            "failed": stats.failed,
+            "statuses": {str(k): v for k, v in sorted(stats.statuses.items())},
+            "latency": stats.latency.summary(),
+            "service_time": stats.service.summary(),
+            "fail_samples": stats.fail_samples,
+        }
+    count = ok + failed
+    return {
+        "config": {
+            "url": args.url,
+            "mode": args.mode,
+            "profile": args.profile,
+            "arrivals": args.arrivals,
+            "rate": args.rate,
+            "rate_end": args.rate_end,
+            "steps": args.steps,
+            "duration_s": total_duration(args),
+            "concurrency": args.concurrency,
+            "max_connections": args.max_connections,
+        },
+        "elapsed_s": elapsed,
+        "requests": count,
+        "ok": ok,
+        "failed": failed,
+        "error_rate": (failed / count) if count else 0.0,
+        "throughput_rps": (count / elapsed) if elapsed > 0 else 0.0,
+        "latency": total.summary(),
+        "service_time": total_service.summary(),
+        "latency_histogram": total.buckets(),
+        "timeline": [
+            {"second": s, "ok": w[0], "failed": w[1]}
+            for s, w in sorted(recorder.windows.items())
+        ],
+        "endpoints": endpoints,
+    }
+
+
+def print_report(report: dict) -> None:
+    lat = report["latency"]
+    print("\n=== Load test ===")
+    print(f"Mode: {report['config']['mode']} / {report['config']['profile']}")
+    print(f"Elapsed: {report['elapsed_s']:.2f}s")
+    print(f"Requests: {report['requests']} ({report['throughput_rps']:.2f} rps)")
+    print(f"Success: {report['ok']}  Failed: {report['failed']}")
+    print(f"Error rate: {report['error_rate'] * 100:.2f}%")
+    print(
+        "Latency (from intended send) "
+        f"p50={lat['p50_ms']:.2f} p95={lat['p95_ms']:.2f} "
+        f"p99={lat['p99_ms']:.2f} p99.9={lat['p999_ms']:.2f} max={lat['max_ms']:.2f} ms"
+    )
+    svc = report["service_time"]
+    print(
+        "Service time (from actual send) "
+        f"p50={svc['p50_ms']:.2f} p99={svc['p99_ms']:.2f} ms"
+    )
+
+    print("\n=== Per endpoint ===")
+    print(f"{'endpoint':<24}{'count':>8}{'fail':>7}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for endpoint, data in report["endpoints"].items():
+        s = data["latency"]
+        print(
+            f"{endpoint:<24}{s['count']:>8}{data['failed']:>7}"
+            f"{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}"
+        )
+        for sample in data["fail_samples"][:2]:
+            print(f"    - {sample}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Open-loop API load generator.")
+    parser.add_argument("--url", required=True, help="Base URL, e.g. http://localhost:8000")
+    parser.add_argument(
+        "--mode",
+        choices=["open", "closed"],
+        default="open",
+        help="open: fixed arrival rate; closed: --concurrency looping workers",
+    )
+    parser.add_argument(
+        "--profile", choices=["constant", "ramp", "step"], default="constant"
+    )
+    parser.add_argument("--rate", type=float, default=20.0, help="Requests per second")
+    parser.add_argument(
+        "--rate-end", type=float, default=None, help="Final rate for ramp profile"
+    )
+    parser.add_argument(
+        "--steps",
+        type=parse_steps,
+        default=None,
+        help="Step profile as rate:seconds pairs, e.g. 20:30,60:30",
+    )
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds")
+    parser.add_argument(
+        "--arrivals",
+        choices=["uniform", "poisson"],
+        default="poisson",
+        help="Inter-arrival distribution in open-loop mode",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=20, help="Workers in closed-loop mode"
+    )
+    parser.add_argument(
+        "--max-connections", type=int, default=256, help="Connection pool size"
+    )
+    parser.add_argument("--timeout", type=float, default=20.0, help="Per-request timeout")
+    parser.add_argument(
+        "--queries-csv",
+        default=str(ROOT_DIR / "data" / "queries.csv"),
+        help="category,query CSV (empty string to disable)",
+    )
+    parser.add_argument(
+        "--queries-dir",
+        default=str(ROOT_DIR / "queries"),
+        help="Directory with <endpoint>.txt files (empty string to disable)",
+    )
+    parser.add_argument(
+        "--jsonl",
+        action="append",
+        default=[],
+        help="JSONL payload file(s); may be repeated",
+    )
+    parser.add_argument(
+        "--filter-rate",
+        type=float,
+        default=0.3,
+        help="Probability of attaching a known filter set to a request",
+    )
+    parser.add_argument(
+        "--mix",
+        default=None,
+        help="Endpoint weights, e.g. vanities=5,flooring=3,tubs=2 (default: by query count)",
+    )
+    parser.add_argument("--max-page", type=int, default=1, help="Randomize page up to N")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json-out", default=None, help="Write JSON report here")
+    args = parser.parse_args()
+
+    if args.profile == "ramp" and args.rate_end is None:
+        parser.error("--profile ramp requires --rate-end")
+    if args.profile == "step" and not args.steps:
+        parser.error("--profile step requires --steps")
+    return args
+
+
+async def main_async(args) -> dict:
+    items: list[tuple[str, dict]] = []
+    filters: dict[str, list[dict]] = {}
+    if args.queries_csv:
+        items.extend(load_csv_queries(Path(args.queries_csv)))
+    if args.queries_dir:
+        items.extend(load_txt_queries(Path(args.queries_dir)))
+    for path in args.jsonl:
+        routed, found = load_jsonl(Path(path))
+        items.extend(routed)
+        for endpoint, sets in found.items():
+            filters.setdefault(endpoint, []).extend(sets)
+
+    workload = Workload(
+        items,
+        filters,
+        args.filter_rate,
+        parse_mix(args.mix),
+        args.max_page,
+        args.seed,
+    )
+    print(f"Target: {args.url}")
+    print(
+        f"Workload: {len(items)} payloads over {len(workload.endpoints)} endpoints, "
+        f"{sum(len(v) for v in filters.values())} filter sets"
+    )
+
+    client = HttpConnectionPool(args.url, args.max_connections, args.timeout)
+    recorder = Recorder()
+    try:
+        if args.mode == "open":
+            elapsed = await run_open_loop(args, client, workload, recorder)
+        else:
+            elapsed = await run_closed_loop(args, client, workload, recorder)
+    finally:
+        await client.close()
+    return build_report(args, recorder, elapsed)
+
+
+def main():
+    args = parse_args()
+    report = asyncio.run(main_async(args))
+    print_report(report)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nJSON report written to {args.json_out}")
+    if report["requests"] == 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,32 @@ Estimate RAM usage for the current runtime scenario:
 - real in-memory index produced by app.data.loader.load_all
 - model footprint (configurable, default 3.0 GB)
 - projected total for N workers (each worker keeps its own model + index)
+
+With --server-pid, measure a running prefork server (app.server) instead:
+real shared and private memory of the master and each worker, read from
+/proc/<pid>/smaps_rollup, and a projection based on the measured private
+memory per worker.
+
+With --profile, measure instead of estimating: a fresh engine process loads
+the model (SearchEngine.load_model) and the index (load_all, traced with
+tracemalloc for the peak), sampling RSS/PSS/USS after each step, then forks
+--fork-workers workers the way app.server does; each one warms the model and
+runs one search per category before its shared and private memory are read.
+The result includes a per-category breakdown.
+
+--json-out writes the measurements of --profile or --server-pid as JSON.
 """
 
 import argparse
 import asyncio
+import gc
+import json
+import multiprocessing
 import os
+import signal
 import sys
+import time
+import tracemalloc
 from pathlib import Path
 from typing import Iterable
 from urllib.parse import quote_plus
@@ -21,7 +41,9 @@ ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
+from app.data import db
 from app.data.loader import load_all
+from app.search.engine import SearchEngine
 
 BYTES_IN_GB = 1024**3
 
@@ -87,8 +109,9 @@ def gather_index_stats(index: dict) -> dict[str, int]:
     embeddings_bytes = 0
     names_count = 0
     names_chars = 0
-    filter_items = 0
-    dimension_items = 0
+    filter_columns = 0
+    dimension_columns = 0
+    column_bytes = 0
 
     for data in index.values():
         product_ids = data["product_ids"]
@@ -102,8 +125,11 @@ def gather_index_stats(index: dict) -> dict[str, int]:
         names_count += len(names)
         names_chars += sum(len(name) for name in names)
         embeddings_bytes += int(embeddings.nbytes)
-        filter_items += len(filters)
-        dimension_items += len(dimensions)
+        filter_columns += len(filters)
+        dimension_columns += len(dimensions)
+        column_bytes += product_ids.nbytes + names.nbytes
+        column_bytes += sum(c.nbytes for c in filters.values())
+        column_bytes += sum(c.nbytes for c in dimensions.values())
 
     duplicated_product_refs = product_refs - len(unique_products)
 
@@ -115,22 +141,317 @@ def gather_index_stats(index: dict) -> dict[str, int]:
         "embeddings_bytes": embeddings_bytes,
         "names_count": names_count,
         "names_chars": names_chars,
-        "filter_items": filter_items,
-        "dimension_items": dimension_items,
+        "filter_columns": filter_columns,
+        "dimension_columns": dimension_columns,
+        "column_bytes": column_bytes,
+    }
+
+
+def read_smaps_rollup(pid: int) -> dict[str, int]:
+    """Return the memory counters of a process in bytes."""
+    counters = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                counters[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    return counters
+
+
+def memory_sample(pid: int) -> dict[str, int]:
+    """RSS, PSS, USS (private pages) and shared pages of a process, in bytes."""
+    m = read_smaps_rollup(pid)
+    return {
+        "rss": m.get("Rss", 0),
+        "pss": m.get("Pss", 0),
+        "uss": m.get("Private_Clean", 0) + m.get("Private_Dirty", 0),
+        "shared": m.get("Shared_Clean", 0) + m.get("Shared_Dirty", 0),
+    }
+
+
+def child_pids(pid: int) -> list[int]:
+    children = []
+    for task in Path(f"/proc/{pid}/task").iterdir():
+        text = (task / "children").read_text()
+        children.extend(int(p) for p in text.split())
+    return sorted(children)
+
+
+def print_processes(processes: list[dict]) -> None:
+    """Print the smaps_rollup samples of a master and its workers."""
+    print("=== Measured Memory (smaps_rollup) ===")
+    print(f"{'pid':>8} {'role':>7} {'RSS':>10} {'PSS':>10} {'shared':>10} {'private':>10}")
+    for p in processes:
+        print(
+            f"{p['pid']:>8} {p['role']:>7} {format_mb(p['rss']):>10} "
+            f"{format_mb(p['pss']):>10} {format_mb(p['shared']):>10} "
+            f"{format_mb(p['uss']):>10}"
+        )
+    print(f"Total PSS (actual footprint): {format_gb(total_pss(processes))}")
+
+
+def total_pss(processes: list[dict]) -> int:
+    return sum(p["pss"] for p in processes)
+
+
+def measured_projection(processes: list[dict], args) -> dict | None:
+    """Per-worker and fixed bytes from measured samples, or None without workers."""
+    worker_private = [p["uss"] for p in processes if p["role"] == "worker"]
+    if not worker_private:
+        return None
+    # Everything but the workers' private pages is paid once.
+    base = total_pss(processes) - sum(worker_private)
+    return {
+        "per_worker_bytes": sum(worker_private) // len(worker_private),
+        "fixed_bytes": int(args.fixed_overhead_gb * BYTES_IN_GB) + base,
     }
 
 
+def print_measured_projection(projection: dict | None, args) -> None:
+    if projection is None:
+        print("No workers found.")
+        return
+    print_worker_projection(
+        workers=args.workers,
+        worker_runtime_bytes=projection["per_worker_bytes"],
+        fixed_overhead_bytes=projection["fixed_bytes"],
+        target_rams_gb=args.target_rams_gb,
+        per_worker_label="Per worker (measured private memory)",
+        fixed_label="Fixed (OS/agent/etc + master + shared pages)",
+    )
+
+
+def projection_table(projection: dict | None, args) -> list[dict]:
+    if projection is None:
+        return []
+    rows = []
+    for n in args.workers:
+        total = projection["fixed_bytes"] + projection["per_worker_bytes"] * n
+        rows.append(
+            {
+                "workers": n,
+                "total_bytes": total,
+                "fits_gb": [gb for gb in args.target_rams_gb if gb * BYTES_IN_GB > total],
+            }
+        )
+    return rows
+
+
+def write_json(path: str, report: dict) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {path}")
+
+
+def measure_server(args):
+    pids = [args.server_pid] + child_pids(args.server_pid)
+    processes = [
+        {"pid": pid, "role": "master" if i == 0 else "worker", **memory_sample(pid)}
+        for i, pid in enumerate(pids)
+    ]
+    print_processes(processes)
+    projection = measured_projection(processes, args)
+    print_measured_projection(projection, args)
+    if args.json_out:
+        write_json(
+            args.json_out,
+            {
+                "mode": "server",
+                "processes": processes,
+                "total_pss_bytes": total_pss(processes),
+                "projection": projection,
+                "projection_table": projection_table(projection, args),
+            },
+        )
+
+
+# ---------------------------------------------------------------------------
+# --profile: measured engine processes
+# ---------------------------------------------------------------------------
+
+
+def _profile_worker(engine: SearchEngine, ready: int) -> None:
+    """Forked worker: warm the model, search every category, then wait."""
+    try:
+        engine.warmup()
+        for data in engine.index.values():
+            if len(data["names"]):
+                query = data["names"][0]
+                SearchEngine.rank_products(
+                    data, query, engine.encoder.encode(query), None
+                )
+        os.write(ready, b"1")
+        signal.pause()
+    finally:
+        os._exit(0)
+
+
+def _category_breakdown(index: dict) -> dict[str, dict]:
+    return {
+        category_id: {
+            "products": len(data["product_ids"]),
+            "resident_bytes": data["resident_bytes"],
+            "embeddings_bytes": int(data["embeddings"].nbytes),
+            "load_seconds": round(data["load_seconds"], 3),
+        }
+        for category_id, data in sorted(
+            index.items(), key=lambda item: -item[1]["resident_bytes"]
+        )
+    }
+
+
+async def _profile_load(database_url: str) -> dict:
+    """Load model and index in this process, sampling memory after each step."""
+    pid = os.getpid()
+    steps = {"baseline": memory_sample(pid)}
+
+    engine = SearchEngine({})
+    started = time.perf_counter()
+    # No warmup, like the prefork master: torch threads start in the workers.
+    engine.load_model(False)
+    model_seconds = time.perf_counter() - started
+    steps["model"] = memory_sample(pid)
+
+    await db.connect(database_url)
+    try:
+        tracemalloc.start()
+        started = time.perf_counter()
+        await load_all(db.get_pool(), engine.index, engine.vector_categories)
+        load_seconds = time.perf_counter() - started
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        await db.close()
+    gc.collect()
+    steps["index"] = memory_sample(pid)
+
+    return {
+        "engine": engine,
+        "steps": steps,
+        "model_seconds": model_seconds,
+        "load_seconds": load_seconds,
+        "traced_bytes": traced,
+        "traced_peak_bytes": traced_peak,
+    }
+
+
+def _profile_process(database_url: str, fork_workers: int, conn) -> None:
+    """Body of the profiled engine process; sends its report over ``conn``."""
+    loaded = asyncio.run(_profile_load(database_url))
+    engine = loaded.pop("engine")
+
+    gc.freeze()
+    ready_r, ready_w = os.pipe()
+    workers = []
+    for _ in range(fork_workers):
+        pid = os.fork()
+        if pid == 0:
+            _profile_worker(engine, ready_w)
+        workers.append(pid)
+    for _ in workers:
+        os.read(ready_r, 1)
+
+    processes = [{"pid": os.getpid(), "role": "master", **memory_sample(os.getpid())}]
+    processes += [{"pid": pid, "role": "worker", **memory_sample(pid)} for pid in workers]
+    for pid in workers:
+        os.kill(pid, signal.SIGTERM)
+        os.waitpid(pid, 0)
+
+    conn.send(
+        {
+            **loaded,
+            "vector_categories": sorted(engine.vector_categories),
+            "categories": _category_breakdown(engine.index),
+            "processes": processes,
+        }
+    )
+    conn.close()
+
+
+def profile(args, database_url: str) -> None:
+    # A spawned process starts clean: nothing this script imported or
+    # allocated is counted, and the model is only loaded in there.
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    process = ctx.Process(
+        target=_profile_process, args=(database_url, max(0, args.fork_workers), child)
+    )
+    process.start()
+    child.close()
+    try:
+        report = parent.recv()
+    except EOFError:
+        raise RuntimeError(f"Profiled engine process failed (exit {process.exitcode})")
+    finally:
+        process.join()
+
+    steps = report["steps"]
+    model_bytes = steps["model"]["rss"] - steps["baseline"]["rss"]
+    index_bytes = steps["index"]["rss"] - steps["model"]["rss"]
+
+    print("=== Engine Process ===")
+    print(f"{'step':>10} {'RSS':>10} {'PSS':>10} {'USS':>10}")
+    for name, m in steps.items():
+        print(
+            f"{name:>10} {format_mb(m['rss']):>10} {format_mb(m['pss']):>10} "
+            f"{format_mb(m['uss']):>10}"
+        )
+    print(f"Model: {format_gb(model_bytes)} RSS in {report['model_seconds']:.1f}s")
+    print(
+        f"Index: {format_gb(index_bytes)} RSS in {report['load_seconds']:.1f}s "
+        f"(tracemalloc: {format_gb(report['traced_bytes'])} retained, "
+        f"{format_gb(report['traced_peak_bytes'])} peak during load_all)"
+    )
+    if report["vector_categories"]:
+        print(f"pgvector tier (not in memory): {', '.join(report['vector_categories'])}")
+
+    print("\n=== Categories ===")
+    print(f"{'category':>38} {'products':>9} {'resident':>10} {'embeddings':>11} {'load':>7}")
+    for category_id, c in report["categories"].items():
+        print(
+            f"{category_id:>38} {c['products']:>9} {format_mb(c['resident_bytes']):>10} "
+            f"{format_mb(c['embeddings_bytes']):>11} {c['load_seconds']:>6.1f}s"
+        )
+
+    print()
+    print_processes(report["processes"])
+    projection = measured_projection(report["processes"], args)
+    print_measured_projection(projection, args)
+
+    if args.json_out:
+        write_json(
+            args.json_out,
+            {
+                "mode": "profile",
+                "steps": steps,
+                "model": {"rss_bytes": model_bytes, "seconds": report["model_seconds"]},
+                "index": {
+                    "rss_bytes": index_bytes,
+                    "seconds": report["load_seconds"],
+                    "traced_bytes": report["traced_bytes"],
+                    "traced_peak_bytes": report["traced_peak_bytes"],
+                },
+                "vector_categories": report["vector_categories"],
+                "categories": report["categories"],
+                "processes": report["processes"],
+                "total_pss_bytes": total_pss(report["processes"]),
+                "projection": projection,
+                "projection_table": projection_table(projection, args),
+            },
+        )
+
+
 def print_worker_projection(
     workers: Iterable[int],
     worker_runtime_bytes: int,
     fixed_overhead_bytes: int,
     target_rams_gb: Iterable[int],
+    per_worker_label: str = "Per worker (index + model + runtime overhead)",
+    fixed_label: str = "Fixed overhead (OS/agent/etc)",
 ):
     print("\n=== Worker Projection ===")
-    print(
-        f"Per worker (index + model + runtime overhead): {format_gb(worker_runtime_bytes)}"
-    )
-    print(f"Fixed overhead (OS/agent/etc): {format_gb(fixed_overhead_bytes)}")
+    print(f"{per_worker_label}: {format_gb(worker_runtime_bytes)}")
+    print(f"{fixed_label}: {format_gb(fixed_overhead_bytes)}")
 
     for n in workers:
         total = fixed_overhead_bytes + worker_runtime_bytes * n
@@ -144,6 +465,10 @@ def print_worker_projection(
 
 
 async def run(args):
+    if args.server_pid:
+        measure_server(args)
+        return
+
     database_url = (
         args.database_url or os.getenv("DATABASE_URL") or build_db_url_from_env()
     )
@@ -153,6 +478,10 @@ async def run(args):
             "or set DB_HOST/DB_PORT/DB_NAME/DB_USER/DB_PASSWORD."
         )
 
+    if args.profile:
+        profile(args, database_url)
+        return
+
     url = database_url.replace("+asyncpg", "")
 
     pool = await asyncpg.create_pool(url, min_size=1, max_size=2)
@@ -177,8 +506,9 @@ async def run(args):
     print(f"Embeddings only: {format_mb(stats['embeddings_bytes'])}")
     print(f"Names count: {stats['names_count']}")
     print(f"Names chars total: {stats['names_chars']}")
-    print(f"Filter rows in memory: {stats['filter_items']}")
-    print(f"Dimension rows in memory: {stats['dimension_items']}")
+    print(f"Filter columns in memory: {stats['filter_columns']}")
+    print(f"Dimension columns in memory: {stats['dimension_columns']}")
+    print(f"IDs, names, filters, dimensions: {format_mb(stats['column_bytes'])}")
     print(f"Full index deep size: {format_gb(index_total_bytes)}")
 
     print("\n=== Memory Inputs ===")
@@ -233,6 +563,28 @@ def parse_args():
         default=[8, 16],
         help="Comma-separated node RAM capacities to check, e.g. 8,16",
     )
+    parser.add_argument(
+        "--server-pid",
+        type=int,
+        default=None,
+        help="PID of a running app.server master; measure it and its workers instead of loading the index.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Measure a real engine process (model, index, forked workers) instead of estimating.",
+    )
+    parser.add_argument(
+        "--fork-workers",
+        type=int,
+        default=2,
+        help="Workers forked from the profiled engine to measure sharing (--profile).",
+    )
+    parser.add_argument(
+        "--json-out",
+        default=None,
+        help="Write the measurements of --profile or --server-pid to this JSON file.",
+    )
     return parser.parse_args()
 
 
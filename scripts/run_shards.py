@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Run a sharded deployment as local processes: shard nodes plus a router.
+
+Each shard is `python -m app.server` with SHARD_CATEGORIES set to its group of
+endpoints; every group runs --replicas times on consecutive ports from
+--base-port. The router (`python -m app.shard_router`) listens on --port and
+routes to all of them. Ctrl-C stops everything.
+
+Examples:
+  python3 scripts/run_shards.py --shard-count 3
+  python3 scripts/run_shards.py --groups "faucets,tiles,lvps,flooring;vanities,mirrors" --replicas 2
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from app.data.categories import ENDPOINTS  # noqa: E402
+
+
+def split_groups(count: int) -> list[list[str]]:
+    """Deal ENDPOINTS round-robin into ``count`` groups.
+
+    Flooring is built from LVPs and tiles, so it goes to the group of tiles.
+    """
+    groups: list[list[str]] = [[] for _ in range(max(1, count))]
+    names = [name for name in ENDPOINTS if name != "flooring"]
+    for i, name in enumerate(names):
+        groups[i % len(groups)].append(name)
+    next(g for g in groups if "tiles" in g).append("flooring")
+    return groups
+
+
+def parse_groups(value: str) -> list[list[str]]:
+    groups = [[n.strip() for n in g.split(",") if n.strip()] for g in value.split(";")]
+    groups = [g for g in groups if g]
+    unknown = [n for g in groups for n in g if n not in ENDPOINTS]
+    if unknown:
+        raise SystemExit(f"Unknown endpoints: {', '.join(unknown)}")
+    return groups
+
+
+def wait_ready(url: str, timeout_s: float) -> bool:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url + "/readyz", timeout=2) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(1.0)
+    return False
+
+
+def start(cmd: list[str], env: dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(cmd, cwd=ROOT_DIR, env=env)
+
+
+def main() -> None:
+    args = parse_args()
+    # Stop the children on SIGTERM as on Ctrl-C.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    groups = parse_groups(args.groups) if args.groups else split_groups(args.shard_count)
+
+    processes: list[subprocess.Popen] = []
+    shard_urls = []
+    port = args.base_port
+    try:
+        for group in groups:
+            for _ in range(max(1, args.replicas)):
+                env = {**os.environ, "SHARD_CATEGORIES": ",".join(group)}
+                processes.append(
+                    start(
+                        [
+                            sys.executable, "-m", "app.server",
+                            "--host", "127.0.0.1", "--port", str(port),
+                            "--workers", str(args.workers),
+                        ],
+                        env,
+                    )
+                )
+                url = f"http://127.0.0.1:{port}"
+                shard_urls.append(url)
+                print(f"shard {url}: {', '.join(group)}")
+                port += 1
+
+        processes.append(
+            start(
+                [
+                    sys.executable, "-m", "app.shard_router",
+                    "--shards", ",".join(shard_urls),
+                    "--host", args.host, "--port", str(args.port),
+                ],
+                dict(os.environ),
+            )
+        )
+        router_url = f"http://127.0.0.1:{args.port}"
+        if wait_ready(router_url, args.ready_timeout):
+            print(f"router {router_url}: all endpoints ready")
+        else:
+            print(f"router {router_url}: not ready after {args.ready_timeout:.0f}s")
+
+        while all(p.poll() is None for p in processes):
+            time.sleep(1.0)
+        print("A process exited; stopping.")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for p in processes:
+            if p.poll() is None:
+                p.send_signal(signal.SIGTERM)
+        for p in processes:
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run category shards and a shard router as local processes."
+    )
+    parser.add_argument(
+        "--groups",
+        default=None,
+        help='Endpoint groups, ";"-separated lists of endpoint names (one shard per group).',
+    )
+    parser.add_argument(
+        "--shard-count",
+        type=int,
+        default=2,
+        help="Split ENDPOINTS into this many groups when --groups is not given.",
+    )
+    parser.add_argument("--replicas", type=int, default=1, help="Nodes per group.")
+    parser.add_argument("--workers", type=int, default=1, help="Workers per shard node.")
+    parser.add_argument("--base-port", type=int, default=8001)
+    parser.add_argument("--host", default="0.0.0.0", help="Router listen address.")
+    parser.add_argument("--port", type=int, default=8000, help="Router port.")
+    parser.add_argument("--ready-timeout", type=float, default=600.0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main()
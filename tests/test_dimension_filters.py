@@ -0,0 +1,122 @@
+"""lengthMax/widthMax agree between the in-memory and the pgvector tier.
+
+A product with several renders is rejected if any render exceeds the limit.
+The pgvector check runs against ``TEST_DATABASE_URL`` when it is set (a
+scratch database; the tables are created in a temporary schema).
+"""
+
+import asyncio
+import os
+import uuid
+
+import numpy as np
+import pytest
+
+from app.data.loader import _load_filters
+from app.data.schema import DIMENSION_TABLES
+from app.data.vector_store import _filter_clauses
+from app.search.columns import IdColumn
+from app.search.filters import apply_filters
+
+TWO_RENDERS = uuid.UUID(int=1)
+ONE_RENDER = uuid.UUID(int=2)
+NO_RENDER = uuid.UUID(int=3)
+PRODUCTS = [TWO_RENDERS, ONE_RENDER, NO_RENDER]
+
+# (product, length, width) per render; the short render of TWO_RENDERS is
+# listed last, so keeping the last value would let it pass a 40-in limit.
+RENDERS = [
+    (TWO_RENDERS, 48.0, 22.0),
+    (ONE_RENDER, 36.0, 21.0),
+    (TWO_RENDERS, 30.0, 18.0),
+]
+
+CASES = [
+    ({"lengthMax": 40.0}, {ONE_RENDER, NO_RENDER}),
+    ({"lengthMax": 50.0}, set(PRODUCTS)),
+    ({"widthMax": 20.0}, {NO_RENDER}),
+    ({"lengthMax": 40.0, "widthMax": 21.0}, {ONE_RENDER, NO_RENDER}),
+]
+
+
+class RenderPool:
+    """Answers the loader's queries with ``RENDERS`` in the vanity table."""
+
+    async def fetch(self, sql: str, *args):
+        if "FROM vanity" not in sql:
+            return []
+        return [
+            {"product_id": product, "length": length, "width": width}
+            for product, length, width in RENDERS
+        ]
+
+
+def loaded() -> dict:
+    data = {
+        "product_ids": IdColumn.from_values(PRODUCTS),
+        "filters": {},
+        "dimensions": {},
+    }
+    asyncio.run(_load_filters(RenderPool(), "vanities", data))
+    return data
+
+
+def in_memory_matches(filters: dict) -> set[uuid.UUID]:
+    rows = np.arange(len(PRODUCTS))
+    keep = apply_filters(rows, loaded(), filters)
+    return {PRODUCTS[row] for row in rows[keep]}
+
+
+def test_in_memory_keeps_largest_render():
+    data = loaded()
+    assert data["dimensions"]["length"].tolist()[:2] == [48.0, 36.0]
+    assert np.isnan(data["dimensions"]["length"][2])
+
+
+@pytest.mark.parametrize("filters,expected", CASES)
+def test_in_memory_rejects_any_render_over_limit(filters, expected):
+    assert in_memory_matches(filters) == expected
+
+
+@pytest.mark.skipif(
+    not os.environ.get("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not set"
+)
+@pytest.mark.parametrize("filters,expected", CASES)
+def test_pgvector_tier_matches_in_memory(filters, expected):
+    asyncpg = pytest.importorskip("asyncpg")
+
+    async def matches() -> set[uuid.UUID]:
+        conn = await asyncpg.connect(os.environ["TEST_DATABASE_URL"])
+        schema = f"test_{uuid.uuid4().hex}"
+        try:
+            await conn.execute(f"CREATE SCHEMA {schema}; SET search_path TO {schema}")
+            await conn.execute(
+                "CREATE TABLE product (id uuid PRIMARY KEY);"
+                "CREATE TABLE renderable_product (id uuid PRIMARY KEY,"
+                " length double precision, width double precision);"
+                + "".join(
+                    f"CREATE TABLE {table} (product_id uuid, render_id uuid);"
+                    for table in DIMENSION_TABLES
+                )
+            )
+            await conn.executemany(
+                "INSERT INTO product VALUES ($1)", [(p,) for p in PRODUCTS]
+            )
+            for i, (product, length, width) in enumerate(RENDERS):
+                render = uuid.UUID(int=100 + i)
+                await conn.execute(
+                    "INSERT INTO renderable_product VALUES ($1, $2, $3)",
+                    render,
+                    length,
+                    width,
+                )
+                await conn.execute("INSERT INTO vanity VALUES ($1, $2)", product, render)
+            params: list = []
+            where = " AND ".join(_filter_clauses(filters, params))
+            rows = await conn.fetch(f"SELECT p.id FROM product p WHERE {where}", *params)
+            return {row["id"] for row in rows}
+        finally:
+            await conn.execute(f"DROP SCHEMA {schema} CASCADE")
+            await conn.close()
+
+    assert asyncio.run(matches()) == expected == in_memory_matches(filters)